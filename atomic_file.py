@@ -0,0 +1,47 @@
+"""
+Gravação atômica de arquivos lidos por outros processos (snapshot, ponteiro de geração,
+segmentos, cache dos feeds e status)
+
+O conteúdo vai para um arquivo temporário exclusivo no mesmo diretório, recebe fsync e só
+então substitui o destino com rename; o diretório também recebe fsync para que o rename
+sobreviva a uma queda. Um leitor vê sempre o arquivo antigo inteiro ou o novo inteiro.
+"""
+
+import os
+import tempfile
+
+def _fsync_directory(directory: str):
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        # Alguns sistemas (ex.: Windows) não permitem fsync em diretórios
+        pass
+    finally:
+        os.close(fd)
+
+def atomic_write(path: str, content: bytes, durable: bool = True):
+    """Substitui path por content de forma atômica (durable=False dispensa os fsyncs)"""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+            f.flush()
+            if durable:
+                os.fsync(f.fileno())
+        # mkstemp cria com 0600; os arquivos são lidos pelos workers da API
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    if durable:
+        _fsync_directory(directory)
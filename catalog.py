@@ -0,0 +1,656 @@
+"""
+Snapshot do catálogo em memória - compartilhado por todos os endpoints da API
+
+O catálogo é dividido em partições por tipo de registro (veículos, empreendimentos,
+peças Zero37 e telefones). Todas ficam em um único snapshot binário (ver snapshot.py),
+com uma seção por partição carregada de forma independente, então um worker que atende
+só uma vertical mantém em memória apenas a sua fatia.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from array import array
+from typing import Callable, Dict, List, Any, Optional, Set, Iterable, Sequence, Tuple
+from text_utils import normalize_search_text
+from snapshot import Snapshot, SnapshotError, write_snapshot
+from atomic_file import atomic_write
+
+# =================== CONFIGURAÇÕES GLOBAIS =======================
+
+DATA_FILE = "data.json"
+# No modo worker (ver ingestion.py), API e ingest_worker precisam enxergar o mesmo diretório
+CATALOG_DIR = os.getenv("CATALOG_DIR", "catalog")
+SEGMENTS_DIR = os.path.join(CATALOG_DIR, "segments")
+SNAPSHOT_POINTER = "CURRENT"
+# Marcador de segmentos gravados que ainda não entraram em um snapshot publicado
+SNAPSHOT_PENDING = "SNAPSHOT_PENDING"
+
+# Gerações de snapshot mantidas em disco (a atual e a anterior, que leitores atrasados ainda podem abrir)
+SNAPSHOT_KEEP = 2
+# Snapshot único do formato anterior às gerações (lido enquanto não houver ponteiro)
+LEGACY_SNAPSHOT = "snapshot.bin"
+
+PARTITION_VEICULOS = "veiculos"
+PARTITION_EMPREENDIMENTOS = "empreendimentos"
+PARTITION_ZERO37 = "zero37"
+PARTITION_TELEFONES = "telefones"
+
+PARTITIONS = [PARTITION_VEICULOS, PARTITION_EMPREENDIMENTOS, PARTITION_ZERO37, PARTITION_TELEFONES]
+
+# Campos de texto usados pelo motor de busca, normalizados uma única vez por carga
+SEARCH_TEXT_FIELDS = [
+    "modelo", "titulo", "versao", "cor", "categoria", "opcionais",
+    "combustivel", "tipo", "marca", "cambio", "motor", "portas"
+]
+
+# Campos comparados pelo filtro "modelo", indexados por n-gramas na carga
+MODEL_INDEX_FIELDS = ["modelo", "titulo", "versao"]
+
+# =================== PARTICIONAMENTO =======================
+
+def partition_kind(record: Dict) -> str:
+    """Define a partição de um registro a partir do seu tipo"""
+    if "empreendimento" in record:
+        return PARTITION_EMPREENDIMENTOS
+    tipo = record.get("tipo")
+    if tipo == "peca_refrigeracao":
+        return PARTITION_ZERO37
+    if tipo == "telefone":
+        return PARTITION_TELEFONES
+    return PARTITION_VEICULOS
+
+
+def split_partitions(records: List[Dict]) -> Dict[str, List[Dict]]:
+    """Separa a lista mista de registros em partições tipadas (mantendo a ordem original)"""
+    partitions = {kind: [] for kind in PARTITIONS}
+    for record in records:
+        partitions[partition_kind(record)].append(record)
+    return partitions
+
+
+def partition_path(kind: str, directory: str = CATALOG_DIR) -> str:
+    """Arquivo JSON da partição no formato anterior ao snapshot (lido só como compatibilidade)"""
+    return os.path.join(directory, f"{kind}.json")
+
+
+def read_snapshot_pointer(directory: str = CATALOG_DIR) -> Optional[Dict[str, Any]]:
+    """
+    Geração publicada: {"generation": N, "file": "snapshot-N.bin", ...}, lida do arquivo CURRENT.
+    Sem ponteiro, um snapshot do formato anterior (snapshot.bin) vale como geração 0.
+    """
+    try:
+        with open(os.path.join(directory, SNAPSHOT_POINTER), "r", encoding="utf-8") as f:
+            pointer = json.load(f)
+        if isinstance(pointer, dict) and isinstance(pointer.get("generation"), int) and pointer.get("file"):
+            return pointer
+    except (OSError, json.JSONDecodeError):
+        pass
+    if os.path.exists(os.path.join(directory, LEGACY_SNAPSHOT)):
+        return {"generation": 0, "file": LEGACY_SNAPSHOT}
+    return None
+
+
+def current_snapshot_path(directory: str = CATALOG_DIR) -> Optional[str]:
+    pointer = read_snapshot_pointer(directory)
+    return os.path.join(directory, pointer["file"]) if pointer else None
+
+
+def mark_snapshot_pending(directory: str = CATALOG_DIR):
+    """
+    Registra que os segmentos mudaram e o snapshot precisa ser regravado. Gravado antes
+    do índice de segmentos, então sobrevive a uma publicação que falhe (ou a uma queda
+    do processo) e força a regravação nas coletas seguintes, mesmo sem fontes alteradas.
+    """
+    os.makedirs(directory, exist_ok=True)
+    atomic_write(os.path.join(directory, SNAPSHOT_PENDING), datetime.now().isoformat().encode("utf-8"))
+
+
+def snapshot_pending(directory: str = CATALOG_DIR) -> bool:
+    return os.path.exists(os.path.join(directory, SNAPSHOT_PENDING))
+
+
+def _prune_generations(directory: str, generation: int):
+    """Remove gerações antigas (leitores que já mapearam o arquivo continuam com acesso a ele)"""
+    oldest_kept = generation - SNAPSHOT_KEEP + 1
+    for name in os.listdir(directory):
+        match = re.fullmatch(r"snapshot-(\d+)\.bin", name)
+        if (match and int(match.group(1)) < oldest_kept) or name == LEGACY_SNAPSHOT:
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError as e:
+                print(f"[AVISO] Não foi possível remover snapshot antigo {name}: {e}")
+
+
+def write_catalog_snapshot(records: List[Dict], updated_at: Optional[str] = None, directory: str = CATALOG_DIR) -> Dict[str, int]:
+    """
+    Publica uma nova geração do snapshot e retorna a contagem de registros de cada partição.
+    O arquivo da geração é gravado por completo (fsync + rename) antes de o ponteiro CURRENT
+    passar a apontar para ele, então um leitor nunca abre um snapshot incompleto.
+    """
+    partitions = split_partitions(records)
+    pointer = read_snapshot_pointer(directory)
+    generation = (pointer["generation"] if pointer else 0) + 1
+    file_name = f"snapshot-{generation}.bin"
+    write_snapshot(os.path.join(directory, file_name), partitions, updated_at)
+    atomic_write(
+        os.path.join(directory, SNAPSHOT_POINTER),
+        json.dumps({"generation": generation, "file": file_name, "updated_at": updated_at}).encode("utf-8")
+    )
+    # Só depois do ponteiro publicado os segmentos deixam de estar pendentes
+    try:
+        os.remove(os.path.join(directory, SNAPSHOT_PENDING))
+    except FileNotFoundError:
+        pass
+    _prune_generations(directory, generation)
+    return {kind: len(items) for kind, items in partitions.items()}
+
+# =================== SEGMENTOS POR FONTE =======================
+
+class SegmentStore:
+    """
+    Registros de cada fonte (URL) gravados em um segmento próprio.
+
+    Só os segmentos cujo conteúdo mudou são regravados, e quando uma fonte falha
+    o último segmento bom continua compondo o catálogo. O índice guarda o hash
+    e as partições de cada segmento para saber o que precisa ser regravado.
+    """
+
+    def __init__(self, directory: str = SEGMENTS_DIR):
+        self.directory = directory
+        self.index_path = os.path.join(directory, "index.json")
+        self._index: Dict[str, Dict[str, Any]] = self._load_index()
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            return index if isinstance(index, dict) else {}
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _segment_path(self, url: str) -> str:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _write(self, path: str, payload: Any):
+        atomic_write(path, json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+
+    def kinds(self, url: str) -> Set[str]:
+        return set(self._index.get(url, {}).get("kinds", []))
+
+    def load(self, url: str) -> Optional[List[Dict]]:
+        """Último segmento bom da fonte (None se nunca foi gravado ou está ilegível)"""
+        if url not in self._index:
+            return None
+        try:
+            with open(self._segment_path(url), "r", encoding="utf-8") as f:
+                return json.load(f).get("registros", [])
+        except (OSError, json.JSONDecodeError, AttributeError) as e:
+            print(f"[AVISO] Segmento ilegível para URL {url}: {e}")
+            return None
+
+    def save(self, url: str, records: List[Dict]) -> bool:
+        """Grava o segmento se o conteúdo mudou; retorna True quando houve gravação"""
+        serialized = json.dumps(records, ensure_ascii=False)
+        digest = hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+        path = self._segment_path(url)
+        if self._index.get(url, {}).get("sha256") == digest and os.path.exists(path):
+            return False
+        os.makedirs(self.directory, exist_ok=True)
+        updated_at = datetime.now().isoformat()
+        self._write(path, {"url": url, "sha256": digest, "_updated_at": updated_at, "registros": records})
+        self._index[url] = {
+            "sha256": digest,
+            "count": len(records),
+            "kinds": sorted({partition_kind(r) for r in records}),
+            "updated_at": updated_at
+        }
+        return True
+
+    def prune(self, urls: Iterable[str]) -> Set[str]:
+        """Remove segmentos de fontes que não estão mais configuradas; retorna as partições afetadas"""
+        active = set(urls)
+        affected: Set[str] = set()
+        for url in [u for u in self._index if u not in active]:
+            affected |= self.kinds(url)
+            del self._index[url]
+            try:
+                os.remove(self._segment_path(url))
+            except OSError:
+                pass
+        return affected
+
+    def commit(self):
+        """Persiste o índice (chamado depois de gravar os segmentos da rodada)"""
+        os.makedirs(self.directory, exist_ok=True)
+        self._write(self.index_path, self._index)
+
+# =================== COLUNAS =======================
+
+def record_column(records: Sequence[Dict], field: str, default: Any = None) -> List[Any]:
+    """
+    Valor do campo em cada registro (default quando o campo não existe).
+    Para partições do snapshot a coluna é lida direto, sem montar os registros.
+    """
+    column = getattr(records, "column", None)
+    if column is not None:
+        return column(field, default)
+    return [record.get(field, default) for record in records]
+
+
+def build_text_columns(records: Sequence[Dict]) -> Dict[str, List[Optional[str]]]:
+    """
+    Gera uma coluna normalizada por campo de busca, alinhada com a lista de registros.
+    Valores vazios (str(valor) == "") ficam como None, para diferenciar de valores
+    que só ficam vazios após a normalização.
+    """
+    columns = {}
+    for field in SEARCH_TEXT_FIELDS:
+        seen: Dict[str, str] = {}
+        column: List[Optional[str]] = []
+        for value in record_column(records, field, ""):
+            raw = str(value)
+            if not raw:
+                column.append(None)
+                continue
+            normalized = seen.get(raw)
+            if normalized is None:
+                normalized = seen[raw] = normalize_search_text(raw)
+            column.append(normalized)
+        columns[field] = column
+    return columns
+
+# =================== COLUNAS NUMÉRICAS =======================
+
+# Valor sentinela para campos numéricos ausentes ou inválidos (NaN nunca passa em comparações)
+MISSING = float("nan")
+
+
+def convert_price(price_str: Any) -> Optional[float]:
+    if not price_str:
+        return None
+    try:
+        if isinstance(price_str, (int, float)):
+            return float(price_str)
+        cleaned = str(price_str).replace(",", "").replace("R$", "").replace(".", "").strip()
+        return float(cleaned) / 100 if len(cleaned) > 2 else float(cleaned)
+    except (ValueError, TypeError):
+        return None
+
+
+def convert_year(year_str: Any) -> Optional[int]:
+    if not year_str:
+        return None
+    try:
+        cleaned = str(year_str).strip().replace('\n', '').replace('\r', '').replace(' ', '')
+        return int(cleaned)
+    except (ValueError, TypeError):
+        return None
+
+
+def convert_km(km_str: Any) -> Optional[int]:
+    if not km_str:
+        return None
+    try:
+        cleaned = str(km_str).replace(".", "").replace(",", "").strip()
+        return int(cleaned)
+    except (ValueError, TypeError):
+        return None
+
+
+def convert_cc(cc_str: Any) -> Optional[float]:
+    if not cc_str:
+        return None
+    try:
+        if isinstance(cc_str, (int, float)):
+            return float(cc_str)
+        cleaned = str(cc_str).replace(",", ".").replace("L", "").replace("l", "").strip()
+        value = float(cleaned)
+        if value < 10:
+            return value * 1000
+        return value
+    except (ValueError, TypeError):
+        return None
+
+
+NUMERIC_FIELDS = {"preco": convert_price, "ano": convert_year, "km": convert_km, "cilindrada": convert_cc}
+
+# Valor usado na ordenação quando o campo é ausente ou zero (equivale ao "or 0" / "or inf" da busca)
+SORT_DEFAULTS = {"preco": 0.0, "ano": 0.0, "km": float("inf"), "cilindrada": 0.0}
+
+
+def build_numeric_columns(records: Sequence[Dict]) -> Dict[str, array]:
+    """Converte uma única vez preço, ano, km e cilindrada de cada registro (MISSING quando ausente)"""
+    columns = {}
+    for field, convert in NUMERIC_FIELDS.items():
+        column = array("d")
+        for raw in record_column(records, field):
+            value = convert(raw)
+            try:
+                column.append(MISSING if value is None else float(value))
+            except OverflowError:
+                column.append(MISSING)
+        columns[field] = column
+    return columns
+
+
+def build_sort_columns(numeric_columns: Dict[str, array]) -> Dict[str, array]:
+    """Chaves de ordenação prontas, com ausentes e zeros já trocados pelo valor padrão de cada campo"""
+    return {
+        field: array("d", (value if value == value and value else SORT_DEFAULTS[field] for value in column))
+        for field, column in numeric_columns.items()
+    }
+
+# =================== ÍNDICES DE VALORES =======================
+
+class ValueIndex:
+    """
+    Agrupa as linhas de uma coluna normalizada pelos seus valores distintos,
+    para que os filtros avaliem cada valor uma única vez.
+    Linhas com o campo vazio ficam com value_id -1.
+    """
+
+    def __init__(self, column: List[Optional[str]]):
+        self.values: List[str] = []
+        self.value_ids: List[int] = []
+        self.rows_by_value: List[List[int]] = []
+        self.empty_rows: List[int] = []
+        ids: Dict[str, int] = {}
+        for row, value in enumerate(column):
+            if value is None:
+                self.value_ids.append(-1)
+                self.empty_rows.append(row)
+                continue
+            value_id = ids.get(value)
+            if value_id is None:
+                value_id = ids[value] = len(self.values)
+                self.values.append(value)
+                self.rows_by_value.append([])
+                self._add_value(value_id, value)
+            self.value_ids.append(value_id)
+            self.rows_by_value[value_id].append(row)
+        self.ids = ids
+
+    def _add_value(self, value_id: int, value: str):
+        pass
+
+    def rows(self, value_ids: Iterable[int]) -> List[int]:
+        """Linhas (em ordem) que possuem algum dos valores informados"""
+        result = []
+        for value_id in value_ids:
+            result.extend(self.rows_by_value[value_id])
+        result.sort()
+        return result
+
+
+class SubstringIndex(ValueIndex):
+    """
+    Índice invertido de uma coluna normalizada.
+
+    Como a normalização da busca remove os espaços, cada campo vira um único token;
+    buscas por igualdade, prefixo e substring são respondidas por um índice de
+    bigramas/trigramas sobre os valores distintos da coluna.
+    """
+
+    def __init__(self, column: List[Optional[str]]):
+        self.grams: Dict[str, Set[int]] = {}
+        super().__init__(column)
+
+    def _add_value(self, value_id: int, value: str):
+        for size in (2, 3):
+            for start in range(len(value) - size + 1):
+                self.grams.setdefault(value[start:start + size], set()).add(value_id)
+
+    def containing(self, word: str) -> Set[int]:
+        """Ids dos valores que contêm a palavra (len(word) >= 2)"""
+        if len(word) == 2:
+            return set(self.grams.get(word, ()))
+        postings = []
+        for start in range(len(word) - 2):
+            posting = self.grams.get(word[start:start + 3])
+            if not posting:
+                return set()
+            postings.append(posting)
+        postings.sort(key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+        return {value_id for value_id in candidates if word in self.values[value_id]}
+
+# =================== SNAPSHOT =======================
+
+class CatalogPartition:
+    """
+    Visão imutável de uma partição do catálogo publicada a cada atualização.
+    Os registros podem ser uma lista ou uma partição preguiçosa do snapshot (SnapshotPartition):
+    índices e filtros usam só colunas, e o dicionário completo é montado para as linhas retornadas.
+    """
+
+    def __init__(self, kind: str, records: Sequence[Dict], version: int, mtime: Optional[float] = None, updated_at: Optional[str] = None, digest: Optional[str] = None):
+        self.kind = kind
+        self.records = records
+        self.version = version
+        self.mtime = mtime
+        self.updated_at = updated_at
+        # sha256 da seção no snapshot: um snapshot novo com a mesma seção não recarrega a partição
+        self.digest = digest
+        # Geração do snapshot de onde a partição veio (None para JSON/data.json)
+        self.generation: Optional[int] = None
+        self.text_columns = build_text_columns(records)
+        self.value_indexes = {
+            field: (SubstringIndex if field in MODEL_INDEX_FIELDS else ValueIndex)(self.text_columns[field])
+            for field in SEARCH_TEXT_FIELDS
+        }
+        self.moto_rows = frozenset(i for i, tipo in enumerate(record_column(records, "tipo", "")) if tipo == "moto")
+        self.numeric_columns = build_numeric_columns(records)
+        self.sort_columns = build_sort_columns(self.numeric_columns)
+        self.ids = [str(value) for value in record_column(records, "id")]
+        self._columns: Dict[Any, List[Any]] = {}
+        self._fragments: Dict[Any, List[Optional[bytes]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def column(self, field: str, default: Any = None) -> List[Any]:
+        """Valores brutos do campo em cada registro (default quando ausente), guardados após a primeira leitura"""
+        key = (field, default)
+        column = self._columns.get(key)
+        if column is None:
+            column = self._columns[key] = record_column(self.records, field, default)
+        return column
+
+    def json_fragments(self, rows: Iterable[int], variant: Any, transform: Callable[[Dict], Any], encode: Callable[[Any], bytes]) -> List[bytes]:
+        """
+        JSON já serializado de cada linha (transform aplicado ao registro antes), guardado por
+        variante. O cache vive com a partição, então só vale para a geração em que foi montado.
+        """
+        cache = self._fragments.get(variant)
+        if cache is None:
+            cache = self._fragments.setdefault(variant, [None] * len(self.records))
+        fragments = []
+        for row in rows:
+            fragment = cache[row]
+            if fragment is None:
+                fragment = cache[row] = encode(transform(self.records[row]))
+            fragments.append(fragment)
+        return fragments
+
+    def text_column(self, field: str) -> List[Optional[str]]:
+        """Coluna com a forma normalizada do campo para cada registro (None quando vazio)"""
+        return self.text_columns[field]
+
+    def value_index(self, field: str) -> ValueIndex:
+        """Índice de valores distintos do campo (SubstringIndex para os campos de modelo)"""
+        return self.value_indexes[field]
+
+    def numeric_column(self, field: str) -> array:
+        """Coluna numérica do campo (MISSING quando ausente ou inválido)"""
+        return self.numeric_columns[field]
+
+    def sort_column(self, field: str) -> array:
+        """Chave de ordenação do campo (ausente/zero substituído pelo padrão do campo)"""
+        return self.sort_columns[field]
+
+
+class CatalogStore:
+    """
+    Mantém as partições atuais do processo.
+
+    A troca é atômica (uma única atribuição de referência por partição): cada requisição
+    obtém a partição uma vez e fica presa àquela geração até terminar, mesmo que uma nova
+    seja publicada no meio. O caminho rápido é um stat do ponteiro CURRENT, sem lock; só
+    quando a geração muda a partição é recarregada (partições cuja seção não mudou, mesmo
+    sha256, são mantidas com a mesma versão). As partições só são lidas do disco quando
+    algum endpoint as solicita.
+    """
+
+    def __init__(self, directory: str = CATALOG_DIR, legacy_path: str = DATA_FILE):
+        self.directory = directory
+        self.legacy_path = legacy_path
+        self.pointer_path = os.path.join(directory, SNAPSHOT_POINTER)
+        self._partitions: Dict[str, CatalogPartition] = {}
+        self._pointer_cache: Optional[tuple] = None
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def _file_mtime(self, path: str) -> Optional[float]:
+        try:
+            return os.stat(path).st_mtime
+        except OSError:
+            return None
+
+    def _next_version(self) -> int:
+        self._version += 1
+        return self._version
+
+    def _pointer(self) -> Optional[Dict[str, Any]]:
+        """Ponteiro da geração atual, relido só quando o arquivo CURRENT é substituído"""
+        try:
+            stat = os.stat(self.pointer_path)
+            key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            key = None
+        cached = self._pointer_cache
+        if cached is not None and key is not None and cached[0] == key:
+            return cached[1]
+        pointer = read_snapshot_pointer(self.directory)
+        self._pointer_cache = (key, pointer)
+        return pointer
+
+    def _source(self, kind: str) -> Tuple[str, Optional[float], Optional[int]]:
+        """
+        (arquivo, mtime, geração) de onde a partição é lida: a geração atual do snapshot ou,
+        sem snapshot publicado, o JSON da partição do formato anterior / data.json.
+        """
+        pointer = self._pointer()
+        if pointer is not None:
+            return os.path.join(self.directory, pointer["file"]), None, pointer["generation"]
+        path = partition_path(kind, self.directory)
+        mtime = self._file_mtime(path)
+        if mtime is None:
+            return self.legacy_path, self._file_mtime(self.legacy_path), None
+        return path, mtime, None
+
+    def _is_current(self, partition: Optional[CatalogPartition], source: Tuple[str, Optional[float], Optional[int]]) -> bool:
+        if partition is None:
+            return False
+        _, mtime, generation = source
+        if generation is not None:
+            return partition.generation == generation
+        # Sem nenhum arquivo para ler, a partição em memória continua valendo
+        return mtime is None or partition.mtime == mtime
+
+    def publish(self, data: Dict):
+        """
+        Publica o resultado de uma atualização. Se ele foi gravado em uma geração do snapshot
+        (_snapshot_generation), nada é montado aqui: cada partição é lida sob demanda dessa
+        geração, via mmap, como em qualquer outro processo. Só sem snapshot gravado as
+        partições são construídas a partir dos registros em memória, sem digest.
+        """
+        records = data.get("veiculos", [])
+        if not isinstance(records, list):
+            raise ValueError("Formato inválido: 'veiculos' deve ser uma lista")
+        with self._lock:
+            # Força a releitura do ponteiro CURRENT na próxima consulta
+            self._pointer_cache = None
+            if data.get("_snapshot_generation") is not None:
+                # Partições montadas em memória (sem digest) não podem ser reaproveitadas: libera
+                for kind in [kind for kind, partition in self._partitions.items() if partition.digest is None]:
+                    del self._partitions[kind]
+                return
+            updated_at = data.get("_updated_at")
+            for kind, items in split_partitions(records).items():
+                _, mtime, generation = self._source(kind)
+                partition = CatalogPartition(kind, items, self._next_version(), mtime, updated_at)
+                # Vale até a próxima geração publicada (ou até o arquivo de origem mudar)
+                partition.generation = generation
+                self._partitions[kind] = partition
+
+    def partition(self, kind: str) -> Optional[CatalogPartition]:
+        """
+        Retorna a partição atual, recarregando do disco se uma nova geração foi publicada.
+        Se a leitura falhar e já houver a partição em memória, ela continua sendo servida;
+        caso contrário o erro é propagado para o endpoint.
+        """
+        current = self._partitions.get(kind)
+        source = self._source(kind)
+        if self._is_current(current, source):
+            return current
+
+        with self._lock:
+            current = self._partitions.get(kind)
+            source = self._source(kind)
+            if self._is_current(current, source):
+                return current
+            path, mtime, generation = source
+            try:
+                if generation is not None:
+                    loaded = self._load_snapshot_partition(kind, path, generation, current)
+                elif mtime is None:
+                    loaded = None
+                elif path == self.legacy_path:
+                    loaded = self._load_legacy(kind, mtime)
+                else:
+                    loaded = self._load_partition(kind, path, mtime)
+            except (OSError, SnapshotError, json.JSONDecodeError, ValueError, KeyError) as e:
+                if current is None:
+                    raise
+                print(f"[AVISO] Falha ao recarregar partição '{kind}', mantendo versão atual: {e}")
+                return current
+            if loaded is not None and loaded is not current:
+                self._partitions[kind] = loaded
+                print(f"[INFO] Partição '{kind}' carregada ({len(loaded)} registros, versão {loaded.version}, geração {generation})")
+            return loaded
+
+    def _load_snapshot_partition(self, kind: str, path: str, generation: int, current: Optional[CatalogPartition]) -> CatalogPartition:
+        snapshot = Snapshot.load(path)
+        digest = snapshot.digest(kind)
+        if current is not None and digest is not None and current.digest == digest:
+            # Seção idêntica: só registra a nova geração (versão e cache de consultas continuam válidos)
+            current.generation = generation
+            return current
+        loaded = CatalogPartition(kind, snapshot.partition(kind), self._next_version(), None, snapshot.updated_at, digest)
+        loaded.generation = generation
+        return loaded
+
+    def _load_partition(self, kind: str, path: str, mtime: float) -> CatalogPartition:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        records = data.get("registros", [])
+        if not isinstance(records, list):
+            raise ValueError(f"Formato inválido: 'registros' da partição '{kind}' deve ser uma lista")
+        return CatalogPartition(kind, records, self._next_version(), mtime, data.get("_updated_at"))
+
+    def _load_legacy(self, kind: str, mtime: float) -> CatalogPartition:
+        """Compatibilidade: monta a partição a partir do data.json completo quando ainda não há snapshot nem partições gravadas"""
+        with open(self.legacy_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        records = data.get("veiculos", [])
+        if not isinstance(records, list):
+            raise ValueError("Formato inválido: 'veiculos' deve ser uma lista")
+        return CatalogPartition(kind, split_partitions(records)[kind], self._next_version(), mtime, data.get("_updated_at"))
+
+
+catalog_store = CatalogStore()
@@ -0,0 +1,119 @@
+"""
+Cache em disco dos feeds - payload bruto, validadores HTTP e registros parseados por URL
+
+Permite GET condicional (If-None-Match / If-Modified-Since) e, quando o feed não mudou
+(304 ou mesmo hash do payload), reaproveitar os registros da última execução sem
+chamar o parser de novo.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+from atomic_file import atomic_write
+
+# =================== CONFIGURAÇÕES GLOBAIS =======================
+
+FEED_CACHE_DIR = os.getenv("FEED_CACHE_DIR", "feed_cache")
+
+def payload_digest(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+class FeedCacheEntry:
+    """Estado salvo de uma URL: validadores, hash do payload e parser (e versão) que gerou os registros"""
+
+    def __init__(self, cache: "FeedCache", url: str, meta: Dict[str, Any]):
+        self.cache = cache
+        self.url = url
+        self.etag: Optional[str] = meta.get("etag")
+        self.last_modified: Optional[str] = meta.get("last_modified")
+        self.sha256: Optional[str] = meta.get("sha256")
+        self.parser: Optional[str] = meta.get("parser")
+        self.parser_version: Optional[str] = meta.get("parser_version")
+        self.has_records: bool = bool(meta.get("has_records"))
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def payload(self) -> Optional[bytes]:
+        try:
+            with open(self.cache.path(self.url, "raw"), "rb") as f:
+                content = f.read()
+        except OSError:
+            return None
+        return content if payload_digest(content) == self.sha256 else None
+
+    def records(self) -> Optional[List[Dict]]:
+        if not self.has_records:
+            return None
+        try:
+            with open(self.cache.path(self.url, "records.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"[AVISO] Registros em cache ilegíveis para URL {self.url}: {e}")
+            return None
+
+class FeedCache:
+    """Um conjunto de arquivos por URL (nome derivado do hash da URL) dentro do diretório do cache"""
+
+    def __init__(self, directory: str = FEED_CACHE_DIR):
+        self.directory = directory
+
+    def path(self, url: str, suffix: str) -> str:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.directory, f"{key}.{suffix}")
+
+    def load(self, url: str) -> Optional[FeedCacheEntry]:
+        try:
+            with open(self.path(url, "meta.json"), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if meta.get("url") != url:
+            return None
+        return FeedCacheEntry(self, url, meta)
+
+    def _write(self, path: str, content: bytes):
+        atomic_write(path, content)
+
+    def _write_meta(self, url: str, etag: Optional[str], last_modified: Optional[str], sha256: str, parser: Optional[str], parser_version: Optional[str], has_records: bool):
+        meta = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "sha256": sha256,
+            "parser": parser,
+            "parser_version": parser_version,
+            "has_records": has_records,
+            "fetched_at": datetime.now().isoformat()
+        }
+        self._write(self.path(url, "meta.json"), json.dumps(meta, ensure_ascii=False, indent=2).encode("utf-8"))
+
+    def refresh(self, entry: FeedCacheEntry, etag: Optional[str], last_modified: Optional[str]):
+        """Payload igual ao salvo: atualiza só os validadores no meta"""
+        try:
+            self._write_meta(entry.url, etag, last_modified, entry.sha256, entry.parser, entry.parser_version, entry.has_records)
+        except Exception as e:
+            print(f"[AVISO] Erro ao atualizar cache do feed {entry.url}: {e}")
+
+    def store(self, url: str, payload: bytes, etag: Optional[str], last_modified: Optional[str], parser: Optional[str], parser_version: Optional[str], records: Optional[List[Dict]]):
+        """
+        Salva payload, registros (se informados) e por último o meta, que é o que
+        torna a entrada válida na próxima execução.
+        """
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            self._write(self.path(url, "raw"), payload)
+            if records is not None:
+                self._write(self.path(url, "records.json"), json.dumps(records, ensure_ascii=False).encode("utf-8"))
+            self._write_meta(url, etag, last_modified, payload_digest(payload), parser, parser_version, records is not None)
+        except Exception as e:
+            print(f"[AVISO] Erro ao salvar cache do feed {url}: {e}")
+
+feed_cache = FeedCache()
@@ -2,6 +2,8 @@
 Fetchers package - Parsers individuais para cada fornecedor de dados de veículos
 """
 from .base_parser import BaseParser
+from .enrichment import Enricher, EnrichmentSession
+from .registry import ParserRegistry
 from .altimus_parser import AltimusParser
 from .autocerto_parser import AutocertoParser
 from .autoconf_parser import AutoconfParser
@@ -32,6 +34,9 @@ __all__ = [
     'RevendaiTelefonesParser',
     'NetcarParser',
     'BaseParser',
+    'Enricher',
+    'EnrichmentSession',
+    'ParserRegistry',
     'AltimusParser',
     'AutocertoParser',
     'AutoconfParser',
@@ -9,6 +9,9 @@ import re
 class AdmycarParser(BaseParser):
     """Parser para dados do Admycar"""
     
+    url_patterns = ("admycar.com",)
+    stream_item_path = ("admycar", "ad")
+    
     def can_parse(self, data: Any, url: str) -> bool:
         """Verifica se pode processar dados do Admycar"""
         return "admycar.com" in url.lower()
@@ -10,6 +10,8 @@ import xml.etree.ElementTree as ET
 class AltimusParser(BaseParser):
     """Parser para dados do Altimus"""
     
+    url_patterns = ("altimus.com.br",)
+    
     def can_parse(self, data: Any, url: str) -> bool:
         """Verifica se pode processar dados do Altimus"""
         return "altimus.com.br" in url.lower()
@@ -9,6 +9,9 @@ import re
 class AutocertoParser(BaseParser):
     """Parser para dados do Autocerto"""
     
+    url_patterns = ("autocerto.com",)
+    stream_item_path = ("estoque", "veiculo")
+    
     def can_parse(self, data: Any, url: str) -> bool:
         """Verifica se pode processar dados do Autocerto"""
         return "autocerto.com" in url.lower()
@@ -9,6 +9,9 @@ import re
 class AutoconfParser(BaseParser):
     """Parser para dados do Autoconf"""
     
+    url_patterns = ("autoconf",)
+    stream_item_path = ("ADS", "AD")
+    
     # Mapeamento de categorias específico do Autoconf
     CATEGORIA_MAPPING = {
         "conversivel/cupe": "Conversível",
@@ -9,6 +9,8 @@ import re
 class AutogestorParser(BaseParser):
     """Parser para dados do AutoGestor"""
     
+    url_patterns = ("agsistema.net",)
+    
     def can_parse(self, data: Any, url: str) -> bool:
         """Verifica se pode processar dados do AutoGestor"""
         return "agsistema.net" in url.lower()
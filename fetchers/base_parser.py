@@ -3,18 +3,61 @@ Base parser class - Define a interface comum para todos os parsers de veículos
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any
-from vehicle_mappings import (
-    MAPEAMENTO_CATEGORIAS, 
-    MAPEAMENTO_MOTOS, 
-    OPCIONAL_CHAVE_HATCH
-)
+from typing import Dict, List, Any, Optional, Tuple
+import model_matchers
+from model_matchers import normalizar_texto, category_classifier, moto_matcher
+import hashlib
+import inspect
 import re
-from unidecode import unidecode
+import sys
+
+# Versão de código de cada classe de parser (calculada uma vez por processo)
+_cache_versions: Dict[type, str] = {}
 
 class BaseParser(ABC):
     """Classe base abstrata para todos os parsers de veículos"""
     
+    # Registros parseados podem ser reaproveitados quando o feed não muda
+    # (False para parsers cujo resultado depende de outras fontes além do payload)
+    cacheable = True
+    
+    # Incrementar quando a saída mudar por código fora dos módulos do parser e do model_matchers;
+    # mudanças nesses módulos já invalidam os registros em cache (ver cache_version)
+    PARSER_VERSION = 1
+    
+    # Enriquecimentos aplicados depois do parse (dados de fontes secundárias, ver fetchers.enrichment)
+    enrichers = ()
+    
+    # Caminho dos itens no XML (ex.: ("estoque", "veiculo")) para parsers que aceitam leitura em
+    # streaming: parse recebe {"estoque": {"veiculo": <iterador>}} com um item por vez
+    stream_item_path: Optional[Tuple[str, ...]] = None
+    
+    # Roteamento (fetchers.registry): trechos da URL reconhecidos pelo can_parse (minúsculos) e se o
+    # parser também identifica feeds pelo conteúdo, checagem feita só quando nenhuma URL casa
+    url_patterns: Tuple[str, ...] = ()
+    content_signature = False
+    
+    @classmethod
+    def cache_version(cls) -> str:
+        """
+        Identifica o código que gerou os registros: PARSER_VERSION mais o hash dos módulos da
+        classe (e das classes base) e do model_matchers. Registros em cache com outra versão
+        não são reaproveitados, então um deploy com parser alterado refaz o parse dos feeds.
+        """
+        version = _cache_versions.get(cls)
+        if version is None:
+            digest = hashlib.sha256(str(cls.PARSER_VERSION).encode("utf-8"))
+            modules = [klass.__module__ for klass in cls.__mro__ if issubclass(klass, BaseParser)]
+            for module in dict.fromkeys(modules + [model_matchers.__name__]):
+                try:
+                    with open(inspect.getsourcefile(sys.modules[module]), "rb") as f:
+                        digest.update(f.read())
+                except (OSError, TypeError, KeyError):
+                    digest.update(module.encode("utf-8"))
+            version = f"{cls.PARSER_VERSION}:{digest.hexdigest()[:16]}"
+            _cache_versions[cls] = version
+        return version
+    
     @abstractmethod
     def can_parse(self, data: Any, url: str) -> bool:
         """Verifica se este parser pode processar os dados da URL fornecida"""
@@ -120,16 +163,7 @@ class BaseParser(ABC):
     
     def normalizar_texto(self, texto: str) -> str:
         """Normaliza texto para comparação"""
-        if not texto: 
-            return ""
-        texto_norm = unidecode(str(texto)).lower()
-        
-        # ← ADICIONE ESTA LINHA: Converte caracteres especiais em espaços
-        texto_norm = re.sub(r'[-_./]', ' ', texto_norm)  # hífen, underscore, ponto, barra
-        
-        texto_norm = re.sub(r'[^a-z0-9\s]', '', texto_norm)
-        texto_norm = re.sub(r'\s+', ' ', texto_norm).strip()
-        return texto_norm
+        return normalizar_texto(texto)
     
     def definir_categoria_veiculo(self, modelo: str, opcionais: str = "", version: str = "") -> str:
         """
@@ -137,108 +171,18 @@ class BaseParser(ABC):
         1. Se MODELO contém "hatch" ou "sedan", usa essa categoria
         2. Caso contrário, busca no mapeamento pelo match com mais palavras
         Para modelos ambíguos ("hatch,sedan"), usa os opcionais para decidir.
+        O classificador é compilado uma única vez e compartilhado por todos os parsers.
         """
-        if not modelo:
-            return None
-        
-        modelo_norm = self.normalizar_texto(modelo)
-        
-        # PRIORIDADE 1: Verifica se "hatch" ou "sedan" está no modelo
-        if "hatch" in modelo_norm:
-            return "Hatch"
-        if "sedan" in modelo_norm:
-            return "Sedan"
-        
-        # PRIORIDADE 2: Busca no mapeamento pelo MELHOR match (mais palavras correspondentes)
-        matches = []
-        
-        for modelo_mapeado, categoria_result in MAPEAMENTO_CATEGORIAS.items():
-            modelo_mapeado_norm = self.normalizar_texto(modelo_mapeado)
-            
-            # Verifica se o modelo mapeado está contido no modelo do veículo
-            if modelo_mapeado_norm in modelo_norm:
-                # Conta quantas palavras do mapeamento correspondem
-                palavras_mapeado = modelo_mapeado_norm.split()
-                palavras_modelo = modelo_norm.split()
-                
-                # Score: número de palavras que fazem match
-                palavras_match = sum(1 for p in palavras_mapeado if p in palavras_modelo)
-                
-                # Score adicional pelo comprimento total (preferir matches mais específicos)
-                score = (palavras_match * 100) + len(modelo_mapeado_norm)
-                
-                matches.append({
-                    'categoria': categoria_result,
-                    'score': score
-                })
-        
-        # Se encontrou matches, retorna o com maior score
-        if matches:
-            matches.sort(key=lambda x: x['score'], reverse=True)
-            categoria = matches[0]['categoria']
-            
-            # Para categorias ambíguas, usa os opcionais para decidir
-            if categoria == "hatch,sedan":
-                opcionais_norm = self.normalizar_texto(opcionais)
-                opcional_chave_norm = self.normalizar_texto(OPCIONAL_CHAVE_HATCH)
-                return "Hatch" if opcional_chave_norm in opcionais_norm else "Sedan"
-            else:
-                return categoria
-        
-        return None
+        return category_classifier.classify(modelo, opcionais)
     
     def inferir_cilindrada_e_categoria_moto(self, modelo: str, versao: str = ""):
         """
         Infere cilindrada e categoria para motocicletas baseado no modelo e versão.
-        Busca primeiro no modelo, depois na versão se não encontrar.
+        Busca primeiro no modelo, depois na versão e por fim em modelo + versão,
+        sempre pela chave mais específica (maior comprimento) do mapeamento.
         Retorna uma tupla (cilindrada, categoria).
         """
-        def buscar_no_texto(texto: str):
-            if not texto: 
-                return None, None
-            
-            texto_norm = self.normalizar_texto(texto)
-            
-            # Busca exata primeiro
-            if texto_norm in MAPEAMENTO_MOTOS:
-                cilindrada, categoria = MAPEAMENTO_MOTOS[texto_norm]
-                return cilindrada, categoria
-            
-            # Busca por correspondência parcial - ordena por comprimento (mais específico primeiro)
-            matches = []
-            for modelo_mapeado, (cilindrada, categoria) in MAPEAMENTO_MOTOS.items():
-                modelo_mapeado_norm = self.normalizar_texto(modelo_mapeado)
-                
-                # Verifica se o modelo mapeado está contido no texto
-                if modelo_mapeado_norm in texto_norm:
-                    matches.append((modelo_mapeado_norm, cilindrada, categoria, len(modelo_mapeado_norm)))
-                
-                # Verifica também variações sem espaço (ybr150 vs ybr 150)
-                modelo_sem_espaco = modelo_mapeado_norm.replace(' ', '')
-                if modelo_sem_espaco in texto_norm:
-                    matches.append((modelo_sem_espaco, cilindrada, categoria, len(modelo_sem_espaco)))
-            
-            # Se encontrou correspondências, retorna a mais específica (maior comprimento)
-            if matches:
-                # Ordena por comprimento decrescente para pegar a correspondência mais específica
-                matches.sort(key=lambda x: x[3], reverse=True)
-                _, cilindrada, categoria, _ = matches[0]
-                return cilindrada, categoria
-            
-            return None, None
-        
-        # Busca primeiro no modelo
-        cilindrada, categoria = buscar_no_texto(modelo)
-        
-        # Se não encontrou e tem versão, busca na versão
-        if not cilindrada and versao:
-            cilindrada, categoria = buscar_no_texto(versao)
-        
-        # TERCEIRA TENTATIVA: modelo + versao como frase completa
-        if not cilindrada and versao:
-            cilindrada, categoria = buscar_no_texto(f"{modelo} {versao}")
-        
-        return cilindrada, categoria
+        return moto_matcher.infer(modelo, versao)
     
     def converter_preco(self, valor: Any) -> float:
         """Converte string de preço para float"""
@@ -11,6 +11,9 @@ import re
 class BndvParser(BaseParser):
     """Parser para dados do BNDV"""
     
+    url_patterns = ("bndv", "sistema.lojistas")
+    content_signature = True
+    
     # Mapeamento de categorias específico do BNDV
     CATEGORIA_MAPPING = {
         "conversivel/cupe": "Conversível",
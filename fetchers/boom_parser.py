@@ -8,6 +8,8 @@ from typing import Dict, List, Any, Union
 class BoomParser(BaseParser):
     """Parser genérico para estruturas variadas - usado como fallback"""
     
+    url_patterns = ("boomsistemas.com.br",)
+    
     def can_parse(self, data: Any, url: str) -> bool:
         """Aceita dados de boomsistemas.com.br ou como fallback genérico"""
         return "boomsistemas.com.br" in url.lower()
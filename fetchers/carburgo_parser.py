@@ -10,6 +10,8 @@ import xml.etree.ElementTree as ET
 class CarburgoParser(BaseParser):
     """Parser para dados do Carburgo"""
     
+    url_patterns = ("carburgo",)
+    
     def can_parse(self, data: Any, url: str) -> bool:
         """Verifica se pode processar dados do Carburgo"""
         if not url:
@@ -167,8 +169,4 @@ class CarburgoParser(BaseParser):
 
         return [img for img in fotos_foto if img]
     
-    # REMOVIDO: definir_categoria_veiculo - agora usa o do BaseParser
-    
-    def inferir_cilindrada_e_categoria_moto(self, modelo: str, versao: str):
-        """Inferir cilindrada e categoria para motos (não aplicável para Carburgo)"""
-        return None, None
+    # REMOVIDO: definir_categoria_veiculo e inferir_cilindrada_e_categoria_moto - agora usam os do BaseParser
@@ -9,6 +9,8 @@ import re
 class ClickGarageParser(BaseParser):
     """Parser para dados do ClickGarage"""
     
+    url_patterns = ("clickgarage.com.br",)
+    
     def can_parse(self, data: Any, url: str) -> bool:
         """Verifica se pode processar dados do ClickGarage"""
         return "clickgarage.com.br" in url.lower()
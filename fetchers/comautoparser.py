@@ -13,6 +13,8 @@ URL_LOCALIZACAO_MAP = {
 class ComautoParser1(BaseParser):
     """Parser para dados do AGSistema"""
     
+    url_patterns = ("s3.agsistema.net",)
+    
     def can_parse(self, data: Any, url: str) -> bool:
         """Verifica se pode processar dados do AGSistema"""
         # Proteção contra url None ou vazia
@@ -119,6 +121,8 @@ class ComautoParser1(BaseParser):
 class ComautoParser2(BaseParser):
     """Parser para dados do MotorLeads"""
     
+    url_patterns = ("api.motorleads.co",)
+    
     def can_parse(self, data: Any, url: str) -> bool:
         """Verifica se pode processar dados do MotorLeads"""
         # Proteção contra url None ou vazia
@@ -9,6 +9,9 @@ import re
 class DSAutoEstoqueParser(BaseParser):
     """Parser para dados do DSAutoEstoque"""
     
+    url_patterns = ("dsautoestoque.com",)
+    stream_item_path = ("estoque", "veiculo")
+    
     def can_parse(self, data: Any, url: str) -> bool:
         """Verifica se pode processar dados do DSAutoEstoque"""
         return "dsautoestoque.com" in url.lower()
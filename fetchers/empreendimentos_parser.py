@@ -8,6 +8,8 @@ from typing import Dict, List, Any
 class EmpreendimentosParser(BaseParser):
     """Parser para dados de empreendimentos imobiliários"""
 
+    url_patterns = ("empreendimentos",)
+
     def can_parse(self, data: Any, url: str) -> bool:
         """Verifica se pode processar dados de empreendimentos"""
         return "empreendimentos" in url.lower()
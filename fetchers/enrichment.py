@@ -0,0 +1,57 @@
+"""
+Enriquecimento pós-parse - dados de fontes secundárias aplicados aos registros parseados
+
+O parser continua dependendo só do payload do feed (e pode ter o resultado em cache);
+dados laterais, como a tabela de preços da SimplesVeiculo, são baixados uma única vez
+por atualização e aplicados depois do parse a todos os registros da rodada.
+"""
+
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List
+
+class Enricher(ABC):
+    """Interface para enriquecimentos declarados pelos parsers (atributo "enrichers")"""
+
+    # Identifica o contexto compartilhado na rodada (enrichers com o mesmo nome reaproveitam o mesmo)
+    name: str = ""
+
+    @abstractmethod
+    def prepare(self) -> Any:
+        """Carrega os dados laterais (chamado no máximo uma vez por atualização)"""
+        pass
+
+    @abstractmethod
+    def enrich(self, records: List[Dict], context: Any) -> List[Dict]:
+        """Aplica o contexto preparado aos registros de uma fonte"""
+        pass
+
+class EnrichmentSession:
+    """
+    Contextos dos enrichers de uma atualização.
+    Com o fetch concorrente, a primeira thread prepara o contexto e as demais aguardam.
+    """
+
+    def __init__(self):
+        self._contexts: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def context(self, enricher: Enricher) -> Any:
+        with self._lock:
+            lock = self._locks.setdefault(enricher.name, threading.Lock())
+        with lock:
+            if enricher.name not in self._contexts:
+                try:
+                    self._contexts[enricher.name] = enricher.prepare()
+                except Exception as e:
+                    print(f"[ERRO] Erro ao preparar enriquecimento '{enricher.name}': {e}")
+                    self._contexts[enricher.name] = None
+            return self._contexts[enricher.name]
+
+    def apply(self, parser: Any, records: List[Dict]) -> List[Dict]:
+        for enricher in getattr(parser, "enrichers", ()):
+            context = self.context(enricher)
+            if context is not None:
+                records = enricher.enrich(records, context)
+        return records
@@ -8,6 +8,9 @@ from typing import Dict, List, Any
 class FronteiraParser(BaseParser):
     """Parser para dados da Fronteira Veículos"""
     
+    url_patterns = ("fronteiraveiculos.com",)
+    stream_item_path = ("estoque", "veiculo")
+    
     def can_parse(self, data: Any, url: str) -> bool:
         """Verifica se pode processar dados da Fronteira"""
         return "fronteiraveiculos.com" in url.lower()
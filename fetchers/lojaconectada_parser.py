@@ -8,6 +8,8 @@ from typing import Dict, List, Any
 class LojaConectadaParser(BaseParser):
     """Parser para dados da Loja Conectada"""
     
+    url_patterns = ("lojaconectada", "loja conectada")
+    
     # Mapeamento de categorias específico da Loja Conectada
     CATEGORIA_MAPPING = {
         "conversivel/cupe": "Conversível",
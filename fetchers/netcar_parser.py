@@ -8,6 +8,9 @@ from typing import Dict, List, Any
 class NetcarParser(BaseParser):
     """Parser para dados do Netcar"""
     
+    url_patterns = ("netcar",)
+    content_signature = True
+    
     # Mapeamento de nomes de opcionais para formato legível
     OPCIONAIS_MAPPING = {
         "air_bag": "Air Bag",
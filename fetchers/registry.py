@@ -0,0 +1,71 @@
+"""
+Registro de parsers - roteamento das URLs sem sondar os 24 can_parse em sequência
+
+Cada parser declara os trechos de URL que reconhece ("url_patterns") e se também
+identifica feeds pelo conteúdo ("content_signature"). A URL é roteada com uma única
+passada de Aho-Corasick sobre os padrões de todos os parsers; as checagens por
+conteúdo só rodam para feeds que nenhum padrão de URL reconheceu.
+"""
+
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from model_matchers import AhoCorasick
+
+# Candidatos por URL (nomes dos parsers), compartilhados entre atualizações - cada coleta cria
+# um novo fetcher. Só a parte que depende apenas da URL fica em cache; can_parse confirma sempre.
+_route_cache: Dict[str, Tuple[str, ...]] = {}
+_route_cache_lock = threading.Lock()
+
+class ParserRegistry:
+    """Parsers na ordem de prioridade, indexados pelos padrões de URL"""
+
+    def __init__(self, parsers: List[Any]):
+        self.parsers = parsers
+        self._by_name = {parser.__class__.__name__: parser for parser in parsers}
+        patterns: List[str] = []
+        self._pattern_owner: List[int] = []
+        for position, parser in enumerate(parsers):
+            for pattern in getattr(parser, "url_patterns", ()):
+                patterns.append(pattern.lower())
+                self._pattern_owner.append(position)
+        self._matcher = AhoCorasick(patterns)
+        self._content_parsers = [parser for parser in parsers if getattr(parser, "content_signature", False)]
+
+    def by_name(self, name: Optional[str]) -> Optional[Any]:
+        return self._by_name.get(name) if name else None
+
+    def url_candidates(self, url: str) -> List[Any]:
+        """Parsers cujos padrões aparecem na URL, na ordem de prioridade"""
+        if not url:
+            return []
+        with _route_cache_lock:
+            names = _route_cache.get(url)
+        if names is None:
+            positions = {self._pattern_owner[pattern_id] for pattern_id in self._matcher.find_all(url.lower())}
+            names = tuple(self.parsers[position].__class__.__name__ for position in sorted(positions))
+            with _route_cache_lock:
+                _route_cache[url] = names
+        return [self._by_name[name] for name in names if name in self._by_name]
+
+    def _accepts(self, parser: Any, data: Any, url: str) -> bool:
+        try:
+            return bool(parser.can_parse(data, url))
+        except Exception:
+            return False
+
+    def select(self, data: Any, url: str) -> Optional[Any]:
+        """Parsers reconhecidos pela URL e, só se nenhum aceitar, os que identificam o feed pelo conteúdo"""
+        for parser in self.url_candidates(url):
+            if self._accepts(parser, data, url):
+                return parser
+        for parser in self._content_parsers:
+            if self._accepts(parser, data, url):
+                return parser
+        return None
+
+    def select_by_url(self, url: str) -> Optional[Any]:
+        """Escolha sem os dados (usada antes do parse, ex.: leitura em streaming)"""
+        for parser in self.url_candidates(url):
+            if self._accepts(parser, None, url):
+                return parser
+        return None
@@ -8,6 +8,8 @@ import re
 class RevendaiParser(BaseParser):
     """Parser para dados do Revendai"""
     
+    url_patterns = ("integrador.revendai33",)
+    
     def can_parse(self, data: Any, url: str) -> bool:
         """Verifica se pode processar dados do Revendai"""
         # Proteção contra url None ou vazia
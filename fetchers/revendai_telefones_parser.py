@@ -9,6 +9,8 @@ import re
 class RevendaiTelefonesParser(BaseParser):
     """Parser para dados de telefones do Revendai"""
     
+    url_patterns = ("telefones",)
+    
     def can_parse(self, data: Any, url: str) -> bool:
         """Verifica se pode processar dados de telefones do Revendai"""
         # Proteção contra url None ou vazia
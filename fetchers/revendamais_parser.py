@@ -8,6 +8,9 @@ from typing import Dict, List, Any
 class RevendamaisParser(BaseParser):
     """Parser para dados do Revendamais"""
     
+    url_patterns = ("revendamais.com.br", "heyveiculos")
+    stream_item_path = ("ADS", "AD")
+    
     # Mapeamento de categorias específico do Revendamais
     CATEGORIA_MAPPING = {
         "conversivel/cupe": "Conversível",
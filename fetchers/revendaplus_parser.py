@@ -8,6 +8,8 @@ from typing import Dict, List, Any
 class RevendaPlusParser(BaseParser):
     """Parser para dados do RevendaPlus"""
     
+    url_patterns = ("revendaplus.com.br",)
+    
     # Mapeamento de categorias específico do RevendaPlus
     CATEGORIA_MAPPING = {
         "conversivel/cupe": "Conversível",
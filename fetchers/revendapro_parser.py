@@ -9,6 +9,9 @@ import re
 class RevendaproParser(BaseParser):
     """Parser para dados do RevendaPro"""
     
+    url_patterns = ("revendapro.com.br",)
+    stream_item_path = ("CargaVeiculos", "Veiculo")
+    
     def can_parse(self, data: Any, url: str) -> bool:
         """Verifica se pode processar dados do RevendaPro"""
         return "revendapro.com.br" in url.lower()
@@ -3,13 +3,56 @@ Parser específico para SimplesVeiculo (simplesveiculo.com.br)
 """
 
 from .base_parser import BaseParser
-from typing import Dict, List, Any, Optional
-import requests
+from .enrichment import Enricher
+from typing import Callable, Dict, List, Any, Optional
+import http_client
 import os
 
+class SecondaryPriceEnricher(Enricher):
+    """
+    Preços da fonte secundária (XML_URL_2), baixada uma vez por atualização.
+    O JSON é um array de objetos: [{"id": "344364", "valor": "19000.00", ...}, ...]
+    """
+    
+    name = "simplesveiculo_preco_secundario"
+    
+    def __init__(self, converter_preco: Callable[[Any], float]):
+        self.converter_preco = converter_preco
+    
+    def prepare(self) -> Optional[Dict[str, float]]:
+        xml_url_2 = os.environ.get('XML_URL_2')
+        if not xml_url_2:
+            return None
+        
+        response = http_client.get(xml_url_2)
+        response.raise_for_status()
+        
+        prices: Dict[str, float] = {}
+        for vehicle in response.json():
+            vehicle_id = str(vehicle.get("id"))
+            valor = vehicle.get("valor")
+            # Vale o primeiro registro com valor para cada id
+            if valor and vehicle_id not in prices:
+                prices[vehicle_id] = self.converter_preco(valor)
+        print(f"[INFO] Fonte secundária de preços carregada: {len(prices)} preço(s)")
+        return prices
+    
+    def enrich(self, records: List[Dict], prices: Dict[str, float]) -> List[Dict]:
+        for record in records:
+            preco = prices.get(str(record.get("id")))
+            if preco is not None:
+                record["preco"] = preco
+        return records
+
 class SimplesVeiculoParser(BaseParser):
     """Parser para dados do SimplesVeiculo"""
     
+    url_patterns = ("simplesveiculo.com.br",)
+    
+    def __init__(self):
+        # O preço final vem da fonte secundária, aplicada depois do parse
+        self.enrichers = [SecondaryPriceEnricher(self.converter_preco)]
+    
     # Mapeamento de categorias específico do SimplesVeiculo
     CATEGORIA_MAPPING = {
         "conversivel/cupe": "Conversível",
@@ -111,9 +154,8 @@ class SimplesVeiculoParser(BaseParser):
             # Processa câmbio
             cambio_final = self._map_transmission(v.get("transmission", ""))
             
-            # BUSCA O PREÇO DA FONTE SECUNDÁRIA
-            preco_secundario = self._fetch_price_from_secondary_source(vehicle_id)
-            preco_final = preco_secundario if preco_secundario is not None else self.converter_preco(v.get("price"))
+            # Preço do feed; o SecondaryPriceEnricher substitui pelo da fonte secundária quando houver
+            preco_final = self.converter_preco(v.get("price"))
             
             parsed = self.normalize_vehicle({
                 "id": vehicle_id,
@@ -141,33 +183,6 @@ class SimplesVeiculoParser(BaseParser):
         
         return parsed_vehicles
     
-    def _fetch_price_from_secondary_source(self, vehicle_id: str) -> Optional[float]:
-        """Busca o preço do veículo na fonte secundária (XML_URL_2)"""
-        try:
-            xml_url_2 = os.environ.get('XML_URL_2')
-            if not xml_url_2:
-                return None
-                
-            response = requests.get(xml_url_2, timeout=30)
-            response.raise_for_status()
-            
-            price_data = response.json()
-            
-            # O JSON é um array de objetos com estrutura:
-            # [{"id": "344364", "valor": "19000.00", ...}, ...]
-            
-            for vehicle in price_data:
-                if str(vehicle.get("id")) == str(vehicle_id):
-                    valor = vehicle.get("valor")
-                    if valor:
-                        return self.converter_preco(valor)
-            
-            return None
-            
-        except Exception as e:
-            print(f"Erro ao buscar preço da fonte secundária: {e}")
-            return None
-    
     def _extract_modelo_base(self, modelo_completo: str, marca: str) -> str:
         """Extrai o modelo base da string completa - Exemplo: "QQ 1.0 ACT 12V 69cv 5p" -> "QQ" """
         if not modelo_completo:
@@ -8,6 +8,8 @@ import re
 class WordPressParser(BaseParser):
     """Parser para dados do WordPress/WooCommerce de veículos"""
     
+    content_signature = True
+    
     def can_parse(self, data: Any, url: str) -> bool:
         """Verifica se pode processar dados do WordPress"""
         if not isinstance(data, dict):
@@ -0,0 +1,154 @@
+"""
+Leitura de feeds XML em streaming (iterparse)
+
+Para parsers que declaram "stream_item_path", os itens do feed são entregues um a um,
+já convertidos no mesmo formato de dicionário do xmltodict, e cada elemento é
+descartado depois de convertido - a memória não cresce com o tamanho do feed.
+"""
+
+import io
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+XML_NAMESPACE = "http://www.w3.org/XML/1998/namespace"
+
+class XMLStreamError(ValueError):
+    """Documento que o streaming não consegue entregar (o chamador volta ao parse completo)"""
+    pass
+
+def without_invalid_utf8(content: bytes) -> Optional[bytes]:
+    """
+    Conteúdo sem os bytes fora do utf-8 (mesmo tratamento do fluxo antigo), ou None quando ele já
+    é utf-8 válido. Só é chamado depois de um erro do parser: o caso comum não faz cópia nenhuma.
+    """
+    try:
+        content.decode("utf-8")
+        return None
+    except UnicodeDecodeError:
+        return content.decode("utf-8", errors="ignore").encode("utf-8")
+
+def _new_parser() -> ET.XMLParser:
+    # O encoding é forçado como no xmltodict; os bytes vão direto para o expat
+    return ET.XMLParser(encoding="utf-8")
+
+def _root_tag(content: bytes) -> Optional[str]:
+    for _, elem in ET.iterparse(io.BytesIO(content), events=("start",), parser=_new_parser()):
+        return elem.tag if "}" not in elem.tag else None
+    return None
+
+def xml_root_tag(content: bytes) -> Optional[str]:
+    """Tag da raiz do documento (lê só até o primeiro elemento)"""
+    try:
+        return _root_tag(content)
+    except ET.ParseError:
+        cleaned = without_invalid_utf8(content)
+    if cleaned is None:
+        return None
+    try:
+        return _root_tag(cleaned)
+    except ET.ParseError:
+        return None
+
+class _Converter:
+    """Converte elementos do ElementTree para o formato do xmltodict (chaves @atributo, #text, listas)"""
+
+    def __init__(self):
+        self.prefixes: Dict[str, str] = {XML_NAMESPACE: "xml"}
+        self.declarations: Dict[ET.Element, List[Tuple[str, str]]] = {}
+
+    def name(self, tag: str) -> str:
+        if tag[:1] != "{":
+            return tag
+        uri, local = tag[1:].split("}", 1)
+        prefix = self.prefixes.get(uri, "")
+        return f"{prefix}:{local}" if prefix else local
+
+    def to_dict(self, elem: ET.Element) -> Any:
+        children = list(elem)
+        attributes: Dict[str, Any] = {}
+        for prefix, uri in self.declarations.pop(elem, ()):
+            attributes["@xmlns:" + prefix if prefix else "@xmlns"] = uri
+        for key, value in elem.attrib.items():
+            attributes["@" + self.name(key)] = value
+        text = "".join([elem.text or ""] + [child.tail or "" for child in children]).strip()
+
+        if not children and not attributes:
+            return text or None
+
+        result: Dict[str, Any] = attributes
+        for child in children:
+            key = self.name(child.tag)
+            value = self.to_dict(child)
+            if key in result:
+                if isinstance(result[key], list):
+                    result[key].append(value)
+                else:
+                    result[key] = [result[key], value]
+            else:
+                result[key] = value
+        if text:
+            result["#text"] = text
+        return result
+
+def _iter_items(content: bytes, item_path: Tuple[str, ...], skip: int = 0) -> Iterator[Dict]:
+    """Itens no caminho item_path, a partir do item de índice skip (os anteriores não são convertidos)"""
+    converter = _Converter()
+    pending_ns: List[Tuple[str, str]] = []
+    path: List[str] = []
+    elements: List[ET.Element] = []
+    found = 0
+    for event, item in ET.iterparse(io.BytesIO(content), events=("start-ns", "start", "end"), parser=_new_parser()):
+        if event == "start-ns":
+            prefix, uri = item
+            converter.prefixes[uri] = prefix
+            pending_ns.append((prefix, uri))
+        elif event == "start":
+            if pending_ns:
+                converter.declarations[item] = pending_ns
+                pending_ns = []
+            path.append(converter.name(item.tag))
+            elements.append(item)
+        else:
+            if len(path) == len(item_path):
+                if tuple(path) == item_path:
+                    found += 1
+                    if found > skip:
+                        yield converter.to_dict(item)
+                # Itens já consumidos (e irmãos fora do caminho) saem da árvore
+                item.clear()
+                if len(elements) > 1:
+                    elements[-2].remove(item)
+            path.pop()
+            elements.pop()
+
+def iter_xml_items(content: bytes, item_path: Tuple[str, ...]) -> Iterator[Dict]:
+    """
+    Percorre o documento e entrega cada elemento no caminho item_path
+    (ex.: ("estoque", "veiculo")), liberando-o em seguida.
+    """
+    delivered = 0
+    try:
+        for item in _iter_items(content, item_path):
+            delivered += 1
+            yield item
+    except ET.ParseError as e:
+        cleaned = without_invalid_utf8(content)
+        if cleaned is None:
+            raise XMLStreamError(f"XML inválido para streaming: {e}") from e
+        # Bytes fora do utf-8 são descartados e o documento é lido de novo. Os itens já
+        # entregues estão antes do primeiro byte inválido (não mudam) e não se repetem.
+        try:
+            for item in _iter_items(cleaned, item_path, skip=delivered):
+                delivered += 1
+                yield item
+        except ET.ParseError as e:
+            raise XMLStreamError(f"XML inválido para streaming: {e}") from e
+    if not delivered:
+        raise XMLStreamError(f"Nenhum item '{'/'.join(item_path)}' encontrado no XML")
+
+def stream_data(content: bytes, item_path: Tuple[str, ...]) -> Dict:
+    """Estrutura equivalente à do xmltodict, com os itens como um iterador preguiçoso"""
+    data: Any = iter_xml_items(content, item_path)
+    for tag in reversed(item_path):
+        data = {tag: data}
+    return data
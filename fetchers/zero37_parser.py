@@ -9,6 +9,9 @@ from typing import Dict, List, Any
 class Zero37Parser(BaseParser):
     """Parser para dados da Zero37 (peças de refrigeração)"""
     
+    url_patterns = ("zero37",)
+    content_signature = True
+    
     def can_parse(self, data: Any, url: str) -> bool:
         """Verifica se pode processar dados da Zero37"""
         # Verifica pela URL
@@ -0,0 +1,79 @@
+"""
+Cliente HTTP compartilhado pela coleta dos feeds (xml_fetcher e parsers)
+
+Uma única requests.Session com pool de conexões keep-alive por host, retry com
+backoff para falhas transitórias, transferência comprimida e timeout por fonte.
+"""
+
+import os
+import threading
+from typing import Optional
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# =================== CONFIGURAÇÕES GLOBAIS =======================
+
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", "0.5"))
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+
+# brotli é opcional: só anuncia "br" se o urllib3 conseguir decodificar
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        ACCEPT_ENCODING = "gzip, deflate, br"
+    except ImportError:
+        ACCEPT_ENCODING = "gzip, deflate"
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+def _build_session() -> requests.Session:
+    retry = Retry(
+        total=HTTP_RETRIES,
+        connect=HTTP_RETRIES,
+        read=HTTP_RETRIES,
+        backoff_factor=HTTP_BACKOFF,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"Accept-Encoding": ACCEPT_ENCODING, "Connection": "keep-alive"})
+    return session
+
+def get_session() -> requests.Session:
+    """Sessão única do processo (criada sob demanda)"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+def timeout_for(url: str) -> float:
+    """
+    Timeout da fonte: XML_TIMEOUT_<sufixo> para a URL configurada em XML_URL_<sufixo>
+    (ex.: XML_URL_2 -> XML_TIMEOUT_2); sem configuração específica usa HTTP_TIMEOUT.
+    """
+    for var, val in os.environ.items():
+        if var.startswith("XML_URL") and val == url:
+            custom = os.environ.get("XML_TIMEOUT" + var[len("XML_URL"):])
+            if custom:
+                try:
+                    return float(custom)
+                except ValueError:
+                    print(f"[AVISO] Timeout inválido em XML_TIMEOUT{var[len('XML_URL'):]}: {custom}")
+    return HTTP_TIMEOUT
+
+def get(url: str, timeout: Optional[float] = None, **kwargs) -> requests.Response:
+    """GET pela sessão compartilhada com o timeout da fonte"""
+    return get_session().get(url, timeout=timeout if timeout is not None else timeout_for(url), **kwargs)
@@ -0,0 +1,35 @@
+"""
+Worker de ingestão - coleta os feeds e grava as partições do catálogo fora da API
+
+Uso: INGEST_MODE=worker na API e "python ingest_worker.py" em um processo separado que
+compartilhe o disco com ela: mesmo diretório de trabalho e mesmo CATALOG_DIR (mesma máquina
+ou volume compartilhado; processos de Procfile não servem, cada um tem seu próprio disco).
+Se houver mais de um worker, só o que obtiver o lock de ingestão coleta; os outros ficam de
+reserva.
+"""
+
+import time
+from datetime import datetime
+from apscheduler.schedulers.blocking import BlockingScheduler
+from ingestion import ingest_lock, run_refresh, INGEST_INTERVAL_HOURS, INGEST_LOCK_FILE
+
+# Intervalo entre tentativas de assumir a ingestão quando outro processo detém o lock
+LOCK_RETRY_SECONDS = 30
+
+def main():
+    while not ingest_lock.acquire():
+        print(f"[INFO] Lock de ingestão ({INGEST_LOCK_FILE}) em uso, nova tentativa em {LOCK_RETRY_SECONDS}s")
+        time.sleep(LOCK_RETRY_SECONDS)
+
+    scheduler = BlockingScheduler(timezone="America/Sao_Paulo")
+    scheduler.add_job(run_refresh, "interval", hours=INGEST_INTERVAL_HOURS, next_run_time=datetime.now().astimezone(), max_instances=1)
+    print(f"[INFO] Worker de ingestão iniciado (intervalo de {INGEST_INTERVAL_HOURS}h)")
+    try:
+        scheduler.start()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        ingest_lock.release()
+
+if __name__ == "__main__":
+    main()
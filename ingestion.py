@@ -0,0 +1,124 @@
+"""
+Ingestão dos feeds - atualização do catálogo fora do caminho das requisições
+
+Só um processo por vez atualiza os dados: quem detém o lock de ingestão (fcntl.flock em
+INGEST_LOCK_FILE) é o líder e o mantém enquanto estiver vivo; se ele morrer, o sistema
+operacional libera o lock e a próxima tentativa de outro processo assume.
+
+INGEST_MODE define onde a coleta roda:
+- "embedded" (padrão): dentro da API, em segundo plano; entre vários workers do uvicorn,
+  só o líder coleta e os demais passam à nova geração do snapshot publicada.
+- "worker": a API apenas lê as partições; a coleta fica com o ingest_worker.py.
+  Os dois processos precisam compartilhar o disco: o mesmo diretório de trabalho (status
+  e lock) e o mesmo CATALOG_DIR, ou seja, a mesma máquina ou um volume compartilhado.
+  Plataformas de Procfile dão a cada processo um sistema de arquivos próprio, por isso o
+  Procfile só declara a API, no modo embedded.
+"""
+
+import json
+import os
+from datetime import datetime
+from typing import Dict, Optional
+from atomic_file import atomic_write
+from catalog import partition_kind, PARTITION_EMPREENDIMENTOS
+from xml_fetcher import fetch_and_convert_xml
+
+# fcntl só existe em sistemas POSIX; sem ele não há exclusão entre processos
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# =================== CONFIGURAÇÕES GLOBAIS =======================
+
+STATUS_FILE = "last_update_status.json"
+INGEST_MODE = os.getenv("INGEST_MODE", "embedded").strip().lower()
+INGEST_LOCK_FILE = os.getenv("INGEST_LOCK_FILE", "ingest.lock")
+INGEST_INTERVAL_HOURS = float(os.getenv("INGEST_INTERVAL_HOURS", "2"))
+
+# =================== STATUS DA ATUALIZAÇÃO =======================
+
+def save_update_status(success: bool, message: str = "", vehicle_count: int = 0):
+    status = {"timestamp": datetime.now().isoformat(), "success": success, "message": message, "vehicle_count": vehicle_count}
+    try:
+        atomic_write(STATUS_FILE, json.dumps(status, ensure_ascii=False, indent=2).encode("utf-8"))
+    except Exception as e:
+        print(f"Erro ao salvar status: {e}")
+
+def get_update_status() -> Dict:
+    try:
+        if os.path.exists(STATUS_FILE):
+            with open(STATUS_FILE, "r", encoding="utf-8") as f:
+                return json.load(f)
+    except Exception as e:
+        print(f"Erro ao ler status: {e}")
+    return {"timestamp": None, "success": False, "message": "Nenhuma atualização registrada", "vehicle_count": 0}
+
+# =================== LOCK DE INGESTÃO =======================
+
+class IngestLock:
+    """Lock exclusivo e não bloqueante; uma vez obtido, fica com o processo até ele terminar"""
+
+    def __init__(self, path: str = INGEST_LOCK_FILE):
+        self.path = path
+        self._file = None
+
+    @property
+    def held(self) -> bool:
+        return self._file is not None
+
+    def acquire(self) -> bool:
+        if self._file is not None:
+            return True
+        if fcntl is None:
+            print("[AVISO] fcntl indisponível: ingestão sem exclusão entre processos")
+            self._file = open(self.path, "a+")
+            return True
+        lock_file = open(self.path, "a+")
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(str(os.getpid()))
+        lock_file.flush()
+        self._file = lock_file
+        print(f"[INFO] Processo {os.getpid()} assumiu a ingestão ({self.path})")
+        return True
+
+    def release(self):
+        if self._file is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
+
+ingest_lock = IngestLock()
+
+# =================== ATUALIZAÇÃO =======================
+
+def run_refresh() -> Optional[Dict]:
+    """
+    Coleta todas as fontes e grava os arquivos do catálogo, se este processo for o líder.
+    Retorna o resultado da coleta, ou None quando outro processo está com a ingestão ou a coleta falhou.
+    """
+    if not ingest_lock.acquire():
+        print("[INFO] Ingestão a cargo de outro processo, aguardando as partições gravadas")
+        return None
+    try:
+        print("Iniciando atualização dos dados...")
+        result = fetch_and_convert_xml()
+        empreendimentos_count = sum(
+            1 for v in (result or {}).get("veiculos", []) if partition_kind(v) == PARTITION_EMPREENDIMENTOS
+        )
+        save_update_status(True, "Dados atualizados com sucesso", empreendimentos_count)
+        print(f"Atualização concluída: {empreendimentos_count} empreendimentos carregados")
+        return result
+    except Exception as e:
+        error_message = f"Erro na atualização: {str(e)}"
+        save_update_status(False, error_message)
+        print(error_message)
+        return None
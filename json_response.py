@@ -0,0 +1,95 @@
+"""
+Serialização das respostas da API
+
+As respostas passam por um codificador plugável: orjson quando instalado (bem mais rápido
+em listas grandes, como /api/data sem filtros) e o json da biblioteca padrão caso contrário,
+com a mesma saída compacta do JSONResponse do Starlette. JSON_ENCODER força um deles.
+
+Registros do catálogo podem ser serializados uma única vez e reaproveitados como
+fragmentos: a lista de resultados é montada concatenando os bytes já prontos. Payloads
+pré-calculados saem com ETag, e o cliente pode revalidar com If-None-Match (304).
+"""
+
+import hashlib
+import json
+import os
+from typing import Any, Callable, Dict, Iterable, Optional
+from fastapi.responses import JSONResponse, Response
+
+# orjson é opcional; sem ele as respostas usam o json da biblioteca padrão
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# =================== CONFIGURAÇÕES GLOBAIS =======================
+
+JSON_ENCODER = os.getenv("JSON_ENCODER", "orjson" if orjson is not None else "json").strip().lower()
+
+# =================== CODIFICADORES =======================
+
+def _stdlib_dumps(content: Any) -> bytes:
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+def _orjson_dumps(content: Any) -> bytes:
+    try:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    except TypeError:
+        # orjson.JSONEncodeError (subclasse de TypeError): inteiros acima de 64 bits, tipos não suportados
+        return _stdlib_dumps(content)
+
+ENCODERS: Dict[str, Callable[[Any], bytes]] = {"json": _stdlib_dumps}
+if orjson is not None:
+    ENCODERS["orjson"] = _orjson_dumps
+
+def get_encoder(name: str) -> Callable[[Any], bytes]:
+    """Codificador pelo nome; um nome desconhecido (ou orjson ausente) cai no json padrão"""
+    if name not in ENCODERS:
+        print(f"[AVISO] Codificador JSON '{name}' indisponível, usando json da biblioteca padrão")
+        return _stdlib_dumps
+    return ENCODERS[name]
+
+# Definido na importação: fragmentos em cache e respostas usam sempre o mesmo codificador
+dumps = get_encoder(JSON_ENCODER)
+
+# =================== RESPOSTAS =======================
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse serializado pelo codificador configurado"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def dumps_with_fragments(list_key: str, fragments: Iterable[bytes], extra: Optional[Dict[str, Any]] = None) -> bytes:
+    """{list_key: [fragmentos...], **extra} sem reserializar os fragmentos já prontos"""
+    body = b"{" + dumps(list_key) + b":[" + b",".join(fragments) + b"]"
+    if extra:
+        return body + b"," + dumps(extra)[1:]
+    return body + b"}"
+
+def fragment_response(list_key: str, fragments: Iterable[bytes], extra: Optional[Dict[str, Any]] = None, status_code: int = 200) -> Response:
+    return Response(content=dumps_with_fragments(list_key, fragments, extra), status_code=status_code, media_type="application/json")
+
+# =================== ETAG =======================
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match aceita uma lista de ETags (fracos ou fortes) ou "*" """
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == "*" or tag == etag:
+            return True
+    return False
+
+def etag_response(body: bytes, etag: str, if_none_match: Optional[str] = None) -> Response:
+    """Resposta JSON já serializada com ETag; 304 sem corpo quando o cliente já tem essa versão"""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,115 @@
+"""
+Listagem de empreendimentos em CSV (/list) pré-calculada por geração do catálogo
+
+A saída só muda quando o catálogo é atualizado, então cada partição publicada ganha, uma
+única vez, a linha CSV de cada empreendimento (já serializada em JSON), índices das linhas
+por segmento e por tipo e o payload completo sem filtros. As chamadas filtradas só
+consultam os índices e concatenam os fragmentos prontos.
+"""
+
+import threading
+from typing import Dict, List, Optional, Tuple
+from catalog import CatalogPartition
+from json_response import dumps, make_etag
+
+INSTRUCTION_TEXT = (
+    "### COMO LER O CSV de Empreendimentos (CRUCIAL — leia cada linha com atenção)\n"
+    "id_cv, empreendimento, endereco, bairro, cidade, tipo, segmento, metragem, quartos\n\n"
+    "Exemplo: 56,Residencial Porto Essenza,Rua Henrique Schneider 115,Sarandi,Porto Alegre,apartamento,medio_padrao,91m²,2"
+)
+
+NAO_MAPEADOS = "NÃO MAPEADOS"
+
+CSV_FIELDS = ["id_cv", "empreendimento", "endereco", "bairro", "cidade", "tipo", "segmento", "metragem", "quartos"]
+
+def format_empreendimento(emp: Dict) -> str:
+    def safe_value(value):
+        if value is None or value == "":
+            return ""
+        return str(value)
+
+    return ",".join(safe_value(emp.get(field)) for field in CSV_FIELDS)
+
+def _value_rows(values: List) -> Dict[str, List[int]]:
+    """Linhas de cada valor distinto (só valores de texto não vazios, os únicos que o filtro aceita)"""
+    index: Dict[str, List[int]] = {}
+    for row, value in enumerate(values):
+        if value and isinstance(value, str):
+            index.setdefault(value, []).append(row)
+    return index
+
+def _group_key(segmento) -> str:
+    if not segmento or segmento in ("", "None", None):
+        return NAO_MAPEADOS
+    return segmento if isinstance(segmento, str) else str(segmento)
+
+class EmpreendimentoListing:
+    """Linhas CSV, índices por segmento/tipo e payload sem filtros de uma partição de empreendimentos"""
+
+    def __init__(self, partition: CatalogPartition):
+        self.version = partition.version
+        records = partition.records
+        self.csv_fragments = [dumps(format_empreendimento(records[row])) for row in range(len(records))]
+        segmentos = partition.column("segmento")
+        # Grupo de cada linha na resposta (segmento ou NÃO MAPEADOS); chaves de objeto JSON são sempre texto
+        self.groups = [_group_key(segmento) for segmento in segmentos]
+        self.segmento_rows = _value_rows(segmentos)
+        self.tipo_rows = _value_rows(partition.column("tipo"))
+        self.payload = self._render(range(len(records)))
+        self.etag = make_etag(self.payload)
+
+    def _matching_rows(self, index: Dict[str, List[int]], term: str) -> set:
+        """Filtro por trecho (sem diferenciar maiúsculas) aplicado aos valores distintos, não às linhas"""
+        term = term.lower()
+        rows: set = set()
+        for value, value_rows in index.items():
+            if term in value.lower():
+                rows.update(value_rows)
+        return rows
+
+    def rows(self, filter_segmento: Optional[str], filter_tipo: Optional[str]) -> List[int]:
+        selected: Optional[set] = None
+        if filter_segmento:
+            selected = self._matching_rows(self.segmento_rows, filter_segmento)
+        if filter_tipo:
+            tipo_rows = self._matching_rows(self.tipo_rows, filter_tipo)
+            selected = tipo_rows if selected is None else selected & tipo_rows
+        if selected is None:
+            return list(range(len(self.groups)))
+        return sorted(selected)
+
+    def _render(self, rows) -> bytes:
+        grouped: Dict[str, List[bytes]] = {}
+        for row in rows:
+            grouped.setdefault(self.groups[row], []).append(self.csv_fragments[row])
+        nao_mapeados = grouped.pop(NAO_MAPEADOS, None)
+        parts = [dumps("instruction") + b":" + dumps(INSTRUCTION_TEXT)]
+        for segmento in sorted(grouped.keys()):
+            parts.append(dumps(segmento) + b":[" + b",".join(grouped[segmento]) + b"]")
+        if nao_mapeados:
+            parts.append(dumps(NAO_MAPEADOS) + b":[" + b",".join(nao_mapeados) + b"]")
+        return b"{" + b",".join(parts) + b"}"
+
+    def render(self, filter_segmento: Optional[str], filter_tipo: Optional[str]) -> Tuple[bytes, str]:
+        """Bytes da resposta de /list e o ETag correspondente"""
+        if not filter_segmento and not filter_tipo:
+            return self.payload, self.etag
+        payload = self._render(self.rows(filter_segmento, filter_tipo))
+        return payload, make_etag(payload)
+
+# Listagem da partição publicada atualmente (recalculada quando a versão da partição muda)
+_current: Optional[EmpreendimentoListing] = None
+_lock = threading.Lock()
+
+def listing_for(partition: CatalogPartition) -> EmpreendimentoListing:
+    global _current
+    listing = _current
+    if listing is not None and listing.version == partition.version:
+        return listing
+    with _lock:
+        listing = _current
+        if listing is None or listing.version != partition.version:
+            listing = EmpreendimentoListing(partition)
+            if _current is None or _current.version < partition.version:
+                _current = listing
+        return listing
@@ -1,19 +1,25 @@
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
 from unidecode import unidecode
 from rapidfuzz import fuzz
 from apscheduler.schedulers.background import BackgroundScheduler
-from xml_fetcher import fetch_and_convert_xml
-from vehicle_mappings import MAPEAMENTO_CATEGORIAS, MAPEAMENTO_MOTOS
+from ingestion import run_refresh, get_update_status, INGEST_MODE, INGEST_INTERVAL_HOURS
+from catalog import (
+    catalog_store, convert_price, convert_year, convert_km, convert_cc,
+    CatalogPartition, SubstringIndex, MODEL_INDEX_FIELDS, PARTITION_EMPREENDIMENTOS, PARTITION_ZERO37,
+    read_snapshot_pointer, current_snapshot_path
+)
+from query_cache import search_cache, canonical_params
+from model_matchers import moto_lookup, category_lookup
+from text_utils import normalize_search_text
+from json_response import FastJSONResponse, dumps, fragment_response, etag_response
+from listing import listing_for
 import json
 import os
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass
+from typing import Dict, List, Optional, Any, Tuple, Set
+from dataclasses import dataclass, field
 
-app = FastAPI()
-
-STATUS_FILE = "last_update_status.json"
+app = FastAPI(default_response_class=FastJSONResponse)
 
 FALLBACK_PRIORITY = [
     "motor", "portas", "cor", "combustivel", "opcionais", "cambio",
@@ -68,68 +74,40 @@ class SearchResult:
     total_found: int
     fallback_info: Dict[str, Any]
     removed_filters: List[str]
+    # Linhas da partição correspondentes a vehicles (para os fragmentos JSON em cache)
+    rows: List[int] = field(default_factory=list)
 
 class VehicleSearchEngine:
     def __init__(self):
         self.exact_fields = ["tipo", "marca", "cambio", "motor", "portas"]
 
-    def _any_csv_value_matches(self, raw_val: str, field_val: str, vehicle_type: str, word_matcher):
-        if not raw_val:
+    def _prepare_query(self, raw_val: str) -> List[List[str]]:
+        """Normaliza uma única vez as palavras de cada valor (separado por vírgula) do filtro"""
+        return [[self.normalize_text(w) for w in val.split()] for val in self.split_multi_value(raw_val)]
+
+    def _any_query_matches(self, queries: List[List[str]], normalized_content: Optional[str], vehicle_type: str, word_matcher) -> bool:
+        if normalized_content is None:
             return False
-        for val in self.split_multi_value(raw_val):
-            words = val.split()
-            ok, _ = word_matcher(words, field_val, vehicle_type)
+        for normalized_words in queries:
+            ok, _ = word_matcher(normalized_words, normalized_content, vehicle_type)
             if ok:
                 return True
         return False
 
     def normalize_text(self, text: str) -> str:
-        if not text:
-            return ""
-        return unidecode(str(text)).lower().replace("-", "").replace(" ", "").strip()
+        return normalize_search_text(text)
 
     def convert_price(self, price_str: Any) -> Optional[float]:
-        if not price_str:
-            return None
-        try:
-            if isinstance(price_str, (int, float)):
-                return float(price_str)
-            cleaned = str(price_str).replace(",", "").replace("R$", "").replace(".", "").strip()
-            return float(cleaned) / 100 if len(cleaned) > 2 else float(cleaned)
-        except (ValueError, TypeError):
-            return None
+        return convert_price(price_str)
 
     def convert_year(self, year_str: Any) -> Optional[int]:
-        if not year_str:
-            return None
-        try:
-            cleaned = str(year_str).strip().replace('\n', '').replace('\r', '').replace(' ', '')
-            return int(cleaned)
-        except (ValueError, TypeError):
-            return None
+        return convert_year(year_str)
 
     def convert_km(self, km_str: Any) -> Optional[int]:
-        if not km_str:
-            return None
-        try:
-            cleaned = str(km_str).replace(".", "").replace(",", "").strip()
-            return int(cleaned)
-        except (ValueError, TypeError):
-            return None
+        return convert_km(km_str)
 
     def convert_cc(self, cc_str: Any) -> Optional[float]:
-        if not cc_str:
-            return None
-        try:
-            if isinstance(cc_str, (int, float)):
-                return float(cc_str)
-            cleaned = str(cc_str).replace(",", ".").replace("L", "").replace("l", "").strip()
-            value = float(cleaned)
-            if value < 10:
-                return value * 1000
-            return value
-        except (ValueError, TypeError):
-            return None
+        return convert_cc(cc_str)
 
     def get_max_value_from_range_param(self, param_value: str) -> str:
         if not param_value:
@@ -148,51 +126,34 @@ class VehicleSearchEngine:
             return None
         normalized_model = self.normalize_text(model)
 
-        if normalized_model in MAPEAMENTO_MOTOS:
-            _, category = MAPEAMENTO_MOTOS[normalized_model]
+        match = moto_lookup.lookup(normalized_model, fuzzy=False)
+        if match:
+            _, category = moto_lookup.values[match[1]]
             return category
 
-        model_words = normalized_model.split()
-        for word in model_words:
-            if len(word) >= 3 and word in MAPEAMENTO_MOTOS:
-                _, category = MAPEAMENTO_MOTOS[word]
-                return category
-
-        for key, (_, category) in MAPEAMENTO_MOTOS.items():
-            if key in normalized_model or normalized_model in key:
-                return category
-
-        if normalized_model in MAPEAMENTO_CATEGORIAS:
-            return MAPEAMENTO_CATEGORIAS[normalized_model]
-
-        for word in model_words:
-            if len(word) >= 3 and word in MAPEAMENTO_CATEGORIAS:
-                return MAPEAMENTO_CATEGORIAS[word]
-
-        for key, category in MAPEAMENTO_CATEGORIAS.items():
-            if key in normalized_model or normalized_model in key:
-                return category
+        match = category_lookup.lookup(normalized_model, fuzzy=False)
+        if match:
+            return category_lookup.values[match[1]]
 
         return None
 
     def exact_match(self, query_words: List[str], field_content: str) -> Tuple[bool, str]:
         if not query_words or not field_content:
             return False, "empty_input"
-        normalized_content = self.normalize_text(field_content)
-        for word in query_words:
-            normalized_word = self.normalize_text(word)
+        return self._exact_match_normalized([self.normalize_text(w) for w in query_words], self.normalize_text(field_content))
+
+    def _exact_match_normalized(self, normalized_words: List[str], normalized_content: str) -> Tuple[bool, str]:
+        for normalized_word in normalized_words:
             if len(normalized_word) < 2:
                 continue
             if normalized_word not in normalized_content:
                 return False, f"exact_miss: '{normalized_word}' não encontrado"
         return True, f"exact_match: todas as palavras encontradas"
 
-    def _fuzzy_match_all_words(self, query_words: List[str], field_content: str, fuzzy_threshold: int) -> Tuple[bool, str]:
-        normalized_content = self.normalize_text(field_content)
+    def _fuzzy_match_all_words(self, normalized_words: List[str], normalized_content: str, fuzzy_threshold: int) -> Tuple[bool, str]:
         matched_words = []
         match_details = []
-        for word in query_words:
-            normalized_word = self.normalize_text(word)
+        for normalized_word in normalized_words:
             if len(normalized_word) < 2:
                 continue
             word_matched = False
@@ -226,14 +187,12 @@ class VehicleSearchEngine:
                     word_matched = True
             if not word_matched:
                 return False, f"moto_strict: palavra '{normalized_word}' não encontrada"
-        if len(matched_words) >= len([w for w in query_words if len(self.normalize_text(w)) >= 2]):
+        if len(matched_words) >= len([w for w in normalized_words if len(w) >= 2]):
             return True, f"moto_all_match: {', '.join(match_details)}"
         return False, "moto_strict: nem todas as palavras encontradas"
 
-    def _fuzzy_match_any_word(self, query_words: List[str], field_content: str, fuzzy_threshold: int) -> Tuple[bool, str]:
-        normalized_content = self.normalize_text(field_content)
-        for word in query_words:
-            normalized_word = self.normalize_text(word)
+    def _fuzzy_match_any_word(self, normalized_words: List[str], normalized_content: str, fuzzy_threshold: int) -> Tuple[bool, str]:
+        for normalized_word in normalized_words:
             if len(normalized_word) < 2:
                 continue
             if normalized_word in normalized_content:
@@ -256,17 +215,29 @@ class VehicleSearchEngine:
     def fuzzy_match(self, query_words: List[str], field_content: str, vehicle_type: str = None) -> Tuple[bool, str]:
         if not query_words or not field_content:
             return False, "empty_input"
+        return self._fuzzy_match_normalized([self.normalize_text(w) for w in query_words], self.normalize_text(field_content), vehicle_type)
+
+    def _fuzzy_match_normalized(self, normalized_words: List[str], normalized_content: str, vehicle_type: str = None) -> Tuple[bool, str]:
+        if not normalized_words:
+            return False, "empty_input"
         fuzzy_threshold = 98 if vehicle_type == "moto" else 90
         if vehicle_type == "moto":
-            return self._fuzzy_match_all_words(query_words, field_content, fuzzy_threshold)
+            return self._fuzzy_match_all_words(normalized_words, normalized_content, fuzzy_threshold)
         else:
-            return self._fuzzy_match_any_word(query_words, field_content, fuzzy_threshold)
+            return self._fuzzy_match_any_word(normalized_words, normalized_content, fuzzy_threshold)
 
     def model_match(self, query_words: List[str], field_content: str, vehicle_type: str = None) -> Tuple[bool, str]:
-        exact_result, exact_reason = self.exact_match(query_words, field_content)
+        if not query_words or not field_content:
+            return False, "NO_MATCH: exact(empty_input) + fuzzy(empty_input)"
+        return self._model_match_normalized([self.normalize_text(w) for w in query_words], self.normalize_text(field_content), vehicle_type)
+
+    def _model_match_normalized(self, normalized_words: List[str], normalized_content: str, vehicle_type: str = None) -> Tuple[bool, str]:
+        if not normalized_words:
+            return False, "NO_MATCH: exact(empty_input) + fuzzy(empty_input)"
+        exact_result, exact_reason = self._exact_match_normalized(normalized_words, normalized_content)
         if exact_result:
             return True, f"EXACT: {exact_reason}"
-        fuzzy_result, fuzzy_reason = self.fuzzy_match(query_words, field_content, vehicle_type)
+        fuzzy_result, fuzzy_reason = self._fuzzy_match_normalized(normalized_words, normalized_content, vehicle_type)
         if fuzzy_result:
             return True, f"FUZZY: {fuzzy_reason}"
         return False, f"NO_MATCH: exact({exact_reason}) + fuzzy({fuzzy_reason})"
@@ -290,91 +261,195 @@ class VehicleSearchEngine:
             return []
         return [v.strip() for v in str(value).split(',') if v.strip()]
 
-    def apply_filters(self, vehicles: List[Dict], filters: Dict[str, str]) -> List[Dict]:
-        if not filters:
-            return vehicles
-        filtered_vehicles = list(vehicles)
+    def apply_filters(self, partition: CatalogPartition, filters: Dict[str, str], rows: Optional[List[int]] = None) -> List[int]:
+        """Aplica os filtros de texto e retorna os índices dos registros (na ordem original)"""
+        matched = self._match_filters(partition, filters, {})
+        if rows is None:
+            return sorted(matched) if matched is not None else list(range(len(partition)))
+        return list(rows) if matched is None else [i for i in rows if i in matched]
+
+    def _match_filters(self, partition: CatalogPartition, filters: Dict[str, str], cache: Dict) -> Optional[Set[int]]:
+        """
+        Interseção das linhas que atendem cada filtro (None quando nenhum filtro restringe).
+        Cada filtro é avaliado uma única vez sobre a partição inteira e guardado no cache
+        da requisição, então os passos do fallback só refazem interseções.
+        """
+        matched_sets = []
         for filter_key, filter_value in filters.items():
-            if not filter_value or not filtered_vehicles:
-                continue
-            if filter_key == "modelo":
-                def matches(v):
-                    vt = v.get("tipo", "")
-                    for field in ["modelo", "titulo", "versao"]:
-                        fv = str(v.get(field, ""))
-                        if self._any_csv_value_matches(filter_value, fv, vt, self.model_match):
-                            return True
-                    return False
-                filtered_vehicles = [v for v in filtered_vehicles if matches(v)]
-            elif filter_key in ["cor", "categoria", "opcionais", "combustivel"]:
-                def matches(v):
-                    vt = v.get("tipo", "")
-                    fv = str(v.get(filter_key, ""))
-                    return self._any_csv_value_matches(filter_value, fv, vt, self.fuzzy_match)
-                filtered_vehicles = [v for v in filtered_vehicles if matches(v)]
-            elif filter_key in self.exact_fields:
-                normalized_vals = [self.normalize_text(v) for v in self.split_multi_value(filter_value)]
-                filtered_vehicles = [
-                    v for v in filtered_vehicles
-                    if self.normalize_text(str(v.get(filter_key, ""))) in normalized_vals
-                ]
-        return filtered_vehicles
-
-    def apply_range_filters(self, vehicles: List[Dict], valormax: Optional[str], anomax: Optional[str], kmmax: Optional[str], ccmax: Optional[str]) -> List[Dict]:
-        filtered_vehicles = list(vehicles)
+            cache_key = (filter_key, filter_value)
+            if cache_key not in cache:
+                cache[cache_key] = self._filter_rows(partition, filter_key, filter_value)
+            if cache[cache_key] is not None:
+                matched_sets.append(cache[cache_key])
+        if not matched_sets:
+            return None
+        matched_sets.sort(key=len)
+        return matched_sets[0].intersection(*matched_sets[1:])
+
+    def _filter_rows(self, partition: CatalogPartition, filter_key: str, filter_value: str) -> Optional[Set[int]]:
+        """Linhas da partição que atendem um único filtro (None se o filtro for ignorado)"""
+        if not filter_value:
+            return None
+        if filter_key == "modelo":
+            return self._filter_model(partition, filter_value)
+        if filter_key in ["cor", "categoria", "opcionais", "combustivel"]:
+            queries = self._prepare_query(filter_value)
+            index = partition.value_index(filter_key)
+            moto_rows = partition.moto_rows
+            matched: Set[int] = set()
+            for value_id, content in enumerate(index.values):
+                value_rows = index.rows_by_value[value_id]
+                other_ok = self._any_query_matches(queries, content, "", self._fuzzy_match_normalized)
+                moto_ok = self._any_query_matches(queries, content, "moto", self._fuzzy_match_normalized)
+                if other_ok and moto_ok:
+                    matched.update(value_rows)
+                elif other_ok or moto_ok:
+                    matched.update(i for i in value_rows if (i in moto_rows) == moto_ok)
+            return matched
+        if filter_key in self.exact_fields:
+            normalized_vals = [self.normalize_text(v) for v in self.split_multi_value(filter_value)]
+            index = partition.value_index(filter_key)
+            matched = set(index.rows(index.ids[v] for v in set(normalized_vals) if v in index.ids))
+            if "" in normalized_vals:
+                matched.update(index.empty_rows)
+            return matched
+        return None
+
+    def apply_range_filters(self, partition: CatalogPartition, rows: List[int], valormax: Optional[str], anomax: Optional[str], kmmax: Optional[str], ccmax: Optional[str]) -> List[int]:
+        """Filtros de faixa sobre as colunas numéricas (valores ausentes são MISSING e nunca passam)"""
+        filtered_rows = list(rows)
         if anomax:
             try:
                 max_year = int(anomax)
-                filtered_vehicles = [
-                    v for v in filtered_vehicles
-                    if self.convert_year(v.get("ano")) is not None and self.convert_year(v.get("ano")) <= max_year
-                ]
+                years = partition.numeric_column("ano")
+                filtered_rows = [i for i in filtered_rows if years[i] <= max_year]
             except ValueError:
                 pass
         if kmmax:
             try:
                 max_km = int(kmmax)
-                filtered_vehicles = [
-                    v for v in filtered_vehicles
-                    if self.convert_km(v.get("km")) is not None and self.convert_km(v.get("km")) <= max_km
-                ]
+                kms = partition.numeric_column("km")
+                filtered_rows = [i for i in filtered_rows if kms[i] <= max_km]
             except ValueError:
                 pass
-        return filtered_vehicles
+        return filtered_rows
 
-    def sort_vehicles(self, vehicles: List[Dict], valormax: Optional[str], anomax: Optional[str], kmmax: Optional[str], ccmax: Optional[str]) -> List[Dict]:
-        if not vehicles:
-            return vehicles
+    def sort_vehicles(self, partition: CatalogPartition, rows: List[int], valormax: Optional[str], anomax: Optional[str], kmmax: Optional[str], ccmax: Optional[str]) -> List[int]:
+        """Ordena as linhas pelas chaves pré-calculadas da partição (a ordenação é estável)"""
+        if not rows:
+            return rows
         if ccmax:
             try:
                 target_cc = float(ccmax)
                 if target_cc < 10:
                     target_cc *= 1000
-                return sorted(vehicles, key=lambda v: abs((self.convert_cc(v.get("cilindrada")) or 0) - target_cc))
+                ccs = partition.sort_column("cilindrada")
+                return sorted(rows, key=lambda i: abs(ccs[i] - target_cc))
             except ValueError:
                 pass
         if valormax:
             try:
                 target_price = float(valormax)
-                return sorted(vehicles, key=lambda v: abs((self.convert_price(v.get("preco")) or 0) - target_price))
+                prices = partition.sort_column("preco")
+                return sorted(rows, key=lambda i: abs(prices[i] - target_price))
             except ValueError:
                 pass
         if kmmax:
-            return sorted(vehicles, key=lambda v: self.convert_km(v.get("km")) or float('inf'))
+            return sorted(rows, key=partition.sort_column("km").__getitem__)
         if anomax:
-            return sorted(vehicles, key=lambda v: self.convert_year(v.get("ano")) or 0, reverse=True)
-        return sorted(vehicles, key=lambda v: self.convert_price(v.get("preco")) or 0, reverse=True)
-
-    def search_with_fallback(self, vehicles: List[Dict], filters: Dict[str, str], valormax: Optional[str], anomax: Optional[str], kmmax: Optional[str], ccmax: Optional[str], excluded_ids: set) -> SearchResult:
-        filtered_vehicles = self.apply_filters(vehicles, filters)
-        filtered_vehicles = self.apply_range_filters(filtered_vehicles, valormax, anomax, kmmax, ccmax)
-
-        if excluded_ids:
-            filtered_vehicles = [v for v in filtered_vehicles if str(v.get("id")) not in excluded_ids]
-
-        if filtered_vehicles:
-            sorted_vehicles = self.sort_vehicles(filtered_vehicles, valormax, anomax, kmmax, ccmax)
-            return SearchResult(vehicles=sorted_vehicles[:6], total_found=len(sorted_vehicles), fallback_info={}, removed_filters=[])
+            return sorted(rows, key=partition.sort_column("ano").__getitem__, reverse=True)
+        return sorted(rows, key=partition.sort_column("preco").__getitem__, reverse=True)
+
+    def _match_model_values(self, index: SubstringIndex, normalized_words: List[str]) -> Tuple[Set[int], Set[int]]:
+        """
+        Resolve um valor do filtro "modelo" sobre os valores distintos de um campo.
+        Retorna (ids com match exato, ids com match aproximado). O match aproximado
+        vale apenas para veículos que não são motos; para motos ele equivale ao exato.
+        """
+        long_words = [w for w in normalized_words if len(w) >= 2]
+        if not long_words:
+            return set(range(len(index.values))), set()
+        containing = [index.containing(w) for w in long_words]
+        exact_ids = set.intersection(*containing)
+        loose_ids = set.union(*containing)
+        fuzzy_words = [w for w in long_words if len(w) >= 3]
+        if fuzzy_words:
+            for value_id, content in enumerate(index.values):
+                if value_id in loose_ids:
+                    continue
+                for word in fuzzy_words:
+                    if fuzz.partial_ratio(content, word) >= 90 or fuzz.ratio(content, word) >= 90:
+                        loose_ids.add(value_id)
+                        break
+        return exact_ids, loose_ids
+
+    def _filter_model(self, partition: CatalogPartition, filter_value: str) -> Set[int]:
+        """
+        Filtro "modelo" via índice invertido: o índice gera os candidatos de match exato,
+        prefixo e substring, e o RapidFuzz só pontua os valores que sobraram.
+        """
+        queries = self._prepare_query(filter_value)
+        moto_rows = partition.moto_rows
+        matched: Set[int] = set()
+        for field in MODEL_INDEX_FIELDS:
+            index = partition.value_index(field)
+            exact_ids: Set[int] = set()
+            loose_ids: Set[int] = set()
+            for normalized_words in queries:
+                e, l = self._match_model_values(index, normalized_words)
+                exact_ids |= e
+                loose_ids |= l
+            matched.update(index.rows(exact_ids))
+            matched.update(i for i in index.rows(loose_ids - exact_ids) if i not in moto_rows)
+        return matched
+
+    def _range_rows(self, partition: CatalogPartition, field: str, limit: int, cache: Dict) -> Set[int]:
+        """Linhas com o campo numérico preenchido e menor ou igual ao limite"""
+        cache_key = (field, limit)
+        if cache_key not in cache:
+            column = partition.numeric_column(field)
+            cache[cache_key] = {i for i in range(len(column)) if column[i] <= limit}
+        return cache[cache_key]
+
+    def _candidate_rows(self, partition: CatalogPartition, filters: Dict[str, str], anomax: Optional[str], kmmax: Optional[str], excluded_rows: Set[int], cache: Dict) -> List[int]:
+        """Combina filtros de texto, faixas de ano/km e exclusões usando apenas interseções"""
+        sets = []
+        matched = self._match_filters(partition, filters, cache)
+        if matched is not None:
+            sets.append(matched)
+        for field, raw_limit in (("ano", anomax), ("km", kmmax)):
+            if raw_limit:
+                try:
+                    sets.append(self._range_rows(partition, field, int(raw_limit), cache))
+                except ValueError:
+                    pass
+        if sets:
+            sets.sort(key=len)
+            rows = sets[0].intersection(*sets[1:])
+        else:
+            rows = set(range(len(partition)))
+        return sorted(rows - excluded_rows)
+
+    def _excluded_rows(self, partition: CatalogPartition, excluded_ids: set) -> Set[int]:
+        if not excluded_ids:
+            return set()
+        ids = partition.ids
+        return {i for i in range(len(ids)) if ids[i] in excluded_ids}
+
+    def _result(self, partition: CatalogPartition, sorted_rows: List[int], removed_filters: List[str]) -> SearchResult:
+        records = partition.records
+        fallback_info = {"fallback": {"removed_filters": removed_filters}} if removed_filters else {}
+        rows = sorted_rows[:6]
+        return SearchResult(vehicles=[records[i] for i in rows], total_found=len(sorted_rows), fallback_info=fallback_info, removed_filters=removed_filters, rows=rows)
+
+    def search_with_fallback(self, partition: CatalogPartition, filters: Dict[str, str], valormax: Optional[str], anomax: Optional[str], kmmax: Optional[str], ccmax: Optional[str], excluded_ids: set) -> SearchResult:
+        cache: Dict = {}
+        excluded_rows = self._excluded_rows(partition, excluded_ids)
+        filtered_rows = self._candidate_rows(partition, filters, anomax, kmmax, excluded_rows, cache)
+
+        if filtered_rows:
+            sorted_rows = self.sort_vehicles(partition, filtered_rows, valormax, anomax, kmmax, ccmax)
+            return self._result(partition, sorted_rows, [])
 
         current_filters = dict(filters)
         removed_filters = []
@@ -385,17 +460,17 @@ class VehicleSearchEngine:
 
         for filter_to_remove in FALLBACK_PRIORITY:
             if filter_to_remove == "KmMax" and current_kmmax:
-                test_vehicles = self.apply_filters(vehicles, current_filters)
-                vehicles_within_km_limit = [v for v in test_vehicles if self.convert_km(v.get("km")) is not None and self.convert_km(v.get("km")) <= int(current_kmmax)]
-                if not vehicles_within_km_limit:
+                km_rows = self._range_rows(partition, "km", int(current_kmmax), cache)
+                test_rows = self._match_filters(partition, current_filters, cache)
+                if not (km_rows if test_rows is None else test_rows & km_rows):
                     current_kmmax = None
                     removed_filters.append("KmMax")
                 else:
                     continue
             elif filter_to_remove == "AnoMax" and current_anomax:
-                test_vehicles = self.apply_filters(vehicles, current_filters)
-                vehicles_within_year_limit = [v for v in test_vehicles if self.convert_year(v.get("ano")) is not None and self.convert_year(v.get("ano")) <= int(current_anomax)]
-                if not vehicles_within_year_limit:
+                year_rows = self._range_rows(partition, "ano", int(current_anomax), cache)
+                test_rows = self._match_filters(partition, current_filters, cache)
+                if not (year_rows if test_rows is None else test_rows & year_rows):
                     current_anomax = None
                     removed_filters.append("AnoMax")
                 else:
@@ -408,13 +483,10 @@ class VehicleSearchEngine:
                         current_filters = {k: v for k, v in current_filters.items() if k != "modelo"}
                         current_filters["categoria"] = mapped_category
                         removed_filters.append(f"modelo({model_value})->categoria({mapped_category})")
-                        filtered_vehicles = self.apply_filters(vehicles, current_filters)
-                        filtered_vehicles = self.apply_range_filters(filtered_vehicles, current_valormax, current_anomax, current_kmmax, current_ccmax)
-                        if excluded_ids:
-                            filtered_vehicles = [v for v in filtered_vehicles if str(v.get("id")) not in excluded_ids]
-                        if filtered_vehicles:
-                            sorted_vehicles = self.sort_vehicles(filtered_vehicles, current_valormax, current_anomax, current_kmmax, current_ccmax)
-                            return SearchResult(vehicles=sorted_vehicles[:6], total_found=len(sorted_vehicles), fallback_info={"fallback": {"removed_filters": removed_filters}}, removed_filters=removed_filters)
+                        filtered_rows = self._candidate_rows(partition, current_filters, current_anomax, current_kmmax, excluded_rows, cache)
+                        if filtered_rows:
+                            sorted_rows = self.sort_vehicles(partition, filtered_rows, current_valormax, current_anomax, current_kmmax, current_ccmax)
+                            return self._result(partition, sorted_rows, removed_filters)
                     else:
                         current_filters = {k: v for k, v in current_filters.items() if k != "modelo"}
                         removed_filters.append(f"modelo({model_value})")
@@ -427,75 +499,63 @@ class VehicleSearchEngine:
             else:
                 continue
 
-            filtered_vehicles = self.apply_filters(vehicles, current_filters)
-            filtered_vehicles = self.apply_range_filters(filtered_vehicles, current_valormax, current_anomax, current_kmmax, current_ccmax)
-            if excluded_ids:
-                filtered_vehicles = [v for v in filtered_vehicles if str(v.get("id")) not in excluded_ids]
-            if filtered_vehicles:
-                sorted_vehicles = self.sort_vehicles(filtered_vehicles, current_valormax, current_anomax, current_kmmax, current_ccmax)
-                return SearchResult(vehicles=sorted_vehicles[:6], total_found=len(sorted_vehicles), fallback_info={"fallback": {"removed_filters": removed_filters}}, removed_filters=removed_filters)
+            filtered_rows = self._candidate_rows(partition, current_filters, current_anomax, current_kmmax, excluded_rows, cache)
+            if filtered_rows:
+                sorted_rows = self.sort_vehicles(partition, filtered_rows, current_valormax, current_anomax, current_kmmax, current_ccmax)
+                return self._result(partition, sorted_rows, removed_filters)
 
         return SearchResult(vehicles=[], total_found=0, fallback_info={}, removed_filters=removed_filters)
 
 search_engine = VehicleSearchEngine()
 
-def filter_empreendimentos(vehicles: List[Dict]) -> List[Dict]:
-    """Filtra apenas os empreendimentos da lista de veículos"""
-    return [v for v in vehicles if "empreendimento" in v]
-
-def filter_zero37(vehicles: List[Dict]) -> List[Dict]:
-    """Filtra apenas os itens Zero37 (peças de refrigeração)"""
-    return [v for v in vehicles if v.get("tipo") == "peca_refrigeracao"]
-
 def clean_empreendimento_data(emp: Dict) -> Dict:
     """Remove campos não desejados dos empreendimentos"""
     fields_to_remove = ["created_at", "updated_at", "cliente", "cliente_id", "id"]
     return {k: v for k, v in emp.items() if k not in fields_to_remove}
 
-def save_update_status(success: bool, message: str = "", vehicle_count: int = 0):
-    status = {"timestamp": datetime.now().isoformat(), "success": success, "message": message, "vehicle_count": vehicle_count}
-    try:
-        with open(STATUS_FILE, "w", encoding="utf-8") as f:
-            json.dump(status, f, ensure_ascii=False, indent=2)
-    except Exception as e:
-        print(f"Erro ao salvar status: {e}")
+def _response_empreendimento(emp: Dict, simples: bool) -> Dict:
+    """Empreendimento como sai em /api/data (simples=1 mantém só a primeira foto)"""
+    emp = clean_empreendimento_data(emp)
+    if simples:
+        fotos = emp.get("fotos")
+        if isinstance(fotos, list) and len(fotos) > 0:
+            if isinstance(fotos[0], str):
+                emp["fotos"] = [fotos[0]]
+            elif isinstance(fotos[0], list) and len(fotos[0]) > 0:
+                emp["fotos"] = [[fotos[0][0]]]
+            else:
+                emp["fotos"] = []
+        else:
+            emp["fotos"] = []
+    return emp
 
-def get_update_status() -> Dict:
-    try:
-        if os.path.exists(STATUS_FILE):
-            with open(STATUS_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-    except Exception as e:
-        print(f"Erro ao ler status: {e}")
-    return {"timestamp": None, "success": False, "message": "Nenhuma atualização registrada", "vehicle_count": 0}
+def _empreendimento_fragments(partition: CatalogPartition, rows: List[int], simples: bool) -> List[bytes]:
+    """JSON de cada empreendimento retornado, serializado uma vez por geração do snapshot"""
+    return partition.json_fragments(rows, ("api_data", simples), lambda emp: _response_empreendimento(emp, simples), dumps)
 
 def wrapped_fetch_and_convert_xml():
-    try:
-        print("Iniciando atualização dos dados...")
-        fetch_and_convert_xml()
-        empreendimentos_count = 0
-        if os.path.exists("data.json"):
-            try:
-                with open("data.json", "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    vehicles = data.get("veiculos", [])
-                    empreendimentos = filter_empreendimentos(vehicles)
-                    empreendimentos_count = len(empreendimentos)
-            except:
-                pass
-        save_update_status(True, "Dados atualizados com sucesso", empreendimentos_count)
-        print(f"Atualização concluída: {empreendimentos_count} empreendimentos carregados")
-    except Exception as e:
-        error_message = f"Erro na atualização: {str(e)}"
-        save_update_status(False, error_message)
-        print(error_message)
+    """Job da API no modo embedded: só o processo líder coleta; os demais passam à nova geração do snapshot"""
+    result = run_refresh()
+    if result:
+        try:
+            catalog_store.publish(result)
+            search_cache.clear()
+            # Deixa o /list da nova geração pronto antes da primeira requisição
+            partition = catalog_store.partition(PARTITION_EMPREENDIMENTOS)
+            if partition is not None:
+                listing_for(partition)
+        except (ValueError, KeyError, OSError) as e:
+            print(f"[ERRO] Erro ao publicar catálogo: {e}")
 
 @app.on_event("startup")
 def schedule_tasks():
+    if INGEST_MODE == "worker":
+        print("[INFO] INGEST_MODE=worker: a API só carrega as partições gravadas pelo ingest_worker")
+        return
+    # A primeira coleta roda em segundo plano (next_run_time): o startup não espera os feeds
     scheduler = BackgroundScheduler(timezone="America/Sao_Paulo")
-    scheduler.add_job(wrapped_fetch_and_convert_xml, "interval", hours=2)
+    scheduler.add_job(wrapped_fetch_and_convert_xml, "interval", hours=INGEST_INTERVAL_HOURS, next_run_time=datetime.now().astimezone())
     scheduler.start()
-    wrapped_fetch_and_convert_xml()
 
 @app.get("/api/lookup")
 def lookup_model(request: Request):
@@ -504,151 +564,53 @@ def lookup_model(request: Request):
     tipo = query_params.get("tipo", "").strip().lower()
     
     if not modelo:
-        return JSONResponse(content={"error": "Parâmetro 'modelo' é obrigatório"}, status_code=400)
+        return FastJSONResponse(content={"error": "Parâmetro 'modelo' é obrigatório"}, status_code=400)
     if not tipo:
-        return JSONResponse(content={"error": "Parâmetro 'tipo' é obrigatório"}, status_code=400)
+        return FastJSONResponse(content={"error": "Parâmetro 'tipo' é obrigatório"}, status_code=400)
     if tipo not in ["carro", "moto"]:
-        return JSONResponse(content={"error": "Parâmetro 'tipo' deve ser 'carro' ou 'moto'"}, status_code=400)
+        return FastJSONResponse(content={"error": "Parâmetro 'tipo' deve ser 'carro' ou 'moto'"}, status_code=400)
     
     normalized_model = search_engine.normalize_text(modelo)
-    
+    engine = moto_lookup if tipo == "moto" else category_lookup
+    match = engine.lookup(normalized_model)
+
+    if not match:
+        if tipo == "moto":
+            return FastJSONResponse(content={"modelo": modelo, "tipo": tipo, "cilindrada": None, "categoria": None, "message": "Modelo de moto não encontrado nos mapeamentos"})
+        return FastJSONResponse(content={"modelo": modelo, "tipo": tipo, "categoria": None, "message": "Modelo de carro não encontrado nos mapeamentos"})
+
+    match_type, index, matched_word = match
+    key = engine.keys[index]
     if tipo == "moto":
-        if normalized_model in MAPEAMENTO_MOTOS:
-            cilindrada, categoria = MAPEAMENTO_MOTOS[normalized_model]
-            return JSONResponse(content={"modelo": modelo, "tipo": tipo, "cilindrada": cilindrada, "categoria": categoria, "match_type": "exact"})
-        
-        model_words = normalized_model.split()
-        for word in model_words:
-            if len(word) >= 3 and word in MAPEAMENTO_MOTOS:
-                cilindrada, categoria = MAPEAMENTO_MOTOS[word]
-                return JSONResponse(content={"modelo": modelo, "tipo": tipo, "cilindrada": cilindrada, "categoria": categoria, "match_type": "partial_word", "matched_word": word})
-        
-        for key, (cilindrada, categoria) in MAPEAMENTO_MOTOS.items():
-            if key in normalized_model or normalized_model in key:
-                return JSONResponse(content={"modelo": modelo, "tipo": tipo, "cilindrada": cilindrada, "categoria": categoria, "match_type": "substring", "matched_key": key})
-        
-        best_match = None
-        best_score = 0
-        threshold = 85
-        
-        for key, (cilindrada, categoria) in MAPEAMENTO_MOTOS.items():
-            partial_score = fuzz.partial_ratio(normalized_model, key)
-            ratio_score = fuzz.ratio(normalized_model, key)
-            max_score = max(partial_score, ratio_score)
-            
-            if max_score >= threshold and max_score > best_score:
-                best_score = max_score
-                best_match = {"modelo": key, "tipo": tipo, "cilindrada": cilindrada, "categoria": categoria}
-        
-        if best_match:
-            return JSONResponse(content=best_match)
-        
-        return JSONResponse(content={"modelo": modelo, "tipo": tipo, "cilindrada": None, "categoria": None, "message": "Modelo de moto não encontrado nos mapeamentos"})
-    
+        cilindrada, categoria = engine.values[index]
+        content = {"modelo": modelo, "tipo": tipo, "cilindrada": cilindrada, "categoria": categoria}
     else:
-        if normalized_model in MAPEAMENTO_CATEGORIAS:
-            categoria = MAPEAMENTO_CATEGORIAS[normalized_model]
-            return JSONResponse(content={"modelo": modelo, "tipo": tipo, "categoria": categoria, "match_type": "exact"})
-        
-        model_words = normalized_model.split()
-        for word in model_words:
-            if len(word) >= 3 and word in MAPEAMENTO_CATEGORIAS:
-                categoria = MAPEAMENTO_CATEGORIAS[word]
-                return JSONResponse(content={"modelo": modelo, "tipo": tipo, "categoria": categoria, "match_type": "partial_word", "matched_word": word})
-        
-        for key, categoria in MAPEAMENTO_CATEGORIAS.items():
-            if key in normalized_model or normalized_model in key:
-                return JSONResponse(content={"modelo": modelo, "tipo": tipo, "categoria": categoria, "match_type": "substring", "matched_key": key})
-        
-        best_match = None
-        best_score = 0
-        threshold = 85
-        
-        for key, categoria in MAPEAMENTO_CATEGORIAS.items():
-            partial_score = fuzz.partial_ratio(normalized_model, key)
-            ratio_score = fuzz.ratio(normalized_model, key)
-            max_score = max(partial_score, ratio_score)
-            
-            if max_score >= threshold and max_score > best_score:
-                best_score = max_score
-                best_match = {"modelo": key, "tipo": tipo, "categoria": categoria}
-        
-        if best_match:
-            return JSONResponse(content=best_match)
-        
-        return JSONResponse(content={"modelo": modelo, "tipo": tipo, "categoria": None, "message": "Modelo de carro não encontrado nos mapeamentos"})
-
-# MOVER ESTA FUNÇÃO PARA ANTES DO ENDPOINT /list
-def _format_empreendimento(emp: Dict) -> str:
-    def safe_value(value):
-        if value is None or value == "":
-            return ""
-        return str(value)
-
-    return ",".join([
-        safe_value(emp.get("id_cv")),
-        safe_value(emp.get("empreendimento")),
-        safe_value(emp.get("endereco")),
-        safe_value(emp.get("bairro")),
-        safe_value(emp.get("cidade")),
-        safe_value(emp.get("tipo")),
-        safe_value(emp.get("segmento")),
-        safe_value(emp.get("metragem")),
-        safe_value(emp.get("quartos"))
-    ])
+        content = {"modelo": modelo, "tipo": tipo, "categoria": engine.values[index]}
+
+    if match_type == "fuzzy":
+        # O match fuzzy devolve a chave do mapeamento no lugar do modelo pesquisado (sem match_type)
+        content["modelo"] = key
+    else:
+        content["match_type"] = match_type
+        if match_type == "partial_word":
+            content["matched_word"] = matched_word
+        elif match_type == "substring":
+            content["matched_key"] = key
+    return FastJSONResponse(content=content)
 
 @app.get("/list")
 def list_empreendimentos(request: Request):
-    if not os.path.exists("data.json"):
-        return JSONResponse(content={"error": "Nenhum dado disponível"}, status_code=404)
     try:
-        with open("data.json", "r", encoding="utf-8") as f:
-            data = json.load(f)
-        vehicles = data.get("veiculos", [])
-        if not isinstance(vehicles, list):
-            raise ValueError("Formato inválido: 'veiculos' deve ser uma lista")
-    except (json.JSONDecodeError, ValueError, KeyError) as e:
-        return JSONResponse(content={"error": f"Erro ao carregar dados: {str(e)}"}, status_code=500)
-
-    # Filtrar apenas empreendimentos
-    empreendimentos = filter_empreendimentos(vehicles)
+        partition = catalog_store.partition(PARTITION_EMPREENDIMENTOS)
+    except (json.JSONDecodeError, ValueError, KeyError, OSError) as e:
+        return FastJSONResponse(content={"error": f"Erro ao carregar dados: {str(e)}"}, status_code=500)
+    if partition is None:
+        return FastJSONResponse(content={"error": "Nenhum dado disponível"}, status_code=404)
 
     query_params = dict(request.query_params)
-    filter_segmento = query_params.get("segmento")
-    filter_tipo = query_params.get("tipo")
-
-    filtered_empreendimentos = empreendimentos
-    if filter_segmento:
-        filtered_empreendimentos = [e for e in filtered_empreendimentos if e.get("segmento") and filter_segmento.lower() in e.get("segmento", "").lower()]
-    if filter_tipo:
-        filtered_empreendimentos = [e for e in filtered_empreendimentos if e.get("tipo") and filter_tipo.lower() in e.get("tipo", "").lower()]
-
-    categorized_empreendimentos = {}
-    nao_mapeados = []
-    for emp in filtered_empreendimentos:
-        segmento = emp.get("segmento")
-        if not segmento or segmento in ["", "None", None]:
-            nao_mapeados.append(_format_empreendimento(emp))
-            continue
-        if segmento not in categorized_empreendimentos:
-            categorized_empreendimentos[segmento] = []
-        formatted_emp = _format_empreendimento(emp)
-        categorized_empreendimentos[segmento].append(formatted_emp)
-
-    instruction_text = (
-        "### COMO LER O CSV de Empreendimentos (CRUCIAL — leia cada linha com atenção)\n"
-        "id_cv, empreendimento, endereco, bairro, cidade, tipo, segmento, metragem, quartos\n\n"
-        "Exemplo: 56,Residencial Porto Essenza,Rua Henrique Schneider 115,Sarandi,Porto Alegre,apartamento,medio_padrao,91m²,2"
-    )
-
-    result = {"instruction": instruction_text}
-
-    for segmento in sorted(categorized_empreendimentos.keys()):
-        result[segmento] = categorized_empreendimentos[segmento]
-    if nao_mapeados:
-        result["NÃO MAPEADOS"] = nao_mapeados
-
-    return JSONResponse(content=result)
+    # Linhas CSV, índices por segmento/tipo e payload sem filtros são calculados uma vez por geração
+    body, etag = listing_for(partition).render(query_params.get("segmento"), query_params.get("tipo"))
+    return etag_response(body, etag, request.headers.get("if-none-match"))
 
 def _collect_multi_params(qp: Any) -> Dict[str, str]:
     out: Dict[str, List[str]] = {}
@@ -667,19 +629,13 @@ def _collect_multi_params(qp: Any) -> Dict[str, str]:
 
 @app.get("/api/data")
 def get_empreendimentos_data(request: Request):
-    if not os.path.exists("data.json"):
-        return JSONResponse(content={"error": "Nenhum dado disponível", "resultados": [], "total_encontrado": 0}, status_code=404)
     try:
-        with open("data.json", "r", encoding="utf-8") as f:
-            data = json.load(f)
-        vehicles = data.get("veiculos", [])
-        if not isinstance(vehicles, list):
-            raise ValueError("Formato inválido: 'veiculos' deve ser uma lista")
-    except (json.JSONDecodeError, ValueError, KeyError) as e:
-        return JSONResponse(content={"error": f"Erro ao carregar dados: {str(e)}", "resultados": [], "total_encontrado": 0}, status_code=500)
-
-    # Filtrar apenas empreendimentos
-    empreendimentos = filter_empreendimentos(vehicles)
+        partition = catalog_store.partition(PARTITION_EMPREENDIMENTOS)
+    except (json.JSONDecodeError, ValueError, KeyError, OSError) as e:
+        return FastJSONResponse(content={"error": f"Erro ao carregar dados: {str(e)}", "resultados": [], "total_encontrado": 0}, status_code=500)
+    if partition is None:
+        return FastJSONResponse(content={"error": "Nenhum dado disponível", "resultados": [], "total_encontrado": 0}, status_code=404)
+    empreendimentos = partition.records
 
     query_params = _collect_multi_params(request.query_params)
 
@@ -709,91 +665,57 @@ def get_empreendimentos_data(request: Request):
 
     if id_set:
         id_set -= excluded_ids
-        matched = [e for e in empreendimentos if str(e.get("id_cv")) in id_set]
-        if matched:
-            # Limpar dados
-            matched = [clean_empreendimento_data(e) for e in matched]
-            if simples == "1":
-                for emp in matched:
-                    fotos = emp.get("fotos")
-                    if isinstance(fotos, list) and len(fotos) > 0:
-                        if isinstance(fotos[0], str):
-                            emp["fotos"] = [fotos[0]]
-                        elif isinstance(fotos[0], list) and len(fotos[0]) > 0:
-                            emp["fotos"] = [[fotos[0][0]]]
-                        else:
-                            emp["fotos"] = []
-                    else:
-                        emp["fotos"] = []
-            return JSONResponse(content={"resultados": matched, "total_encontrado": len(matched), "info": f"Empreendimentos encontrados por IDs: {', '.join(sorted(id_set))}"})
+        id_cvs = partition.column("id_cv")
+        matched_rows = [i for i, id_cv in enumerate(id_cvs) if str(id_cv) in id_set]
+        if matched_rows:
+            fragments = _empreendimento_fragments(partition, matched_rows, simples == "1")
+            return fragment_response("resultados", fragments, {"total_encontrado": len(matched_rows), "info": f"Empreendimentos encontrados por IDs: {', '.join(sorted(id_set))}"})
         else:
-            return JSONResponse(content={"resultados": [], "total_encontrado": 0, "error": f"Empreendimento(s) com ID {', '.join(sorted(id_set))} não encontrado(s)"})
+            return FastJSONResponse(content={"resultados": [], "total_encontrado": 0, "error": f"Empreendimento(s) com ID {', '.join(sorted(id_set))} não encontrado(s)"})
 
     has_search_filters = bool(filters) or valormax or anomax or kmmax or ccmax
 
     if not has_search_filters:
-        all_empreendimentos = [e for e in empreendimentos if str(e.get("id_cv")) not in excluded_ids] if excluded_ids else list(empreendimentos)
-        # Limpar dados
-        all_empreendimentos = [clean_empreendimento_data(e) for e in all_empreendimentos]
-        # Ordenar por algum critério, talvez por id_cv
-        sorted_empreendimentos = sorted(all_empreendimentos, key=lambda e: int(e.get("id_cv", 0)) if e.get("id_cv") and str(e.get("id_cv")).isdigit() else 0, reverse=True)
-        if simples == "1":
-            for emp in sorted_empreendimentos:
-                fotos = emp.get("fotos")
-                if isinstance(fotos, list) and len(fotos) > 0:
-                    if isinstance(fotos[0], str):
-                        emp["fotos"] = [fotos[0]]
-                    elif isinstance(fotos[0], list) and len(fotos[0]) > 0:
-                        emp["fotos"] = [[fotos[0][0]]]
-                    else:
-                        emp["fotos"] = []
-                else:
-                    emp["fotos"] = []
-        return JSONResponse(content={"resultados": sorted_empreendimentos, "total_encontrado": len(sorted_empreendimentos), "info": "Exibindo todos os empreendimentos disponíveis"})
+        id_cvs = partition.column("id_cv")
+        if excluded_ids:
+            rows = [i for i, id_cv in enumerate(id_cvs) if str(id_cv) not in excluded_ids]
+        else:
+            rows = list(range(len(empreendimentos)))
+        # Ordenar por id_cv (decrescente)
+        sorted_rows = sorted(rows, key=lambda i: int(id_cvs[i]) if id_cvs[i] and str(id_cvs[i]).isdigit() else 0, reverse=True)
+        fragments = _empreendimento_fragments(partition, sorted_rows, simples == "1")
+        return fragment_response("resultados", fragments, {"total_encontrado": len(sorted_rows), "info": "Exibindo todos os empreendimentos disponíveis"})
 
     # Para busca com filtros, usar o search_engine adaptado
-    result = search_engine.search_with_fallback(empreendimentos, filters, valormax, anomax, kmmax, ccmax, excluded_ids)
-
-    if result.vehicles:
-        # Limpar dados
-        result.vehicles = [clean_empreendimento_data(e) for e in result.vehicles]
-
-    if simples == "1" and result.vehicles:
-        for emp in result.vehicles:
-            fotos = emp.get("fotos")
-            if isinstance(fotos, list) and len(fotos) > 0:
-                if isinstance(fotos[0], str):
-                    emp["fotos"] = [fotos[0]]
-                elif isinstance(fotos[0], list) and len(fotos[0]) > 0:
-                    emp["fotos"] = [[fotos[0][0]]]
-                else:
-                    emp["fotos"] = []
-            else:
-                emp["fotos"] = []
-
-    response_data = {"resultados": result.vehicles, "total_encontrado": result.total_found}
+    # Resultados em cache são compartilhados entre requisições: nunca alterar result
+    cache_key = (partition.version, canonical_params({
+        **filters, "ValorMax": valormax, "AnoMax": anomax, "KmMax": kmmax, "CcMax": ccmax,
+        "excluir": ",".join(excluded_ids)
+    }))
+    result = search_cache.get(cache_key)
+    if result is None:
+        result = search_engine.search_with_fallback(partition, filters, valormax, anomax, kmmax, ccmax, excluded_ids)
+        search_cache.put(cache_key, result)
+
+    fragments = _empreendimento_fragments(partition, result.rows, simples == "1")
+
+    response_data = {"total_encontrado": result.total_found}
     if result.fallback_info:
         response_data.update(result.fallback_info)
     if result.total_found == 0:
         response_data["instrucao_ia"] = "Não encontramos empreendimentos com os parâmetros informados e também não encontramos opções próximas."
-    return JSONResponse(content=response_data)
+    return fragment_response("resultados", fragments, response_data)
 
 @app.get("/api/zero37")
 def get_zero37_data(request: Request):
     """Endpoint para buscar peças de refrigeração Zero37"""
-    if not os.path.exists("data.json"):
-        return JSONResponse(content={"error": "Nenhum dado disponível", "resultados": [], "total_encontrado": 0}, status_code=404)
     try:
-        with open("data.json", "r", encoding="utf-8") as f:
-            data = json.load(f)
-        vehicles = data.get("veiculos", [])
-        if not isinstance(vehicles, list):
-            raise ValueError("Formato inválido: 'veiculos' deve ser uma lista")
-    except (json.JSONDecodeError, ValueError, KeyError) as e:
-        return JSONResponse(content={"error": f"Erro ao carregar dados: {str(e)}", "resultados": [], "total_encontrado": 0}, status_code=500)
-
-    # Filtrar apenas itens Zero37
-    zero37_items = filter_zero37(vehicles)
+        partition = catalog_store.partition(PARTITION_ZERO37)
+    except (json.JSONDecodeError, ValueError, KeyError, OSError) as e:
+        return FastJSONResponse(content={"error": f"Erro ao carregar dados: {str(e)}", "resultados": [], "total_encontrado": 0}, status_code=500)
+    if partition is None:
+        return FastJSONResponse(content={"error": "Nenhum dado disponível", "resultados": [], "total_encontrado": 0}, status_code=404)
+    zero37_items = partition.records
 
     query_params = dict(request.query_params)
     
@@ -801,18 +723,22 @@ def get_zero37_data(request: Request):
     codigo_interno = query_params.get("codigo_interno", "").strip()
     nome = query_params.get("nome", "").strip()
     
-    results = list(zero37_items)
+    # Filtros sobre as colunas; os registros completos são montados só para as linhas retornadas
+    rows = list(range(len(zero37_items)))
     
     # Filtro por código interno (busca exata)
     if codigo_interno:
-        results = [item for item in results if str(item.get("codigo_interno", "")).upper() == codigo_interno.upper()]
+        codigos = partition.column("codigo_interno", "")
+        rows = [i for i in rows if str(codigos[i]).upper() == codigo_interno.upper()]
     
     # Filtro por nome (fuzzy search por palavra - cada palavra da busca deve dar match em alguma palavra do nome)
     if nome:
+        titulos = partition.column("titulo", "")
+        nomes = partition.column("nome", "")
         scored_results = []
         search_words = nome.lower().split()
-        for item in results:
-            item_nome = item.get("titulo", "") or item.get("nome", "")
+        for i in rows:
+            item_nome = titulos[i] or nomes[i]
             if not item_nome:
                 continue
             item_words = item_nome.lower().split()
@@ -826,10 +752,12 @@ def get_zero37_data(request: Request):
                     break
                 total_score += best
             if all_matched:
-                scored_results.append((item, total_score))
+                scored_results.append((i, total_score))
         # Ordenar por score total decrescente
         scored_results.sort(key=lambda x: x[1], reverse=True)
-        results = [item for item, _ in scored_results]
+        rows = [i for i, _ in scored_results]
+    
+    results = [zero37_items[i] for i in rows]
     
     # Limitar resultados se não for busca específica
     total_found = len(results)
@@ -852,7 +780,7 @@ def get_zero37_data(request: Request):
             "foto": foto
         })
     
-    return JSONResponse(content={
+    return FastJSONResponse(content={
         "resultados": cleaned_results, 
         "total_encontrado": total_found,
         "info": "Peças de refrigeração Zero37"
@@ -865,19 +793,25 @@ def health_check():
 @app.get("/api/status")
 def get_status():
     status = get_update_status()
-    data_file_exists = os.path.exists("data.json")
+    pointer = read_snapshot_pointer()
+    snapshot_path = current_snapshot_path()
+    data_file_exists = bool(snapshot_path) and os.path.exists(snapshot_path)
     data_file_size = 0
     data_file_modified = None
     if data_file_exists:
         try:
-            stat = os.stat("data.json")
+            stat = os.stat(snapshot_path)
             data_file_size = stat.st_size
             data_file_modified = datetime.fromtimestamp(stat.st_mtime).isoformat()
         except:
             pass
     return {
         "last_update": status,
-        "data_file": {"exists": data_file_exists, "size_bytes": data_file_size, "modified_at": data_file_modified},
+        "data_file": {
+            "path": snapshot_path, "generation": pointer["generation"] if pointer else None,
+            "exists": data_file_exists, "size_bytes": data_file_size, "modified_at": data_file_modified
+        },
+        "query_cache": search_cache.stats(),
         "current_time": datetime.now().isoformat()
     }
 
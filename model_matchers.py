@@ -0,0 +1,275 @@
+"""
+Índices de busca sobre os mapeamentos de modelos (vehicle_mappings)
+
+Os mapeamentos são estáticos, então as chaves são normalizadas e indexadas uma única
+vez na importação: tabela hash para match exato/por palavra, autômato Aho-Corasick
+para achar chaves contidas no texto e lista pré-processada para o RapidFuzz.
+Os índices são compartilhados pela API (/api/lookup) e pelos parsers (fetchers).
+"""
+
+import re
+from bisect import bisect_right
+from collections import deque
+from typing import Any, Dict, List, Optional, Set, Tuple
+from unidecode import unidecode
+from rapidfuzz import fuzz, process
+from text_utils import normalize_search_text
+from vehicle_mappings import MAPEAMENTO_CATEGORIAS, MAPEAMENTO_MOTOS, OPCIONAL_CHAVE_HATCH
+
+_SEPARADORES_RE = re.compile(r'[-_./]')
+_NAO_ALFANUMERICO_RE = re.compile(r'[^a-z0-9\s]')
+_ESPACOS_RE = re.compile(r'\s+')
+
+def normalizar_texto(texto: Any) -> str:
+    """Normaliza texto para comparação (forma usada pelos parsers)"""
+    if not texto:
+        return ""
+    texto_norm = unidecode(str(texto)).lower()
+    texto_norm = _SEPARADORES_RE.sub(' ', texto_norm)  # hífen, underscore, ponto, barra
+    texto_norm = _NAO_ALFANUMERICO_RE.sub('', texto_norm)
+    texto_norm = _ESPACOS_RE.sub(' ', texto_norm).strip()
+    return texto_norm
+
+# =================== AHO-CORASICK =======================
+
+class AhoCorasick:
+    """Autômato de múltiplos padrões: encontra em uma passada todos os padrões contidos no texto"""
+
+    def __init__(self, patterns: List[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        for pattern_id, pattern in enumerate(patterns):
+            if pattern:
+                self._add(pattern, pattern_id)
+        self._build()
+
+    def _add(self, pattern: str, pattern_id: int):
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = next_state
+        self._out[state].append(pattern_id)
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+
+    def find_all(self, text: str) -> Set[int]:
+        """Ids dos padrões que aparecem em algum ponto do texto"""
+        found: Set[int] = set()
+        state = 0
+        for char in text:
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            if self._out[state]:
+                found.update(self._out[state])
+        return found
+
+# =================== LOOKUP DE MODELOS =======================
+
+class ModelLookupEngine:
+    """
+    Lookup de um modelo em um mapeamento {modelo: valor}.
+
+    Estágios (na mesma ordem do /api/lookup): exato, por palavra (>= 3 letras),
+    substring (chave contida no modelo ou modelo contido na chave) e fuzzy.
+    Em empates vence a primeira chave na ordem do mapeamento; chaves que
+    normalizam para o mesmo texto ficam representadas pela primeira delas.
+    """
+
+    FUZZY_THRESHOLD = 85
+
+    def __init__(self, mapping: Dict[str, Any]):
+        self.keys: List[str] = []
+        self.normalized_keys: List[str] = []
+        self.values: List[Any] = []
+        self._index: Dict[str, int] = {}
+        for key, value in mapping.items():
+            normalized = normalize_search_text(key)
+            if normalized in self._index:
+                continue
+            self._index[normalized] = len(self.keys)
+            self.keys.append(key)
+            self.normalized_keys.append(normalized)
+            self.values.append(value)
+
+        self._automaton = AhoCorasick(self.normalized_keys)
+        # Todas as chaves em uma única string para achar "modelo contido na chave" com str.find
+        self._joined = "\x00".join(self.normalized_keys)
+        self._offsets: List[int] = []
+        offset = 0
+        for normalized in self.normalized_keys:
+            self._offsets.append(offset)
+            offset += len(normalized) + 1
+
+    def exact(self, normalized_model: str) -> Optional[int]:
+        return self._index.get(normalized_model)
+
+    def partial_word(self, normalized_model: str) -> Optional[Tuple[int, str]]:
+        for word in normalized_model.split():
+            if len(word) >= 3 and word in self._index:
+                return self._index[word], word
+        return None
+
+    def substring(self, normalized_model: str) -> Optional[int]:
+        candidates = self._automaton.find_all(normalized_model)
+        position = self._joined.find(normalized_model)
+        if position >= 0:
+            candidates.add(bisect_right(self._offsets, position) - 1)
+        return min(candidates) if candidates else None
+
+    def fuzzy(self, normalized_model: str) -> Optional[int]:
+        best_score = 0
+        best_index = None
+        for scorer in (fuzz.partial_ratio, fuzz.ratio):
+            match = process.extractOne(normalized_model, self.normalized_keys, scorer=scorer, processor=None, score_cutoff=self.FUZZY_THRESHOLD)
+            if match is None:
+                continue
+            _, score, index = match
+            if score > best_score or (score == best_score and index < best_index):
+                best_score, best_index = score, index
+        return best_index
+
+    def lookup(self, normalized_model: str, fuzzy: bool = True) -> Optional[Tuple[str, int, Optional[str]]]:
+        """Retorna (match_type, índice da chave, palavra casada) ou None"""
+        index = self.exact(normalized_model)
+        if index is not None:
+            return "exact", index, None
+        word_match = self.partial_word(normalized_model)
+        if word_match:
+            return "partial_word", word_match[0], word_match[1]
+        index = self.substring(normalized_model)
+        if index is not None:
+            return "substring", index, None
+        if fuzzy:
+            index = self.fuzzy(normalized_model)
+            if index is not None:
+                return "fuzzy", index, None
+        return None
+
+# =================== CLASSIFICADOR DE CATEGORIAS =======================
+
+class CategoryClassifier:
+    """
+    Categoria de carro a partir do modelo, com as chaves de MAPEAMENTO_CATEGORIAS
+    já normalizadas e um autômato com todas elas.
+
+    Entre as chaves contidas no modelo vence o maior score
+    (palavras da chave presentes no modelo * 100 + comprimento da chave);
+    em empate vence a primeira chave na ordem do mapeamento.
+    """
+
+    def __init__(self, mapping: Dict[str, str], opcional_chave_hatch: str):
+        self.keys: List[str] = []
+        self.categories: List[str] = []
+        self._key_words: List[List[str]] = []
+        seen: Set[str] = set()
+        for key, category in mapping.items():
+            normalized = normalizar_texto(key)
+            if normalized in seen:
+                continue
+            seen.add(normalized)
+            self.keys.append(normalized)
+            self.categories.append(category)
+            self._key_words.append(normalized.split())
+        self._automaton = AhoCorasick(self.keys)
+        self.opcional_chave_hatch = normalizar_texto(opcional_chave_hatch)
+
+    def classify(self, modelo: str, opcionais: str = "") -> Optional[str]:
+        if not modelo:
+            return None
+
+        modelo_norm = normalizar_texto(modelo)
+
+        # PRIORIDADE 1: "hatch" ou "sedan" explícito no modelo
+        if "hatch" in modelo_norm:
+            return "Hatch"
+        if "sedan" in modelo_norm:
+            return "Sedan"
+
+        # PRIORIDADE 2: chave do mapeamento contida no modelo com o maior score
+        found = self._automaton.find_all(modelo_norm)
+        if not found:
+            return None
+        palavras_modelo = set(modelo_norm.split())
+        best_index = None
+        best_score = -1
+        for index in sorted(found):
+            palavras_match = sum(1 for p in self._key_words[index] if p in palavras_modelo)
+            score = (palavras_match * 100) + len(self.keys[index])
+            if score > best_score:
+                best_score, best_index = score, index
+        categoria = self.categories[best_index]
+
+        # Para categorias ambíguas, usa os opcionais para decidir
+        if categoria == "hatch,sedan":
+            return "Hatch" if self.opcional_chave_hatch in normalizar_texto(opcionais) else "Sedan"
+        return categoria
+
+# =================== MATCHER DE MOTOS =======================
+
+class MotoMatcher:
+    """
+    Cilindrada e categoria de moto pelo modelo/versão.
+
+    Cada chave de MAPEAMENTO_MOTOS entra no autômato na forma normalizada e na forma
+    sem espaços (ybr 150 / ybr150); vence o padrão mais longo contido no texto e,
+    em empate, o primeiro na ordem do mapeamento (forma com espaço antes da sem espaço).
+    """
+
+    def __init__(self, mapping: Dict[str, Tuple[int, str]]):
+        self.mapping = mapping
+        self._patterns: List[str] = []
+        self._values: List[Tuple[int, str]] = []
+        for key, value in mapping.items():
+            normalized = normalizar_texto(key)
+            for pattern in (normalized, normalized.replace(' ', '')):
+                self._patterns.append(pattern)
+                self._values.append(value)
+        self._automaton = AhoCorasick(self._patterns)
+
+    def match_text(self, texto: str) -> Tuple[Optional[int], Optional[str]]:
+        if not texto:
+            return None, None
+
+        texto_norm = normalizar_texto(texto)
+
+        # Busca exata primeiro (chaves como estão no mapeamento)
+        if texto_norm in self.mapping:
+            return self.mapping[texto_norm]
+
+        found = self._automaton.find_all(texto_norm)
+        if not found:
+            return None, None
+        best = min(found, key=lambda pattern_id: (-len(self._patterns[pattern_id]), pattern_id))
+        return self._values[best]
+
+    def infer(self, modelo: str, versao: str = "") -> Tuple[Optional[int], Optional[str]]:
+        """Busca no modelo, depois na versão e por fim em modelo + versão"""
+        cilindrada, categoria = self.match_text(modelo)
+        if not cilindrada and versao:
+            cilindrada, categoria = self.match_text(versao)
+        if not cilindrada and versao:
+            cilindrada, categoria = self.match_text(f"{modelo} {versao}")
+        return cilindrada, categoria
+
+moto_lookup = ModelLookupEngine(MAPEAMENTO_MOTOS)
+category_lookup = ModelLookupEngine(MAPEAMENTO_CATEGORIAS)
+category_classifier = CategoryClassifier(MAPEAMENTO_CATEGORIAS, OPCIONAL_CHAVE_HATCH)
+moto_matcher = MotoMatcher(MAPEAMENTO_MOTOS)
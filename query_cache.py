@@ -0,0 +1,82 @@
+"""
+Cache de resultados de busca da API
+
+Guarda os SearchResult de /api/data em memória (LRU com expiração por tempo).
+A chave inclui a versão da partição consultada, então um snapshot novo nunca
+reaproveita resultados do anterior; além disso o cache é limpo a cada publicação.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+# =================== CONFIGURAÇÕES GLOBAIS =======================
+
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "512"))
+QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", "600"))
+
+class QueryCache:
+    """
+    Cache LRU com TTL, seguro para os handlers síncronos do FastAPI (threadpool).
+    Os valores armazenados são compartilhados entre requisições e não devem ser alterados.
+    """
+
+    def __init__(self, max_size: int = QUERY_CACHE_SIZE, ttl: float = QUERY_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0
+            }
+
+def canonical_params(params: Dict[str, Optional[str]]) -> tuple:
+    """Chave canônica: parâmetros ordenados e valores multi-valor ordenados e sem repetição"""
+    items = []
+    for key, value in params.items():
+        if not value:
+            continue
+        parts = sorted({p.strip() for p in str(value).split(",") if p.strip()})
+        items.append((key, ",".join(parts)))
+    return tuple(sorted(items))
+
+search_cache = QueryCache()
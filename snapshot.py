@@ -0,0 +1,343 @@
+"""
+Snapshot binário do catálogo - formato versionado para carga rápida das partições
+
+Layout do arquivo (inteiros little-endian, blocos alinhados em 8 bytes):
+
+    MAGIC (8 bytes) | tamanho do cabeçalho (uint32) | cabeçalho JSON | área de dados
+
+O cabeçalho traz a versão do formato, a data da atualização e, por partição, o offset
+e o tamanho da sua seção na área de dados, o sha256 da seção, as "formas" dos registros
+(chaves na ordem original) e a descrição das colunas. Cada seção é colunar:
+
+- ids de forma: uint32 por registro
+- tabela de strings: offsets uint32 (n + 1) + bytes utf-8, compartilhada pelas colunas
+  de texto da partição (marca, cidade, categoria, combustível, cor... viram índices)
+- colunas "s" (texto) e "j" (JSON de listas/valores mistos): uint32 por registro
+  apontando para a tabela de strings (NONE_ID para None)
+- colunas "i" (int64) e "f" (float64): valor por registro + um byte de nulo por registro
+
+Uma partição é reconstruída com exatamente as mesmas chaves, ordem e tipos do JSON.
+"""
+
+import hashlib
+import json
+import mmap
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from atomic_file import atomic_write
+
+# =================== CONFIGURAÇÕES GLOBAIS =======================
+
+MAGIC = b"VCSNAP01"
+FORMAT_VERSION = 1
+NONE_ID = 0xFFFFFFFF
+ALIGNMENT = 8
+
+_LITTLE_ENDIAN = sys.byteorder == "little"
+_INT64_MIN, _INT64_MAX = -(2 ** 63), 2 ** 63 - 1
+
+class SnapshotError(ValueError):
+    """Arquivo de snapshot inválido, truncado ou de versão desconhecida"""
+    pass
+
+def _pad(size: int) -> int:
+    return (-size) % ALIGNMENT
+
+def _array_bytes(values: array) -> bytes:
+    if not _LITTLE_ENDIAN:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+# =================== ESCRITA =======================
+
+def _column_type(values: List[Any]) -> str:
+    present = [value for value in values if value is not None]
+    if present and all(type(value) is int and _INT64_MIN <= value <= _INT64_MAX for value in present):
+        return "i"
+    if present and all(type(value) is float for value in present):
+        return "f"
+    if all(type(value) is str for value in present):
+        return "s"
+    return "j"
+
+class _SectionWriter:
+    """Monta a seção colunar de uma partição"""
+
+    def __init__(self):
+        self.blocks: List[bytes] = []
+        self.size = 0
+
+    def add(self, content: bytes) -> int:
+        offset = self.size
+        self.blocks.append(content)
+        padding = _pad(len(content))
+        if padding:
+            self.blocks.append(b"\x00" * padding)
+        self.size += len(content) + padding
+        return offset
+
+    def build(self, records: List[Dict]) -> Tuple[bytes, Dict[str, Any]]:
+        shapes: Dict[Tuple[str, ...], int] = {}
+        shape_ids = array("I")
+        names: Dict[str, None] = {}
+        for record in records:
+            shape = tuple(record.keys())
+            shape_id = shapes.get(shape)
+            if shape_id is None:
+                shape_id = shapes[shape] = len(shapes)
+                names.update(dict.fromkeys(shape))
+            shape_ids.append(shape_id)
+
+        strings: Dict[str, int] = {}
+
+        def string_id(text: str) -> int:
+            found = strings.get(text)
+            if found is None:
+                found = strings[text] = len(strings)
+            return found
+
+        columns = []
+        encoded_columns = []
+        for name in names:
+            values = [record.get(name) for record in records]
+            column_type = _column_type([value for record, value in zip(records, values) if name in record])
+            if column_type in ("i", "f"):
+                data = array("q" if column_type == "i" else "d", (0 if value is None else value for value in values))
+                nulls = bytes(1 if value is None else 0 for value in values)
+                encoded_columns.append((name, column_type, data, nulls))
+            else:
+                data = array("I")
+                for value in values:
+                    if value is None:
+                        data.append(NONE_ID)
+                    elif column_type == "s":
+                        data.append(string_id(value))
+                    else:
+                        data.append(string_id(json.dumps(value, ensure_ascii=False)))
+                encoded_columns.append((name, column_type, data, None))
+
+        table = list(strings)
+        encoded_strings = [text.encode("utf-8") for text in table]
+        string_offsets = array("I", [0])
+        for encoded in encoded_strings:
+            string_offsets.append(string_offsets[-1] + len(encoded))
+
+        layout: Dict[str, Any] = {
+            "count": len(records),
+            "shapes": [list(shape) for shape in shapes],
+            "shape_ids": self.add(_array_bytes(shape_ids)),
+            "strings": {
+                "count": len(table),
+                "offsets": self.add(_array_bytes(string_offsets)),
+                "data": self.add(b"".join(encoded_strings))
+            }
+        }
+        for name, column_type, data, nulls in encoded_columns:
+            column = {"name": name, "type": column_type, "offset": self.add(_array_bytes(data))}
+            if nulls is not None:
+                column["nulls"] = self.add(nulls)
+            columns.append(column)
+        layout["columns"] = columns
+        return b"".join(self.blocks), layout
+
+def encode_snapshot(partitions: Dict[str, List[Dict]], updated_at: Optional[str] = None) -> bytes:
+    """Serializa as partições (já separadas por tipo) no formato do snapshot"""
+    sections = []
+    header: Dict[str, Any] = {"format": FORMAT_VERSION, "updated_at": updated_at, "partitions": {}}
+    offset = 0
+    for kind, records in partitions.items():
+        section, layout = _SectionWriter().build(records)
+        layout.update({"offset": offset, "length": len(section), "sha256": hashlib.sha256(section).hexdigest()})
+        header["partitions"][kind] = layout
+        sections.append(section)
+        offset += len(section)
+
+    header_bytes = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    prefix = MAGIC + struct.pack("<I", len(header_bytes)) + header_bytes
+    return prefix + b"\x00" * _pad(len(prefix)) + b"".join(sections)
+
+def write_snapshot(path: str, partitions: Dict[str, List[Dict]], updated_at: Optional[str] = None) -> int:
+    """Grava o snapshot de forma atômica (temporário + fsync + rename); retorna o tamanho em bytes"""
+    content = encode_snapshot(partitions, updated_at)
+    atomic_write(path, content)
+    return len(content)
+
+# =================== LEITURA =======================
+
+class SnapshotPartition(Sequence):
+    """
+    Registros de uma partição lidos sob demanda do snapshot mapeado em memória.
+    Um dicionário completo só é montado para as linhas acessadas; as colunas inteiras
+    (para índices e filtros) são lidas com column(), sem montar os registros.
+    """
+
+    def __init__(self, snapshot: "Snapshot", layout: Dict[str, Any]):
+        self.snapshot = snapshot
+        self.count = layout["count"]
+        base = snapshot.data_start + layout["offset"]
+
+        string_layout = layout["strings"]
+        self._string_offsets = snapshot._values(base, string_layout["offsets"], string_layout["count"] + 1, "I") if string_layout["count"] else array("I", [0])
+        self._string_data = base + string_layout["data"]
+
+        self._columns: Dict[str, Tuple[str, Any, Any]] = {}
+        for column in layout["columns"]:
+            column_type = column["type"]
+            if column_type in ("i", "f"):
+                values = snapshot._values(base, column["offset"], self.count, "q" if column_type == "i" else "d")
+                nulls = snapshot._values(base, column["nulls"], self.count, "B")
+            else:
+                values = snapshot._values(base, column["offset"], self.count, "I")
+                nulls = None
+            self._columns[column["name"]] = (column_type, values, nulls)
+
+        self._shape_ids = snapshot._values(base, layout["shape_ids"], self.count, "I")
+        self._shapes = [tuple(shape) for shape in layout["shapes"]]
+        self._shape_sets = [frozenset(shape) for shape in self._shapes]
+
+    def _string(self, string_id: int) -> str:
+        # Sem cache permanente: o texto fica no mapeamento (compartilhado entre processos) e só as
+        # colunas guardadas pela partição (índices, ordenação) mantêm cópias decodificadas
+        start = self._string_data + self._string_offsets[string_id]
+        end = self._string_data + self._string_offsets[string_id + 1]
+        return str(self.snapshot.buffer[start:end], "utf-8")
+
+    def _value(self, column: Tuple[str, Any, Any], row: int) -> Any:
+        column_type, values, nulls = column
+        if column_type in ("i", "f"):
+            return None if nulls[row] else values[row]
+        string_id = values[row]
+        if string_id == NONE_ID:
+            return None
+        if column_type == "s":
+            return self._string(string_id)
+        # Cada acesso devolve uma cópia nova de listas/objetos
+        return json.loads(self._string(string_id))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self[i] for i in range(*row.indices(self.count))]
+        if row < 0:
+            row += self.count
+        if not 0 <= row < self.count:
+            raise IndexError("linha fora da partição")
+        columns = self._columns
+        return {name: self._value(columns[name], row) for name in self._shapes[self._shape_ids[row]]}
+
+    def __iter__(self) -> Iterator[Dict]:
+        for row in range(self.count):
+            yield self[row]
+
+    def column(self, name: str, default: Any = None) -> List[Any]:
+        """Valor do campo em cada linha (default nas linhas em que o campo não existe)"""
+        column = self._columns.get(name)
+        if column is None:
+            return [default] * self.count
+        has_field = [name in shape for shape in self._shape_sets]
+        shape_ids = self._shape_ids
+        column_type, values, nulls = column
+        if column_type in ("i", "f"):
+            return [(None if nulls[row] else values[row]) if has_field[shape_ids[row]] else default for row in range(self.count)]
+        # Valores repetidos são decodificados uma vez só por leitura da coluna
+        decode = json.loads if column_type == "j" else None
+        decoded: Dict[int, Any] = {}
+        result = []
+        for row in range(self.count):
+            if not has_field[shape_ids[row]]:
+                result.append(default)
+                continue
+            string_id = values[row]
+            if string_id == NONE_ID:
+                result.append(None)
+                continue
+            if string_id not in decoded:
+                value = self._string(string_id)
+                decoded[string_id] = decode(value) if decode is not None else value
+            result.append(decoded[string_id])
+        return result
+
+class Snapshot:
+    """Leitura de um snapshot (mapeado em memória quando aberto com load)"""
+
+    def __init__(self, buffer: Any):
+        self.buffer = memoryview(buffer)
+        if bytes(self.buffer[:len(MAGIC)]) != MAGIC:
+            raise SnapshotError("Arquivo não é um snapshot do catálogo")
+        try:
+            (header_length,) = struct.unpack_from("<I", self.buffer, len(MAGIC))
+            start = len(MAGIC) + 4
+            self.header = json.loads(bytes(self.buffer[start:start + header_length]).decode("utf-8"))
+        except (struct.error, UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise SnapshotError(f"Cabeçalho do snapshot ilegível: {e}")
+        if self.header.get("format") != FORMAT_VERSION:
+            raise SnapshotError(f"Versão de snapshot não suportada: {self.header.get('format')}")
+        self.data_start = start + header_length + _pad(start + header_length)
+
+    @classmethod
+    def load(cls, path: str) -> "Snapshot":
+        """
+        Mapeia o arquivo em memória (somente leitura): workers do mesmo host compartilham
+        as páginas pelo page cache. O arquivo é sempre substituído por rename, nunca
+        alterado no lugar, então o mapeamento antigo continua válido após uma atualização.
+        """
+        with open(path, "rb") as f:
+            try:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                # Arquivo vazio ou sistema sem mmap: lê para a memória (o cabeçalho acusa o erro)
+                buffer = f.read()
+        return cls(buffer)
+
+    @property
+    def updated_at(self) -> Optional[str]:
+        return self.header.get("updated_at")
+
+    def kinds(self) -> List[str]:
+        return list(self.header["partitions"])
+
+    def digest(self, kind: str) -> Optional[str]:
+        layout = self.header["partitions"].get(kind)
+        return layout["sha256"] if layout else None
+
+    def _values(self, base: int, offset: int, count: int, typecode: str):
+        start = base + offset
+        size = array(typecode).itemsize * count
+        if start + size > len(self.buffer):
+            raise SnapshotError("Snapshot truncado")
+        if _LITTLE_ENDIAN:
+            return self.buffer[start:start + size].cast(typecode)
+        values = array(typecode, bytes(self.buffer[start:start + size]))
+        values.byteswap()
+        return values
+
+    def verify(self, kind: str):
+        """Confere o sha256 da seção da partição (uma passada sobre a seção, sem montar registros)"""
+        layout = self.header["partitions"].get(kind)
+        if layout is None:
+            return
+        start = self.data_start + layout["offset"]
+        end = start + layout["length"]
+        if end > len(self.buffer):
+            raise SnapshotError(f"Snapshot truncado na partição '{kind}'")
+        if hashlib.sha256(self.buffer[start:end]).hexdigest() != layout["sha256"]:
+            raise SnapshotError(f"Seção da partição '{kind}' corrompida (sha256 não confere)")
+
+    def partition(self, kind: str) -> SnapshotPartition:
+        """Visão preguiçosa dos registros da partição (vazia se o snapshot não a contém), após conferir a seção"""
+        layout = self.header["partitions"].get(kind)
+        if layout is None:
+            layout = {"count": 0, "offset": 0, "shapes": [], "shape_ids": 0, "columns": [], "strings": {"count": 0, "offsets": 0, "data": 0}}
+        else:
+            self.verify(kind)
+        return SnapshotPartition(self, layout)
+
+    def records(self, kind: str) -> List[Dict]:
+        """Reconstrói todos os registros da partição"""
+        return list(self.partition(kind))
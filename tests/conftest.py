@@ -0,0 +1,138 @@
+"""
+Fixtures compartilhadas pelos testes
+
+O catálogo de teste é gerado de forma determinística (veículos, empreendimentos, peças Zero37
+e telefones com os formatos irregulares que os parsers produzem: preços em texto, anos
+inválidos, campos vazios ou ausentes). Os resultados esperados em fixtures/baseline_results.json
+foram gravados com a implementação original (leitura do data.json a cada requisição e busca
+linha a linha), antes das otimizações.
+"""
+
+import json
+import os
+import random
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+MARCAS = ["Honda", "Toyota", "Chevrolet", "Fiat", "Volkswagen", "Yamaha", "Hyundai", "Ford"]
+MODELOS = ["Civic", "Corolla", "Onix", "Argo", "Gol", "Fazer", "HB20", "Ranger", "CB 300", "Biz 125", "Tracker", "T-Cross", "Fan 160", "XRE 300"]
+NOMES_ZERO37 = ["Compressor Embraco 1/4 HP", "Gas Refrigerante R134a 13kg", "Capacitor 35uF", "Filtro Secador 50g", "Compressor Tecumseh 1/3"]
+
+def build_records():
+    rng = random.Random(7)
+    records = []
+    for i in range(300):
+        modelo = rng.choice(MODELOS)
+        records.append({
+            "id": str(1000 + i) if i % 7 else 1000 + i, "tipo": rng.choice(["carro", "carro", "moto"]),
+            "titulo": rng.choice([None, f"{modelo} {rng.choice(['LX', 'EX', 'Sport'])}"]),
+            "versao": rng.choice([None, "1.0 Flex", "2.0 Turbo", "EX 1.5 CVT", "Sport-Plus", "  "]),
+            "marca": rng.choice(MARCAS), "modelo": modelo, "observacao": None,
+            "ano": rng.choice([2010, 2015, "2018", "2020 ", None, "abc", 2023]), "ano_fabricacao": 2019,
+            "km": rng.choice([0, 15000, "45.000", "120000", None, "12,5"]),
+            "cor": rng.choice(["Branco", "Preto", "Prata", "Vermelho", None, ""]),
+            "combustivel": rng.choice(["Flex", "Gasolina", "Diesel", None]),
+            "cambio": rng.choice(["manual", "automatico", "CVT", None]), "motor": rng.choice(["1.0", "2.0", "1.6", None]),
+            "portas": rng.choice([2, 4, "4", None]), "categoria": rng.choice(["Hatch", "Sedan", "SUV", "street", "trail", None]),
+            "cilindrada": rng.choice([None, 150, 300, "1.0", "2,0"]),
+            "preco": rng.choice([0.0, 45990.0, "89.900,00", 120000, "R$ 55.000", None]),
+            "opcionais": rng.choice(["", "Ar condicionado, Airbag, ABS", "Vidros elétricos, Direção hidráulica", None]),
+            "localizacao": None, "fotos": [f"http://x/{i}.jpg"]
+        })
+    for i in range(40):
+        records.append({
+            "id": i, "cliente_id": 3, "id_cv": str(i + 1) if i % 9 else None, "empreendimento": f"Residencial {i}",
+            "endereco": f"Rua {i}", "bairro": rng.choice(["Centro", "Sarandi", "Moinhos"]),
+            "cidade": rng.choice(["Porto Alegre", "Canoas", "São Paulo"]),
+            "tipo": rng.choice(["apartamento", "casa", "sala comercial", "Apartamento"]),
+            "data_entrega": rng.choice(["2025", "2026-05", None]),
+            "segmento": rng.choice(["medio_padrao", "alto_padrao", "economico", None, ""]), "metragem": "91m²",
+            "quartos": rng.choice([1, 2, 3, "2", None]), "valor": rng.choice([None, 350000, "420.000,00"]),
+            "fotos": rng.choice([[f"http://e/{i}/a.jpg", f"http://e/{i}/b.jpg"], [], [[f"http://e/{i}/n.jpg"]]]),
+            "ativo": True, "created_at": "x", "updated_at": "y", "cliente": {"nome": "c"}
+        })
+    for i in range(40):
+        nome = rng.choice(NOMES_ZERO37)
+        records.append({
+            "id": 5000 + i, "tipo": "peca_refrigeracao", "titulo": nome, "nome": nome, "preco": 10.0 + i,
+            "codigo_interno": f"Z{i:04d}", "estoque": i % 5, "foto": rng.choice([None, f"http://z/{i}.jpg"]), "fotos": []
+        })
+    for i in range(5):
+        records.append({"id": f"{70000 + i}", "tipo": "telefone", "titulo": "Apple iPhone 13", "marca": "Apple", "preco": "3500", "fotos": []})
+    return records
+
+@pytest.fixture
+def records():
+    return build_records()
+
+@pytest.fixture(scope="session")
+def baseline():
+    with open(os.path.join(FIXTURES_DIR, "baseline_results.json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    """
+    Cliente da API lendo um diretório de dados próprio do teste.
+    Retorna (client, directory); o teste grava data.json ou um snapshot em directory.
+    """
+    from fastapi.testclient import TestClient
+    import catalog
+    import listing
+    import main
+    from query_cache import search_cache
+
+    monkeypatch.chdir(tmp_path)
+    store = catalog.CatalogStore(str(tmp_path / "catalog"), str(tmp_path / "data.json"))
+    monkeypatch.setattr(main, "catalog_store", store)
+    monkeypatch.setattr(listing, "_current", None)
+    search_cache.clear()
+    return TestClient(main.app), tmp_path
+
+# =================== CONSULTAS COM RESULTADO GRAVADO =======================
+
+API_QUERIES = {
+    "/api/data": [
+        "", "tipo=apartamento", "tipo=casa,apartamento", "tipo=apartamento&excluir=5,7", "cidade=Canoas&quartos=2",
+        "id_cv=3,5,99", "id_cv=3&simples=1", "id_cv=999", "simples=1", "excluir=1,2,3", "tipo=loft",
+        "AnoMax=2025", "ValorMax=300000&tipo=casa", "tipo=casa&simples=1", "bairro=Centro&segmento=alto"
+    ],
+    "/list": ["", "segmento=alto", "tipo=apart", "segmento=medio&tipo=casa", "segmento=zzz"],
+    "/api/zero37": ["", "codigo_interno=z0003", "nome=compressor", "nome=compresor embraco", "codigo_interno=Z0010&nome=filtro"],
+    "/api/lookup": [
+        "modelo=cb 300&tipo=moto", "modelo=CB300&tipo=moto", "modelo=fan flex&tipo=moto", "modelo=civic&tipo=carro",
+        "modelo=Onix Plus&tipo=carro", "modelo=corola&tipo=carro", "modelo=xyzq&tipo=moto", "modelo=s10&tipo=carro",
+        "modelo=civic", "tipo=carro&modelo=", "modelo=civic&tipo=barco"
+    ],
+}
+
+def engine_cases():
+    """(filtros, ValorMax, AnoMax, KmMax, CcMax, ids excluídos) passados direto ao motor de busca"""
+    cases = []
+    for modelo in ["civic", "onix", "cb 300", "cb300", "fazer", "hb 20", "coroll", "cvic", "trakcer", "gol", "t cross", "xx", "civic,corolla"]:
+        cases.append(({"modelo": modelo}, None, None, None, None, []))
+        cases.append(({"modelo": modelo, "cor": "branco"}, None, "2016", "50000", None, []))
+        cases.append(({"modelo": modelo, "tipo": "moto", "categoria": "street"}, "30000", None, None, "300", ["1003", "1010"]))
+        cases.append(({"modelo": modelo, "marca": "honda", "combustivel": "flex", "cambio": "manual", "motor": "1.0", "portas": "4", "opcionais": "airbag"}, None, "2010", "1000", None, []))
+    cases.append(({"cor": "verde", "categoria": "suv"}, "50000", None, None, None, []))
+    cases.append(({"categoria": "sedan,hatch", "cor": "pret"}, None, None, "20000", None, ["1001"]))
+    cases.append(({}, None, None, None, "1.0", []))
+    cases.append(({"opcionais": "ar condicionado"}, None, None, None, None, []))
+    return cases
+
+def write_source(directory, records, source):
+    """Grava o catálogo como o leitor da API o encontra: data.json legado ou geração do snapshot"""
+    import catalog
+    if source == "data.json":
+        with open(os.path.join(str(directory), "data.json"), "w", encoding="utf-8") as f:
+            json.dump({"veiculos": records, "_updated_at": "2025-01-01T00:00:00"}, f, ensure_ascii=False)
+    else:
+        os.makedirs(os.path.join(str(directory), "catalog"), exist_ok=True)
+        catalog.write_catalog_snapshot(records, "2025-01-01T00:00:00", os.path.join(str(directory), "catalog"))
@@ -0,0 +1,176 @@
+"""Publicação do catálogo em gerações (ponteiro CURRENT) e recarga das partições pelo CatalogStore"""
+
+import json
+import os
+import time
+
+import pytest
+
+import catalog
+from catalog import CatalogStore, read_snapshot_pointer, write_catalog_snapshot
+from snapshot import Snapshot
+
+EMP = catalog.PARTITION_EMPREENDIMENTOS
+
+def _store(tmp_path):
+    return CatalogStore(str(tmp_path / "catalog"), str(tmp_path / "data.json"))
+
+def _publish(tmp_path, records):
+    directory = str(tmp_path / "catalog")
+    os.makedirs(directory, exist_ok=True)
+    return write_catalog_snapshot(records, "2025-01-01T00:00:00", directory)
+
+def test_generations_swap_pointer_and_keep_previous(tmp_path, records):
+    for _ in range(3):
+        _publish(tmp_path, records)
+    directory = tmp_path / "catalog"
+    pointer = read_snapshot_pointer(str(directory))
+    assert pointer["generation"] == 3 and pointer["file"] == "snapshot-3.bin"
+    assert sorted(p.name for p in directory.iterdir()) == ["CURRENT", "snapshot-2.bin", "snapshot-3.bin"]
+
+def test_reader_pinned_to_generation(tmp_path, records):
+    _publish(tmp_path, records)
+    store = _store(tmp_path)
+    pinned = store.partition(EMP)
+    _publish(tmp_path, records[:-60])
+    assert len(pinned) == 40
+    # Sobrevive à remoção do arquivo da sua geração (mapeamento já aberto)
+    _publish(tmp_path, records[:-60])
+    assert not (tmp_path / "catalog" / "snapshot-1.bin").exists()
+    assert pinned.records[0]["empreendimento"] == "Residencial 0"
+
+def test_unchanged_section_keeps_partition(tmp_path, records):
+    _publish(tmp_path, records)
+    store = _store(tmp_path)
+    first = store.partition(EMP)
+    zero37 = store.partition(catalog.PARTITION_ZERO37)
+    # Só a partição de veículos muda
+    _publish(tmp_path, records[1:])
+    assert store.partition(EMP) is first and first.generation == 2
+    assert store.partition(catalog.PARTITION_ZERO37) is zero37
+    assert store.partition(catalog.PARTITION_VEICULOS).generation == 2
+
+def test_changed_section_gets_new_version(tmp_path, records):
+    _publish(tmp_path, records)
+    store = _store(tmp_path)
+    first = store.partition(EMP)
+    without_one = [r for r in records if r.get("empreendimento") != "Residencial 0"]
+    _publish(tmp_path, without_one)
+    second = store.partition(EMP)
+    assert second is not first and second.version > first.version and len(second) == 39
+
+def test_missing_generation_file_raises_os_error(tmp_path, records):
+    _publish(tmp_path, records)
+    os.remove(tmp_path / "catalog" / "snapshot-1.bin")
+    with pytest.raises(OSError):
+        _store(tmp_path).partition(EMP)
+
+def test_corrupted_generation_keeps_serving_current(tmp_path, records):
+    _publish(tmp_path, records)
+    store = _store(tmp_path)
+    first = store.partition(EMP)
+    _publish(tmp_path, records[:-61])
+    path = tmp_path / "catalog" / "snapshot-2.bin"
+    content = bytearray(path.read_bytes())
+    loaded = Snapshot(bytes(content))
+    layout = loaded.header["partitions"][EMP]
+    content[loaded.data_start + layout["offset"] + 16] ^= 0xFF
+    path.write_bytes(bytes(content))
+    assert store.partition(EMP) is first
+
+def test_legacy_data_json_reloaded_on_change(tmp_path, records):
+    data_path = tmp_path / "data.json"
+    data_path.write_text(json.dumps({"veiculos": records}), encoding="utf-8")
+    store = _store(tmp_path)
+    first = store.partition(EMP)
+    assert store.partition(EMP) is first
+    time.sleep(0.01)
+    data_path.write_text(json.dumps({"veiculos": records[:-46]}), encoding="utf-8")
+    os.utime(data_path, (first.mtime + 5, first.mtime + 5))
+    assert len(store.partition(EMP)) == 39
+
+def test_snapshot_takes_precedence_over_legacy(tmp_path, records):
+    (tmp_path / "data.json").write_text(json.dumps({"veiculos": records[:300]}), encoding="utf-8")
+    store = _store(tmp_path)
+    assert len(store.partition(EMP)) == 0
+    _publish(tmp_path, records)
+    assert len(store.partition(EMP)) == 40
+
+def test_publish_with_snapshot_loads_lazily(tmp_path, records):
+    _publish(tmp_path, records)
+    store = _store(tmp_path)
+    store.publish({"veiculos": records, "_snapshot_generation": 1})
+    assert store._partitions == {}
+    partition = store.partition(EMP)
+    assert partition.generation == 1 and partition.digest is not None
+    assert type(partition.records).__name__ == "SnapshotPartition"
+
+def test_publish_without_snapshot_builds_in_memory(tmp_path, records):
+    _publish(tmp_path, records)
+    store = _store(tmp_path)
+    store.partition(EMP)
+    # Gravação da geração nova falhou: os dados novos ficam em memória até a próxima geração
+    store.publish({"veiculos": records[:-46], "_snapshot_generation": None})
+    partition = store.partition(EMP)
+    assert len(partition) == 39 and partition.digest is None and partition.generation == 1
+    _publish(tmp_path, records)
+    assert len(store.partition(EMP)) == 40
+
+def test_atomic_write_replaces_whole_file(tmp_path):
+    from atomic_file import atomic_write
+    path = str(tmp_path / "status.json")
+    atomic_write(path, b"antigo")
+    atomic_write(path, b"novo")
+    assert open(path, "rb").read() == b"novo"
+    with pytest.raises(TypeError):
+        atomic_write(path, "texto não é bytes")
+    # Falha na escrita: destino intacto e nenhum temporário esquecido
+    assert open(path, "rb").read() == b"novo"
+    assert os.listdir(tmp_path) == ["status.json"]
+
+def test_publish_clears_pending_marker(tmp_path, records):
+    directory = str(tmp_path / "catalog")
+    catalog.mark_snapshot_pending(directory)
+    assert catalog.snapshot_pending(directory)
+    _publish(tmp_path, records)
+    assert not catalog.snapshot_pending(directory)
+
+def test_failed_snapshot_write_is_retried_on_next_refresh(tmp_path, monkeypatch):
+    import xml_fetcher
+    from feed_cache import FeedCache
+    from test_feed_cache import URL, FEED_V1, FEED_V2, FakeResponse
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("XML_URL", URL)
+    monkeypatch.setattr(xml_fetcher, "feed_cache", FeedCache(str(tmp_path / "feed_cache")))
+    monkeypatch.setattr(xml_fetcher, "PARSE_PROCESSES", 0)
+    fetcher = xml_fetcher.UnifiedVehicleFetcher()
+    store = _store(tmp_path)
+    # Outro processo (modo worker) só enxerga o que foi gravado em disco
+    reader = _store(tmp_path)
+
+    def refresh(payload):
+        monkeypatch.setattr(xml_fetcher.http_client, "get", lambda url, headers=None, **kwargs: FakeResponse(200, payload))
+        result = fetcher.fetch_all()
+        store.publish(result)
+        return result
+
+    def km(catalog_store):
+        return catalog_store.partition(catalog.PARTITION_VEICULOS).records[0]["km"]
+
+    assert refresh(FEED_V1)["_snapshot_generation"] == 1 and km(store) == 30000
+
+    write = xml_fetcher.write_catalog_snapshot
+
+    def failing_write(*args, **kwargs):
+        raise OSError("disco cheio")
+
+    monkeypatch.setattr(xml_fetcher, "write_catalog_snapshot", failing_write)
+    assert refresh(FEED_V2)["_snapshot_generation"] is None
+    assert km(store) == 31000
+
+    # Feeds sem mudança: a gravação pendente é refeita e a geração nova traz os dados novos
+    monkeypatch.setattr(xml_fetcher, "write_catalog_snapshot", write)
+    assert refresh(FEED_V2)["_snapshot_generation"] == 2
+    assert km(store) == 31000 and km(reader) == 31000
+    assert not catalog.snapshot_pending()
@@ -0,0 +1,100 @@
+"""GET condicional dos feeds e reaproveitamento dos registros em cache (process_url)"""
+
+import pytest
+
+import xml_fetcher
+from feed_cache import FeedCache
+
+URL = "https://feeds.dsautoestoque.com/loja.xml"
+
+FEED_V1 = b"""<?xml version="1.0" encoding="UTF-8"?>
+<estoque><veiculo><id>1</id><marca>Honda</marca><modelo>Civic</modelo><versao>EXL 2.0 CVT</versao><tipoveiculo>Carro</tipoveiculo><anomodelo>2020</anomodelo><km>30000</km><preco>99900</preco></veiculo></estoque>"""
+FEED_V2 = FEED_V1.replace(b"<km>30000</km>", b"<km>31000</km>")
+
+class FakeResponse:
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise xml_fetcher.requests.HTTPError(str(self.status_code))
+
+@pytest.fixture
+def fetcher(tmp_path, monkeypatch):
+    cache = FeedCache(str(tmp_path / "feed_cache"))
+    monkeypatch.setattr(xml_fetcher, "feed_cache", cache)
+    monkeypatch.setattr(xml_fetcher, "PARSE_PROCESSES", 0)
+    fetcher = xml_fetcher.UnifiedVehicleFetcher()
+    fetcher.requests_seen = []
+    fetcher.parse_calls = 0
+    original_parse = fetcher._parse
+
+    def counting_parse(*args, **kwargs):
+        fetcher.parse_calls += 1
+        return original_parse(*args, **kwargs)
+
+    monkeypatch.setattr(fetcher, "_parse", counting_parse)
+    return fetcher
+
+def _serve(monkeypatch, fetcher, response):
+    def get(url, headers=None, **kwargs):
+        fetcher.requests_seen.append(dict(headers or {}))
+        return response
+    monkeypatch.setattr(xml_fetcher.http_client, "get", get)
+
+def test_not_modified_reuses_cached_records(monkeypatch, fetcher):
+    _serve(monkeypatch, fetcher, FakeResponse(200, FEED_V1, {"ETag": "\"v1\"", "Last-Modified": "Mon, 01 Jan 2025 00:00:00 GMT"}))
+    first = fetcher.process_url(URL)
+    assert [v["modelo"] for v in first] == ["Civic"] and fetcher.parse_calls == 1
+    assert fetcher.requests_seen[-1] == {}
+
+    _serve(monkeypatch, fetcher, FakeResponse(304))
+    assert fetcher.process_url(URL) == first
+    assert fetcher.requests_seen[-1] == {"If-None-Match": "\"v1\"", "If-Modified-Since": "Mon, 01 Jan 2025 00:00:00 GMT"}
+    assert fetcher.parse_calls == 1
+
+def test_same_payload_with_new_etag_skips_parser(monkeypatch, fetcher):
+    _serve(monkeypatch, fetcher, FakeResponse(200, FEED_V1, {"ETag": "\"v1\""}))
+    first = fetcher.process_url(URL)
+    _serve(monkeypatch, fetcher, FakeResponse(200, FEED_V1, {"ETag": "\"v2\""}))
+    assert fetcher.process_url(URL) == first and fetcher.parse_calls == 1
+    # Os validadores novos passam a ser enviados
+    _serve(monkeypatch, fetcher, FakeResponse(304))
+    fetcher.process_url(URL)
+    assert fetcher.requests_seen[-1] == {"If-None-Match": "\"v2\""}
+
+def test_changed_payload_is_parsed_again(monkeypatch, fetcher):
+    _serve(monkeypatch, fetcher, FakeResponse(200, FEED_V1, {"ETag": "\"v1\""}))
+    fetcher.process_url(URL)
+    _serve(monkeypatch, fetcher, FakeResponse(200, FEED_V2, {"ETag": "\"v2\""}))
+    assert [v["km"] for v in fetcher.process_url(URL)] == [31000]
+    assert fetcher.parse_calls == 2
+
+def test_corrupted_cached_payload_disables_conditional_get(monkeypatch, fetcher):
+    _serve(monkeypatch, fetcher, FakeResponse(200, FEED_V1, {"ETag": "\"v1\""}))
+    fetcher.process_url(URL)
+    with open(xml_fetcher.feed_cache.path(URL, "raw"), "wb") as f:
+        f.write(b"<estoque/>")
+    _serve(monkeypatch, fetcher, FakeResponse(200, FEED_V1, {"ETag": "\"v1\""}))
+    fetcher.process_url(URL)
+    assert fetcher.requests_seen[-1] == {}
+
+def test_http_error_marks_source_as_failed(monkeypatch, fetcher):
+    _serve(monkeypatch, fetcher, FakeResponse(500))
+    assert fetcher.process_url(URL) is None
+
+def test_records_from_another_parser_version_are_parsed_again(monkeypatch, fetcher):
+    _serve(monkeypatch, fetcher, FakeResponse(200, FEED_V1, {"ETag": "\"v1\""}))
+    first = fetcher.process_url(URL)
+    entry = xml_fetcher.feed_cache.load(URL)
+    current_version = fetcher.registry.by_name(entry.parser).cache_version()
+    assert entry.parser_version == current_version
+
+    # Meta gravado por um deploy anterior (código do parser diferente)
+    entry.parser_version = "0:antigo"
+    xml_fetcher.feed_cache.refresh(entry, entry.etag, entry.last_modified)
+    _serve(monkeypatch, fetcher, FakeResponse(304))
+    assert fetcher.process_url(URL) == first and fetcher.parse_calls == 2
+    assert xml_fetcher.feed_cache.load(URL).parser_version == current_version
@@ -0,0 +1,47 @@
+"""Filtros de texto por índice (valores distintos, n-gramas) comparados com a varredura registro a registro"""
+
+import pytest
+
+import catalog
+import main
+
+engine = main.search_engine
+
+MODEL_QUERIES = ["civic", "cvic", "cb 300", "cb300", "cb", "hb 20", "t cross", "tcross", "fan", "biz", "125", "corola", "civic,onix", "sport", "1.0", "turbo", "xre", "zzz", "non"]
+FUZZY_FILTERS = [("cor", "branco"), ("cor", "pret"), ("categoria", "sedan,hatch"), ("categoria", "suv"), ("opcionais", "airbag"), ("opcionais", "ar condicionado"), ("combustivel", "flex")]
+EXACT_FILTERS = [("marca", "honda"), ("marca", "HONDA,fiat"), ("tipo", "moto"), ("cambio", "automatico"), ("motor", "1.0"), ("portas", "4")]
+
+def _reference_rows(records, key, value):
+    """Varredura original: cada registro comparado com cada valor do filtro"""
+    rows = []
+    for row, record in enumerate(records):
+        tipo = record.get("tipo", "")
+        if key == "modelo":
+            fields, matcher = ["modelo", "titulo", "versao"], engine.model_match
+        elif key in engine.exact_fields:
+            normalized = [engine.normalize_text(v) for v in engine.split_multi_value(value)]
+            if engine.normalize_text(str(record.get(key, ""))) in normalized:
+                rows.append(row)
+            continue
+        else:
+            fields, matcher = [key], engine.fuzzy_match
+        if any(matcher(val.split(), str(record.get(field, "")), tipo)[0] for field in fields for val in engine.split_multi_value(value)):
+            rows.append(row)
+    return rows
+
+@pytest.fixture(scope="module")
+def partition():
+    from conftest import build_records
+    items = catalog.split_partitions(build_records())[catalog.PARTITION_VEICULOS]
+    return catalog.CatalogPartition(catalog.PARTITION_VEICULOS, items, 1)
+
+@pytest.mark.parametrize("key,value", [("modelo", q) for q in MODEL_QUERIES] + FUZZY_FILTERS + EXACT_FILTERS)
+def test_indexed_filter_matches_row_scan(partition, key, value):
+    assert engine.apply_filters(partition, {key: value}) == _reference_rows(partition.records, key, value)
+
+def test_combined_filters_intersect(partition):
+    filters = {"modelo": "civic", "marca": "honda", "cor": "branco"}
+    expected = set(_reference_rows(partition.records, "modelo", "civic"))
+    expected &= set(_reference_rows(partition.records, "marca", "honda"))
+    expected &= set(_reference_rows(partition.records, "cor", "branco"))
+    assert engine.apply_filters(partition, filters) == sorted(expected)
@@ -0,0 +1,43 @@
+"""Lock de ingestão: só um processo coleta por vez"""
+
+import subprocess
+import sys
+
+import pytest
+
+import ingestion
+from conftest import ROOT
+
+pytest.importorskip("fcntl")
+
+def _try_lock_in_other_process(path):
+    code = f"import ingestion; print(ingestion.IngestLock({str(path)!r}).acquire())"
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    return output.strip().splitlines()[-1] == "True"
+
+def test_lock_excludes_other_processes(tmp_path):
+    path = tmp_path / "ingest.lock"
+    lock = ingestion.IngestLock(str(path))
+    assert lock.acquire() and lock.held
+    assert lock.acquire()
+    assert not _try_lock_in_other_process(path)
+    lock.release()
+    assert not lock.held
+    assert _try_lock_in_other_process(path)
+
+def test_run_refresh_skips_when_not_leader(monkeypatch):
+    monkeypatch.setattr(ingestion.ingest_lock, "acquire", lambda: False)
+    monkeypatch.setattr(ingestion, "fetch_and_convert_xml", lambda: pytest.fail("coleta fora do líder"))
+    assert ingestion.run_refresh() is None
+
+def test_run_refresh_records_failure(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingestion, "STATUS_FILE", str(tmp_path / "status.json"))
+    monkeypatch.setattr(ingestion.ingest_lock, "acquire", lambda: True)
+
+    def failing_fetch():
+        raise RuntimeError("feed fora do ar")
+
+    monkeypatch.setattr(ingestion, "fetch_and_convert_xml", failing_fetch)
+    assert ingestion.run_refresh() is None
+    status = ingestion.get_update_status()
+    assert status["success"] is False and "feed fora do ar" in status["message"]
@@ -0,0 +1,51 @@
+"""Codificador das respostas e montagem por fragmentos JSON em cache"""
+
+import json
+
+import pytest
+from fastapi.responses import JSONResponse
+
+import catalog
+import json_response
+from json_response import FastJSONResponse, dumps_with_fragments
+
+CONTENT = {"resultados": [{"nome": "Ação", "preco": 10.5, "fotos": [], "n": None}], "total_encontrado": 1, "info": "ç"}
+
+def test_stdlib_encoder_matches_starlette():
+    assert json_response.ENCODERS["json"](CONTENT) == JSONResponse(content=CONTENT).body
+
+def test_response_uses_configured_encoder():
+    assert json.loads(FastJSONResponse(content=CONTENT).body) == CONTENT
+
+def test_unknown_encoder_falls_back_to_stdlib():
+    assert json_response.get_encoder("inexistente") is json_response.ENCODERS["json"]
+
+def test_orjson_encoder_handles_big_ints():
+    pytest.importorskip("orjson")
+    encode = json_response.ENCODERS["orjson"]
+    assert json.loads(encode({"n": 2 ** 70, 1: "x"})) == {"n": 2 ** 70, "1": "x"}
+
+@pytest.mark.parametrize("extra", [None, {}, {"total_encontrado": 2, "fallback": {"removed_filters": ["cor"]}}])
+def test_fragments_match_full_serialization(extra):
+    items = [{"a": 1}, {"b": "ç"}]
+    fragments = [json_response.dumps(item) for item in items]
+    body = dumps_with_fragments("resultados", fragments, extra)
+    assert json.loads(body) == {"resultados": items, **(extra or {})}
+    assert body == json_response.dumps({"resultados": items, **(extra or {})})
+
+def test_partition_caches_fragments_per_variant():
+    records = [{"id": str(i), "fotos": ["a", "b"]} for i in range(3)]
+    partition = catalog.CatalogPartition(catalog.PARTITION_EMPREENDIMENTOS, records, 1)
+    calls = []
+
+    def transform(record):
+        calls.append(record["id"])
+        return {"id": record["id"]}
+
+    first = partition.json_fragments([2, 0], "simples", transform, json_response.dumps)
+    again = partition.json_fragments([0, 2, 1], "simples", transform, json_response.dumps)
+    assert first == [b'{"id":"2"}', b'{"id":"0"}']
+    assert again[:2] == [first[1], first[0]]
+    assert calls == ["2", "0", "1"]
+    partition.json_fragments([0], "completo", dict, json_response.dumps)
+    assert calls == ["2", "0", "1"]
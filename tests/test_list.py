@@ -0,0 +1,61 @@
+"""/list: payload pré-calculado por geração, igual ao original, com ETag e revalidação (304)"""
+
+import json
+
+import pytest
+
+from conftest import API_QUERIES, write_source
+import catalog
+import listing
+
+@pytest.mark.parametrize("source", ["data.json", "snapshot"])
+def test_list_matches_baseline(api, records, baseline, source):
+    client, directory = api
+    write_source(directory, records, source)
+    for query in API_QUERIES["/list"]:
+        response = client.get("/list" + ("?" + query if query else ""))
+        assert [response.status_code, response.json()] == baseline["api"][f"/list?{query}"], query
+        assert response.headers["content-type"] == "application/json"
+
+def test_etag_revalidation(api, records):
+    client, directory = api
+    write_source(directory, records, "snapshot")
+    first = client.get("/list")
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "no-cache"
+
+    not_modified = client.get("/list", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+
+    for header in [f"W/{etag}", f"\"outro\", {etag}", "*"]:
+        assert client.get("/list", headers={"If-None-Match": header}).status_code == 304, header
+    assert client.get("/list", headers={"If-None-Match": "\"outro\""}).status_code == 200
+
+def test_etag_depends_on_filters_and_data(api, records):
+    client, directory = api
+    write_source(directory, records, "snapshot")
+    full = client.get("/list").headers["etag"]
+    filtered = client.get("/list?segmento=alto")
+    assert filtered.headers["etag"] != full
+    assert client.get("/list?segmento=alto", headers={"If-None-Match": filtered.headers["etag"]}).status_code == 304
+    # Uma nova geração com outro conteúdo invalida o ETag antigo
+    write_source(directory, [r for r in records if r.get("empreendimento") != "Residencial 1"], "snapshot")
+    refreshed = client.get("/list", headers={"If-None-Match": full})
+    assert refreshed.status_code == 200 and refreshed.headers["etag"] != full
+
+def test_unmapped_segmentos_are_grouped_with_string_keys():
+    items = [{"empreendimento": name, "segmento": segmento} for name, segmento in [
+        ("a", 0), ("b", False), ("c", []), ("d", 7), ("e", "alto"), ("f", "None"), ("g", ""), ("h", None)
+    ]]
+    partition = catalog.CatalogPartition(catalog.PARTITION_EMPREENDIMENTOS, items, 1)
+    body, _ = listing.EmpreendimentoListing(partition).render(None, None)
+    payload = json.loads(body)
+    assert list(payload) == ["instruction", "7", "alto", listing.NAO_MAPEADOS]
+    assert [line.split(",")[1] for line in payload[listing.NAO_MAPEADOS]] == ["a", "b", "c", "f", "g", "h"]
+
+def test_missing_data_returns_json_error(api):
+    client, _ = api
+    response = client.get("/list")
+    assert response.status_code == 404 and "error" in response.json()
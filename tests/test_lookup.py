@@ -0,0 +1,31 @@
+"""/api/lookup: índice dos mapeamentos de modelos comparado com a busca linear original"""
+
+import pytest
+
+from conftest import API_QUERIES
+from model_matchers import category_lookup, moto_lookup
+
+# Mudanças intencionais: as chaves dos mapeamentos agora são normalizadas (ex.: "FAN Flex",
+# "Onix Plus", "S10"), então consultas que antes caíam em substring ou não achavam nada
+# passam a dar match exato
+NORMALIZED_KEY_MATCHES = {
+    "/api/lookup?modelo=fan flex&tipo=moto": {"modelo": "fan flex", "tipo": "moto", "cilindrada": 160, "categoria": "street", "match_type": "exact"},
+    "/api/lookup?modelo=Onix Plus&tipo=carro": {"modelo": "Onix Plus", "tipo": "carro", "categoria": "Sedan", "match_type": "exact"},
+    "/api/lookup?modelo=s10&tipo=carro": {"modelo": "s10", "tipo": "carro", "categoria": "Caminhonete", "match_type": "exact"},
+}
+
+@pytest.mark.parametrize("query", API_QUERIES["/api/lookup"])
+def test_lookup_matches_baseline(api, baseline, query):
+    client, _ = api
+    key = f"/api/lookup?{query}"
+    response = client.get(key)
+    if key in NORMALIZED_KEY_MATCHES:
+        assert [response.status_code, response.json()] == [200, NORMALIZED_KEY_MATCHES[key]]
+    else:
+        assert [response.status_code, response.json()] == baseline["api"][key]
+
+def test_match_types():
+    assert moto_lookup.lookup("cb300")[0] == "exact"
+    index = category_lookup.lookup("corolla")[1]
+    assert category_lookup.keys[index] == "corolla"
+    assert category_lookup.lookup("xyzqwv") is None
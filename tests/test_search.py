@@ -0,0 +1,71 @@
+"""Busca de /api/data e /api/zero37 e o motor de busca comparados com a implementação original"""
+
+import pytest
+
+from conftest import API_QUERIES, engine_cases, write_source
+import catalog
+import main
+import snapshot
+
+ENGINE_CASES = engine_cases()
+
+def _veiculos(records):
+    return catalog.split_partitions(records)[catalog.PARTITION_VEICULOS]
+
+@pytest.fixture(params=["list", "snapshot"])
+def veiculos_partition(request, records, tmp_path):
+    """Partição de veículos em memória (lista) e lida do snapshot mapeado"""
+    items = _veiculos(records)
+    if request.param == "list":
+        return catalog.CatalogPartition(catalog.PARTITION_VEICULOS, items, 1)
+    path = str(tmp_path / "snapshot.bin")
+    snapshot.write_snapshot(path, {catalog.PARTITION_VEICULOS: items})
+    return catalog.CatalogPartition(catalog.PARTITION_VEICULOS, snapshot.Snapshot.load(path).partition(catalog.PARTITION_VEICULOS), 1)
+
+def test_engine_matches_baseline(veiculos_partition, baseline):
+    for index, (filters, valormax, anomax, kmmax, ccmax, excluded) in enumerate(ENGINE_CASES):
+        result = main.search_engine.search_with_fallback(veiculos_partition, dict(filters), valormax, anomax, kmmax, ccmax, set(excluded))
+        expected = baseline["engine"][index]
+        assert [v.get("id") for v in result.vehicles] == expected["ids"], filters
+        assert result.total_found == expected["total_found"], filters
+        assert result.fallback_info == expected["fallback_info"], filters
+        assert result.removed_filters == expected["removed_filters"], filters
+        assert [veiculos_partition.records[row].get("id") for row in result.rows] == expected["ids"]
+
+@pytest.mark.parametrize("source", ["data.json", "snapshot"])
+@pytest.mark.parametrize("path", ["/api/data", "/api/zero37"])
+def test_endpoint_matches_baseline(api, records, baseline, source, path):
+    client, directory = api
+    write_source(directory, records, source)
+    for query in API_QUERIES[path]:
+        key = f"{path}?{query}"
+        # Duas vezes: a segunda resposta sai do cache de consultas e dos fragmentos JSON
+        for _ in range(2):
+            response = client.get(path + ("?" + query if query else ""))
+            assert [response.status_code, response.json()] == baseline["api"][key], key
+
+def test_fallback_drops_filters_in_priority_order(veiculos_partition):
+    result = main.search_engine.search_with_fallback(veiculos_partition, {"modelo": "civic", "cor": "roxo", "motor": "9.9"}, None, None, None, None, set())
+    assert result.removed_filters[:2] == ["motor", "cor"]
+    assert result.fallback_info == {"fallback": {"removed_filters": result.removed_filters}}
+    assert result.total_found > 0
+
+def test_api_data_fallback_on_delivery_year(api, records):
+    client, directory = api
+    write_source(directory, records, "snapshot")
+    body = client.get("/api/data?AnoMax=2025").json()
+    assert body["fallback"] == {"removed_filters": ["AnoMax"]}
+    assert body["total_encontrado"] == 40
+
+def test_no_results_explains_to_client(api, records):
+    client, directory = api
+    write_source(directory, records, "data.json")
+    body = client.get("/api/data?tipo=loft").json()
+    assert body["resultados"] == [] and body["total_encontrado"] == 0
+    assert "instrucao_ia" in body
+
+def test_missing_data_returns_json_error(api):
+    client, _ = api
+    response = client.get("/api/data")
+    assert response.status_code == 404
+    assert response.json()["resultados"] == []
@@ -0,0 +1,128 @@
+"""Formato binário do snapshot: ida e volta exata, digests por seção e arquivos inválidos"""
+
+import json
+import struct
+
+import pytest
+
+import catalog
+import snapshot
+from snapshot import MAGIC, Snapshot, SnapshotError, encode_snapshot, write_snapshot
+
+def _write(tmp_path, records, updated_at="2025-01-01T00:00:00"):
+    path = str(tmp_path / "snapshot.bin")
+    write_snapshot(path, catalog.split_partitions(records), updated_at)
+    return path
+
+def _typed(value):
+    """Valor com o tipo explícito (1 == 1.0 == True em comparações comuns)"""
+    return json.dumps(value, sort_keys=False)
+
+def test_round_trip_preserves_keys_order_and_types(tmp_path, records):
+    path = _write(tmp_path, records)
+    loaded = Snapshot.load(path)
+    assert loaded.updated_at == "2025-01-01T00:00:00"
+    for kind, items in catalog.split_partitions(records).items():
+        restored = loaded.records(kind)
+        assert [list(r.keys()) for r in restored] == [list(r.keys()) for r in items]
+        assert [_typed(r) for r in restored] == [_typed(r) for r in items]
+
+def test_irregular_values_round_trip(tmp_path):
+    items = [
+        {"a": 1, "b": 1.5, "c": "x", "d": None, "e": [1, "2", {"k": None}], "f": True},
+        {"b": None, "a": -(2 ** 63), "c": "", "e": {}, "f": False, "g": "ção"},
+        {"a": 2 ** 70, "h": 3},
+        {}
+    ]
+    path = str(tmp_path / "snapshot.bin")
+    write_snapshot(path, {"veiculos": items})
+    assert [_typed(r) for r in Snapshot.load(path).records("veiculos")] == [_typed(r) for r in items]
+
+def test_columns_read_without_building_records(tmp_path, records):
+    loaded = Snapshot.load(_write(tmp_path, records))
+    partition = loaded.partition(catalog.PARTITION_ZERO37)
+    items = catalog.split_partitions(records)[catalog.PARTITION_ZERO37]
+    assert partition.column("codigo_interno") == [r.get("codigo_interno") for r in items]
+    assert partition.column("inexistente", "padrão") == ["padrão"] * len(items)
+    assert partition[-1] == items[-1]
+    assert partition[1:3] == items[1:3]
+    with pytest.raises(IndexError):
+        partition[len(items)]
+
+def test_decoded_strings_are_not_retained(tmp_path):
+    items = [{"marca": "Honda", "obs": "texto livre %d" % i} for i in range(50)]
+    path = str(tmp_path / "snapshot.bin")
+    write_snapshot(path, {"veiculos": items})
+    partition = Snapshot.load(path).partition("veiculos")
+    assert [dict(r) for r in partition] == items
+    # A partição não guarda textos decodificados; a coluna compartilha os valores repetidos
+    assert partition[0]["obs"] == partition[0]["obs"] and partition[0]["obs"] is not partition[0]["obs"]
+    marcas = partition.column("marca")
+    assert marcas == ["Honda"] * 50 and all(value is marcas[0] for value in marcas)
+
+def test_missing_partition_is_empty(tmp_path):
+    path = str(tmp_path / "snapshot.bin")
+    write_snapshot(path, {"veiculos": [{"id": "1"}]})
+    loaded = Snapshot.load(path)
+    assert loaded.records("zero37") == []
+    assert loaded.digest("zero37") is None
+
+def test_digest_changes_only_with_section_content(records):
+    partitions = catalog.split_partitions(records)
+    first = Snapshot(encode_snapshot(partitions, "a"))
+    changed = dict(partitions)
+    changed[catalog.PARTITION_ZERO37] = partitions[catalog.PARTITION_ZERO37][:-1]
+    second = Snapshot(encode_snapshot(changed, "b"))
+    for kind in catalog.PARTITIONS:
+        same = kind != catalog.PARTITION_ZERO37
+        assert (first.digest(kind) == second.digest(kind)) is same
+
+def test_rejects_foreign_file(tmp_path):
+    path = tmp_path / "snapshot.bin"
+    path.write_bytes(b"{\"veiculos\": []}")
+    with pytest.raises(SnapshotError):
+        Snapshot.load(str(path))
+
+def test_rejects_empty_file(tmp_path):
+    path = tmp_path / "snapshot.bin"
+    path.write_bytes(b"")
+    with pytest.raises(SnapshotError):
+        Snapshot.load(str(path))
+
+def test_rejects_unknown_format_version(records):
+    content = encode_snapshot(catalog.split_partitions(records))
+    (header_length,) = struct.unpack_from("<I", content, len(MAGIC))
+    start = len(MAGIC) + 4
+    header = json.loads(content[start:start + header_length])
+    header["format"] = snapshot.FORMAT_VERSION + 1
+    # Mesmo tamanho de cabeçalho: só o dígito da versão muda
+    patched = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    assert len(patched) == header_length
+    with pytest.raises(SnapshotError, match="Versão"):
+        Snapshot(content[:start] + patched + content[start + header_length:])
+
+def test_rejects_unreadable_header(records):
+    content = bytearray(encode_snapshot(catalog.split_partitions(records)))
+    content[len(MAGIC) + 4] = ord("#")
+    with pytest.raises(SnapshotError, match="Cabeçalho"):
+        Snapshot(bytes(content))
+
+def test_rejects_truncated_file(tmp_path, records):
+    path = tmp_path / "snapshot.bin"
+    content = encode_snapshot(catalog.split_partitions(records))
+    path.write_bytes(content[:len(content) - 64])
+    loaded = Snapshot.load(str(path))
+    with pytest.raises(SnapshotError, match="truncado"):
+        loaded.partition(catalog.PARTITION_TELEFONES)
+
+def test_detects_corrupted_section(records):
+    partitions = catalog.split_partitions(records)
+    content = bytearray(encode_snapshot(partitions))
+    loaded = Snapshot(bytes(content))
+    layout = loaded.header["partitions"][catalog.PARTITION_EMPREENDIMENTOS]
+    content[loaded.data_start + layout["offset"] + layout["length"] // 2] ^= 0xFF
+    corrupted = Snapshot(bytes(content))
+    with pytest.raises(SnapshotError, match="corrompida"):
+        corrupted.partition(catalog.PARTITION_EMPREENDIMENTOS)
+    # As outras seções continuam legíveis
+    assert corrupted.records(catalog.PARTITION_ZERO37) == partitions[catalog.PARTITION_ZERO37]
@@ -0,0 +1,64 @@
+"""Leitura em streaming dos feeds XML comparada com o parse completo do xmltodict"""
+
+import pytest
+import xmltodict
+
+import xml_fetcher
+from fetchers.xml_stream import iter_xml_items, xml_root_tag
+
+DOCUMENTS = {
+    "simples": b"<estoque><veiculo><id>1</id><modelo>Civic</modelo></veiculo><veiculo><id>2</id><modelo/></veiculo></estoque>",
+    "item_unico": b"<estoque><veiculo><id>1</id></veiculo></estoque>",
+    "atributos_e_repeticoes": (
+        b"<ADS><AD tipo=\"carro\"><ID>7</ID><IMAGES><IMAGE_URL>a.jpg</IMAGE_URL><IMAGE_URL>b.jpg</IMAGE_URL></IMAGES>"
+        b"<ACCESSORIES>  Ar, Airbag  </ACCESSORIES><PRICE moeda=\"BRL\">1000</PRICE></AD><AD><ID>8</ID></AD></ADS>"
+    ),
+    "cdata_e_texto_misto": "<estoque><veiculo><obs><![CDATA[<b>Único</b> dono]]></obs><x>a<y>1</y>b</x></veiculo></estoque>".encode("utf-8"),
+    "namespaces": (
+        b"<estoque xmlns:g=\"http://base.google.com/ns/1.0\"><veiculo xml:lang=\"pt\"><g:id>9</g:id>"
+        b"<g:price>10</g:price></veiculo></estoque>"
+    ),
+    "latin1_invalido": "<estoque><veiculo><cor>Maçã</cor></veiculo></estoque>".encode("latin-1"),
+}
+
+@pytest.mark.parametrize("name", sorted(DOCUMENTS))
+def test_items_match_xmltodict(name):
+    content = DOCUMENTS[name]
+    root = xml_root_tag(content)
+    # Referência: fluxo antigo, que decodificava o payload inteiro descartando bytes inválidos
+    full = xmltodict.parse(content.decode("utf-8", errors="ignore").encode("utf-8"), encoding="utf-8")[root]
+    item_tag = [key for key in full if not key.startswith("@")][0]
+    expected = full[item_tag]
+    if not isinstance(expected, list):
+        expected = [expected]
+    assert list(iter_xml_items(content, (root, item_tag))) == expected
+
+def test_root_tag():
+    assert xml_root_tag(b"\xef\xbb\xbf<?xml version=\"1.0\"?>\n<estoque/>") == "estoque"
+    assert xml_root_tag(b"{\"estoque\": []}") is None
+
+def test_stream_and_full_parse_give_same_records(monkeypatch):
+    content = (
+        b"<estoque>" + b"".join(
+            b"<veiculo><id>%d</id><marca>Honda</marca><modelo>CB 300</modelo><versao>F</versao><tipoveiculo>Moto</tipoveiculo>"
+            b"<anomodelo>2021</anomodelo><km>%d</km><preco>15000</preco></veiculo>" % (i, i * 1000)
+            for i in range(5)
+        ) + b"</estoque>"
+    )
+    url = "https://feeds.dsautoestoque.com/loja.xml"
+    fetcher = xml_fetcher.UnifiedVehicleFetcher()
+    assert fetcher.select_stream_parser(content, url) is not None
+    _, streamed = fetcher.parse_content(content, url)
+    monkeypatch.setattr(fetcher, "select_stream_parser", lambda content, url: None)
+    _, full = fetcher.parse_content(content, url)
+    assert streamed == full and len(streamed) == 5
+
+def test_invalid_bytes_after_delivered_items():
+    # Byte inválido depois de vários blocos já lidos: a releitura não repete nem perde itens
+    items = [b"<veiculo><id>%d</id><cor>Prata</cor></veiculo>" % i for i in range(2000)]
+    items[1500] = "<veiculo><id>1500</id><cor>Maçã</cor></veiculo>".encode("latin-1")
+    content = b"<estoque>" + b"".join(items) + b"</estoque>"
+    streamed = list(iter_xml_items(content, ("estoque", "veiculo")))
+    assert [int(item["id"]) for item in streamed] == list(range(2000))
+    assert streamed[1500]["cor"] == "Ma"
+    assert xml_fetcher.UnifiedVehicleFetcher()._parse_xml(content)["estoque"]["veiculo"] == streamed
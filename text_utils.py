@@ -0,0 +1,14 @@
+"""
+Normalização de texto compartilhada pela API (catálogo, busca) e pelos parsers (model_matchers)
+
+Módulo sem dependências do catálogo: os parsers que rodam no pool de processos importam só isto.
+"""
+
+from typing import Any
+from unidecode import unidecode
+
+def normalize_search_text(text: Any) -> str:
+    """Remove acentos, hífens e espaços e converte para minúsculas (forma usada pela busca)"""
+    if not text:
+        return ""
+    return unidecode(str(text)).lower().replace("-", "").replace(" ", "").strip()
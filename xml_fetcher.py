@@ -1,9 +1,19 @@
 import requests
 import xmltodict
+import http_client
 import json
 import os
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
+from urllib.parse import urlparse
+from xml.parsers.expat import ExpatError
+from catalog import DATA_FILE, SegmentStore, write_catalog_snapshot, read_snapshot_pointer, current_snapshot_path, mark_snapshot_pending, snapshot_pending, partition_kind
+from feed_cache import feed_cache, payload_digest, FeedCacheEntry
+from atomic_file import atomic_write
 
 # Importa todos os parsers da pasta fetchers
 from fetchers import (
@@ -30,12 +40,61 @@ from fetchers import (
     NetcarParser,
     WordPressParser,
     EmpreendimentosParser,
-    Zero37Parser
+    Zero37Parser,
+    EnrichmentSession,
+    ParserRegistry
 )
+from fetchers.xml_stream import xml_root_tag, stream_data, without_invalid_utf8, XMLStreamError
 
 # =================== CONFIGURAÇÕES GLOBAIS =======================
 
-JSON_FILE = "data.json"
+JSON_FILE = DATA_FILE
+
+# Exportação opcional do data.json completo (o catálogo é servido a partir do snapshot binário)
+EXPORT_DATA_JSON = os.getenv("EXPORT_DATA_JSON", "0").strip().lower() in ("1", "true", "yes", "sim")
+
+# Downloads simultâneos no total e por host (alguns fornecedores hospedam vários feeds)
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "8"))
+FETCH_PER_HOST = int(os.getenv("FETCH_PER_HOST", "2"))
+
+# Processos para o parse dos feeds (0 = parse nas threads de coleta, dentro do processo da API)
+PARSE_PROCESSES = int(os.getenv("PARSE_PROCESSES", "0"))
+
+# =================== POOL DE PARSE =======================
+
+_parse_pool: Optional[ProcessPoolExecutor] = None
+_parse_pool_lock = threading.Lock()
+_worker_fetcher: Optional["UnifiedVehicleFetcher"] = None
+
+def get_parse_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    Pool de processos persistente entre atualizações (os parsers e autômatos de matching são
+    montados uma vez por processo). Usa spawn: o processo da API tem threads do uvicorn e do scheduler.
+    """
+    global _parse_pool
+    if PARSE_PROCESSES <= 0:
+        return None
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            _parse_pool = ProcessPoolExecutor(max_workers=PARSE_PROCESSES, mp_context=multiprocessing.get_context("spawn"))
+            print(f"[INFO] Pool de parse iniciado com {PARSE_PROCESSES} processo(s)")
+        return _parse_pool
+
+def reset_parse_pool(pool: ProcessPoolExecutor):
+    """Descarta um pool quebrado (processo filho morto); o próximo uso cria outro"""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is pool:
+            _parse_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def _parse_in_worker(content: bytes, url: str, content_type: Optional[str]) -> Tuple[Optional[str], Optional[List[Dict]]]:
+    """Executado no processo filho: devolve o nome do parser e os registros (picklable)"""
+    global _worker_fetcher
+    if _worker_fetcher is None:
+        _worker_fetcher = UnifiedVehicleFetcher()
+    parser, records = _worker_fetcher.parse_content(content, url, content_type)
+    return (parser.__class__.__name__ if parser else None), records
 
 # =================== SISTEMA PRINCIPAL =======================
 
@@ -68,30 +127,94 @@ class UnifiedVehicleFetcher:
             EmpreendimentosParser(),
             Zero37Parser()
         ]
+        self.registry = ParserRegistry(self.parsers)
+        self._host_limits: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_limits_lock = threading.Lock()
         print("[INFO] Sistema unificado iniciado com parsers modularizados")
     
     def get_urls(self) -> List[str]: 
-        """Obtém todas as URLs das variáveis de ambiente"""
-        return list({val for var, val in os.environ.items() if var.startswith("XML_URL") and val})
+        """Obtém todas as URLs das variáveis de ambiente (ordenadas, para um merge determinístico)"""
+        return sorted({val for var, val in os.environ.items() if var.startswith("XML_URL") and val})
     
-    def detect_format(self, content: bytes, url: str) -> tuple[Any, str]:
-        """Detecta se o conteúdo é JSON ou XML"""
-        content_str = content.decode('utf-8', errors='ignore')
-        try: 
-            return json.loads(content_str), "json"
-        except json.JSONDecodeError:
-            try: 
-                return xmltodict.parse(content_str), "xml"
-            except Exception: 
-                raise ValueError(f"Formato não reconhecido para URL: {url}")
+    def _host_limit(self, url: str) -> threading.BoundedSemaphore:
+        """Semáforo que limita os downloads simultâneos para o mesmo host"""
+        host = urlparse(url).netloc.lower()
+        with self._host_limits_lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(max(1, FETCH_PER_HOST))
+            return self._host_limits[host]
+    
+    def sniff_format(self, content: bytes) -> Optional[str]:
+        """
+        Formato pelo primeiro byte significativo (após BOM e espaços), sem decodificar o payload.
+        None quando o início é ambíguo (ex.: JSON escalar ou payload vazio).
+        """
+        first = content[:256].lstrip(b"\xef\xbb\xbf \t\r\n")[:1]
+        if first in (b"{", b"["):
+            return "json"
+        if first == b"<":
+            return "xml"
+        return None
+    
+    def _parse_json(self, content: bytes) -> Any:
+        try:
+            # json.loads aceita bytes direto (detecta utf-8/utf-16 e BOM)
+            return json.loads(content)
+        except UnicodeDecodeError:
+            return json.loads(content.decode("utf-8", errors="ignore"))
+    
+    def _parse_xml(self, content: bytes) -> Any:
+        # Mesmo encoding forçado do fluxo antigo (texto utf-8); bytes inválidos só são
+        # descartados, com uma cópia do payload, quando o expat recusa o documento
+        try:
+            return xmltodict.parse(content, encoding="utf-8")
+        except ExpatError:
+            cleaned = without_invalid_utf8(content)
+            if cleaned is None:
+                raise
+            return xmltodict.parse(cleaned, encoding="utf-8")
+    
+    def detect_format(self, content: bytes, url: str, content_type: Optional[str] = None) -> tuple[Any, str]:
+        """
+        Detecta se o conteúdo é JSON ou XML e faz um único parse com o decoder certo.
+        Só quando o início do payload é ambíguo os dois são tentados, na ordem sugerida pelo Content-Type.
+        """
+        decoders = {"json": self._parse_json, "xml": self._parse_xml}
+        sniffed = self.sniff_format(content)
+        if sniffed:
+            order = [sniffed]
+        elif "xml" in (content_type or "").lower():
+            order = ["xml", "json"]
+        else:
+            order = ["json", "xml"]
+        
+        for format_type in order:
+            try:
+                return decoders[format_type](content), format_type
+            except Exception:
+                continue
+        raise ValueError(f"Formato não reconhecido para URL: {url}")
+    
+    def select_stream_parser(self, content: bytes, url: str) -> Optional[object]:
+        """
+        Parser para leitura do XML em streaming, escolhido sem montar o documento:
+        o parser da URL no registro, desde que declare stream_item_path e a raiz do XML
+        seja a esperada. Feeds reconhecidos pela URL nunca passam pelas checagens por conteúdo.
+        """
+        if self.sniff_format(content) != "xml":
+            return None
+        parser = self.registry.select_by_url(url)
+        item_path = getattr(parser, "stream_item_path", None)
+        if item_path and xml_root_tag(content) == item_path[0]:
+            return parser
+        return None
     
     def select_parser(self, data: Any, url: str) -> Optional[object]:
-        """Seleciona o parser apropriado baseado na URL"""
-        # Primeira prioridade: seleção baseada na URL
-        for parser in self.parsers:
-            if parser.can_parse(data, url):
-                print(f"[INFO] Parser selecionado: {parser.__class__.__name__}")
-                return parser
+        """Seleciona o parser apropriado pelo registro (URL primeiro, conteúdo só para feeds não reconhecidos)"""
+        parser = self.registry.select(data, url)
+        if parser:
+            print(f"[INFO] Parser selecionado: {parser.__class__.__name__}")
+            return parser
         
         # Se nenhum parser foi encontrado, usa BoomParser como fallback
         print(f"[AVISO] Nenhum parser específico encontrado para URL: {url}")
@@ -104,28 +227,98 @@ class UnifiedVehicleFetcher:
         
         return None
     
-    def process_url(self, url: str) -> List[Dict]:
-        """Processa uma URL específica"""
+    def _parser_by_name(self, name: Optional[str]) -> Optional[object]:
+        return self.registry.by_name(name)
+    
+    def _cached_records(self, entry: Optional[FeedCacheEntry]) -> Optional[List[Dict]]:
+        """Registros da última execução, se o parser que os gerou permite reaproveitá-los e não mudou desde então"""
+        if not entry or not entry.has_records:
+            return None
+        parser = self._parser_by_name(entry.parser)
+        if not parser or not getattr(parser, "cacheable", False):
+            return None
+        if entry.parser_version != parser.cache_version():
+            print(f"[INFO] Parser {entry.parser} alterado desde o cache, processando o feed de novo: {entry.url}")
+            return None
+        return entry.records()
+    
+    def parse_content(self, content: bytes, url: str, content_type: Optional[str] = None) -> Tuple[Optional[object], Optional[List[Dict]]]:
+        """Escolhe o parser e processa o payload (streaming quando possível, senão parse completo)"""
+        records = None
+        parser = self.select_stream_parser(content, url)
+        if parser:
+            print(f"[INFO] Formato detectado: xml (streaming, parser {parser.__class__.__name__})")
+            try:
+                records = parser.parse(stream_data(content, parser.stream_item_path), url)
+            except XMLStreamError as e:
+                print(f"[AVISO] {e} - usando parse completo para URL: {url}")
+        
+        if records is None:
+            data, format_type = self.detect_format(content, url, content_type)
+            print(f"[INFO] Formato detectado: {format_type}")
+            parser = self.select_parser(data, url)
+            if parser:
+                records = parser.parse(data, url)
+        return parser, records
+    
+    def _parse(self, content: bytes, url: str, content_type: Optional[str]) -> Tuple[Optional[object], Optional[List[Dict]]]:
+        """Parse no pool de processos quando PARSE_PROCESSES > 0, senão na própria thread"""
+        pool = get_parse_pool()
+        if pool is not None:
+            try:
+                parser_name, records = pool.submit(_parse_in_worker, content, url, content_type).result()
+                return self._parser_by_name(parser_name), records
+            except BrokenProcessPool as e:
+                print(f"[AVISO] Pool de parse indisponível ({e}), processando na thread: {url}")
+                reset_parse_pool(pool)
+        return self.parse_content(content, url, content_type)
+    
+    def process_url(self, url: str, enrichment: Optional[EnrichmentSession] = None) -> Optional[List[Dict]]:
+        """Processa uma URL específica (None indica falha da fonte, diferente de um feed vazio)"""
         print(f"[INFO] Processando URL: {url}")
+        enrichment = enrichment or EnrichmentSession()
         try:
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-            data, format_type = self.detect_format(response.content, url)
-            print(f"[INFO] Formato detectado: {format_type}")
+            entry = feed_cache.load(url)
+            cached_payload = entry.payload() if entry else None
+            headers = entry.conditional_headers() if cached_payload is not None else {}
+            with self._host_limit(url):
+                response = http_client.get(url, headers=headers)
+            
+            if response.status_code == 304 and cached_payload is not None:
+                content = cached_payload
+                etag, last_modified = entry.etag, entry.last_modified
+                content_type = None
+                print(f"[INFO] Feed não modificado (304): {url}")
+            else:
+                response.raise_for_status()
+                content = response.content
+                etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+                content_type = response.headers.get("Content-Type")
+            
+            if entry and payload_digest(content) == entry.sha256:
+                records = self._cached_records(entry)
+                if records is not None:
+                    if content is not cached_payload:
+                        feed_cache.refresh(entry, etag, last_modified)
+                    print(f"[INFO] Feed inalterado, reutilizando {len(records)} registro(s) do cache ({entry.parser})")
+                    return enrichment.apply(self._parser_by_name(entry.parser), records)
+            
+            parser, records = self._parse(content, url, content_type)
             
-            parser = self.select_parser(data, url)
             if parser:
-                return parser.parse(data, url)
+                cacheable = getattr(parser, "cacheable", False)
+                feed_cache.store(url, content, etag, last_modified, parser.__class__.__name__, parser.cache_version(), records if cacheable else None)
+                return enrichment.apply(parser, records)
             else:
                 print(f"[ERRO] Nenhum parser adequado encontrado para URL: {url}")
-                return []
+                return None
                 
         except requests.RequestException as e: 
             print(f"[ERRO] Erro de requisição para URL {url}: {e}")
-            return []
+            return None
         except Exception as e: 
             print(f"[ERRO] Erro crítico ao processar URL {url}: {e}")
-            return []
+            return None
     
     def fetch_all(self) -> Dict:
         """Executa a coleta de todas as fontes"""
@@ -135,7 +328,41 @@ class UnifiedVehicleFetcher:
             return {}
         
         print(f"[INFO] {len(urls)} URL(s) encontrada(s) para processar")
-        all_vehicles = [vehicle for url in urls for vehicle in self.process_url(url)]
+        # Cada fonte é baixada e processada em paralelo; map preserva a ordem das URLs no merge
+        workers = max(1, min(FETCH_WORKERS, len(urls)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fetch") as executor:
+            enrichment = EnrichmentSession()
+            results = list(executor.map(lambda url: self.process_url(url, enrichment), urls))
+        
+        # Merge por segmento: fontes que falharam entram com o último segmento bom
+        segments = SegmentStore()
+        changed_kinds = set()
+        stale_sources = 0
+        all_vehicles = []
+        for url, vehicles in zip(urls, results):
+            if vehicles is None:
+                vehicles = segments.load(url)
+                if vehicles is None:
+                    print(f"[AVISO] Fonte sem dados e sem segmento anterior: {url}")
+                    continue
+                stale_sources += 1
+                print(f"[AVISO] Mantendo último segmento bom ({len(vehicles)} registro(s)) para URL: {url}")
+            else:
+                previous_kinds = segments.kinds(url)
+                try:
+                    if segments.save(url, vehicles):
+                        changed_kinds |= previous_kinds | {partition_kind(v) for v in vehicles}
+                except Exception as e:
+                    print(f"[ERRO] Erro ao salvar segmento da URL {url}: {e}")
+            all_vehicles.extend(vehicles)
+        changed_kinds |= segments.prune(urls)
+        try:
+            # O marcador vem antes do índice: sem ele o snapshot não seria regravado se esta publicação falhar
+            if changed_kinds:
+                mark_snapshot_pending()
+            segments.commit()
+        except Exception as e:
+            print(f"[ERRO] Erro ao salvar índice de segmentos: {e}")
         
         # Estatísticas por tipo e categoria
         stats = self._generate_stats(all_vehicles)
@@ -145,15 +372,33 @@ class UnifiedVehicleFetcher:
             "_updated_at": datetime.now().isoformat(), 
             "_total_count": len(all_vehicles), 
             "_sources_processed": len(urls),
+            "_sources_stale": stale_sources,
             "_statistics": stats
         }
         
-        try:
-            with open(JSON_FILE, "w", encoding="utf-8") as f: 
-                json.dump(result, f, ensure_ascii=False, indent=2)
-            print(f"\n[OK] Arquivo {JSON_FILE} salvo com sucesso!")
-        except Exception as e: 
-            print(f"[ERRO] Erro ao salvar arquivo JSON: {e}")
+        # Geração do snapshot com o conteúdo desta coleta (None se a gravação falhou)
+        snapshot_current = True
+        if changed_kinds or snapshot_pending() or current_snapshot_path() is None:
+            try:
+                counts = write_catalog_snapshot(all_vehicles, result["_updated_at"])
+                print(f"\n[OK] Snapshot do catálogo publicado em {current_snapshot_path()}: {counts} (partições alteradas: {sorted(changed_kinds) or 'nenhuma'})")
+            except Exception as e:
+                snapshot_current = False
+                print(f"[ERRO] Erro ao salvar snapshot do catálogo: {e}")
+            
+            # data.json completo só como artefato de depuração
+            if EXPORT_DATA_JSON:
+                try:
+                    atomic_write(JSON_FILE, json.dumps(result, ensure_ascii=False).encode("utf-8"))
+                    print(f"[OK] Arquivo {JSON_FILE} salvo com sucesso!")
+                except Exception as e: 
+                    print(f"[ERRO] Erro ao salvar arquivo JSON: {e}")
+        else:
+            print(f"\n[INFO] Nenhuma fonte mudou, snapshot {current_snapshot_path()} mantido")
+        # Nunca reporta uma geração mais antiga que estes dados: com gravação pendente o
+        # publish monta as partições em memória até a próxima coleta regravar o snapshot
+        pointer = read_snapshot_pointer() if snapshot_current and not snapshot_pending() else None
+        result["_snapshot_generation"] = pointer["generation"] if pointer else None
         
         print(f"[OK] Total de veículos processados: {len(all_vehicles)}")
         self._print_stats(stats)